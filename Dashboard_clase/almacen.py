@@ -0,0 +1,199 @@
+import os
+import sqlite3
+import threading
+from contextlib import closing, contextmanager
+from datetime import datetime
+from typing import Optional
+
+import pandas as pd
+
+import pipeline.huella
+from comun import artefactos
+from comun.cache_compartido import CACHE_DATOS
+from comun.memoria_compartida import dataframe_compartido
+from pipeline.cubo import CuboAgregado
+
+# Directorio con una base SQLite por modelo estrella del MEN, nombrada por su huella:
+# cada sesión lee el modelo de sus propios datos aunque otra haya cargado otros
+DIRECTORIO_ALMACEN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "almacen_men")
+
+# Cuántos modelos (huellas distintas) se conservan en disco; los más antiguos se borran
+MODELOS_CONSERVADOS = 4
+
+# Se incrementa cuando cambia el esquema del almacén para forzar su reconstrucción
+VERSION_ESQUEMA = 2
+
+
+# ===================================================================
+# Función: huella_datos
+# ===================================================================
+def huella_datos(*dfs: Optional[pd.DataFrame]) -> str:
+    """
+    Calcula una huella del contenido de uno o varios DataFrames (columnas y filas).
+    Los DataFrames `None` también cuentan, para distinguir "sin DANE" de "con DANE".
+    """
+    return pipeline.huella.huella_datos(*dfs, sal=f"esquema-{VERSION_ESQUEMA}")
+
+
+@contextmanager
+def _conectar(ruta: str):
+    # `with sqlite3.connect()` solo cierra la transacción, no la conexión
+    with closing(sqlite3.connect(ruta, check_same_thread=False)) as con:
+        yield con
+
+
+# ===================================================================
+# Función: ruta_modelo / existe_modelo
+# ===================================================================
+def ruta_modelo(huella: str, directorio: str = DIRECTORIO_ALMACEN) -> str:
+    return os.path.join(directorio, f"{huella}.db")
+
+
+def existe_modelo(huella: Optional[str], directorio: str = DIRECTORIO_ALMACEN) -> bool:
+    """
+    Indica si ya está materializado el modelo de los datos con esa huella.
+    """
+    return huella is not None and os.path.exists(ruta_modelo(huella, directorio))
+
+
+# ===================================================================
+# Función: materializar_modelo
+# ===================================================================
+INDICES_MODELO = (
+    "CREATE UNIQUE INDEX ix_dim_tiempo ON dim_tiempo(id_tiempo)",
+    "CREATE UNIQUE INDEX ix_dim_geo ON dim_geo(id_geo)",
+    "CREATE INDEX ix_dim_geo_depto ON dim_geo(departamento)",
+    "CREATE INDEX ix_hechos_geo ON hechos(id_geo)",
+    "CREATE INDEX ix_hechos_tiempo ON hechos(id_tiempo)",
+)
+
+
+def materializar_modelo(dim_tiempo: pd.DataFrame, dim_geo: pd.DataFrame, df_fact: pd.DataFrame,
+                        df_cubo: pd.DataFrame, huella: str, extra: Optional[dict] = None,
+                        directorio: str = DIRECTORIO_ALMACEN) -> str:
+    """
+    Escribe las dimensiones, la tabla de hechos y el cubo agregado en la base
+    SQLite de esa huella, con índices sobre las llaves. La base se arma en un
+    archivo temporal propio de este hilo y luego reemplaza a la definitiva con
+    `os.replace`: los lectores ven el modelo completo o ninguno, y dos sesiones
+    que materializan a la vez no se pisan.
+    Args:
+        extra (dict | None): Metadatos adicionales (por ejemplo, registros válidos).
+    Returns:
+        str: Ruta de la base del modelo.
+    """
+    os.makedirs(directorio, exist_ok=True)
+    ruta = ruta_modelo(huella, directorio)
+    temporal = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+    tablas = {"dim_tiempo": dim_tiempo, "dim_geo": dim_geo, "hechos": df_fact, "cubo": df_cubo}
+    try:
+        with _conectar(temporal) as con:
+            for nombre, df in tablas.items():
+                df.to_sql(nombre, con, index=False)
+            for indice in INDICES_MODELO:
+                con.execute(indice)
+            con.execute("CREATE TABLE metadatos (clave TEXT PRIMARY KEY, valor TEXT)")
+            con.executemany(
+                "INSERT INTO metadatos (clave, valor) VALUES (?, ?)",
+                [("huella", huella), ("actualizado", datetime.now().isoformat(timespec="seconds"))]
+                + [(clave, str(valor)) for clave, valor in (extra or {}).items()]
+            )
+            con.commit()
+        os.replace(temporal, ruta)
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+    _borrar_modelos_antiguos(directorio)
+    return ruta
+
+
+def _borrar_modelos_antiguos(directorio: str) -> None:
+    # Las sesiones que aún tengan abierta una base borrada la siguen leyendo;
+    # si la vuelven a pedir, la pestaña de transformación la reconstruye
+    modelos = sorted(
+        (os.path.join(directorio, nombre) for nombre in os.listdir(directorio) if nombre.endswith(".db")),
+        key=os.path.getmtime, reverse=True,
+    )
+    for ruta in modelos[MODELOS_CONSERVADOS:]:
+        try:
+            os.remove(ruta)
+        except FileNotFoundError:
+            pass
+
+
+def leer_metadatos(huella: str, directorio: str = DIRECTORIO_ALMACEN) -> dict:
+    with _conectar(ruta_modelo(huella, directorio)) as con:
+        return dict(con.execute("SELECT clave, valor FROM metadatos").fetchall())
+
+
+# ===================================================================
+# Función: sincronizar_con_artefactos
+# ===================================================================
+TABLAS_MODELO = ("dim_tiempo", "dim_geo", "hechos", "cubo")
+
+
+def sincronizar_con_artefactos(version: Optional[str] = None,
+                               directorio: str = DIRECTORIO_ALMACEN) -> Optional[str]:
+    """
+    Copia al almacén el modelo estrella publicado por `materializar.py` (versión
+    vigente de los artefactos 'men'), si el almacén no tiene ya esa huella. Así
+    las pestañas leen el modelo precalculado sin reconstruirlo.
+    Returns:
+        str | None: Huella del modelo publicado, o None si no hay artefactos.
+    """
+    manifiesto = artefactos.leer_manifiesto("men", version)
+    if manifiesto is None or not all(t in manifiesto["contenido"] for t in TABLAS_MODELO):
+        return None
+    metadatos = manifiesto["metadatos"]
+    if not existe_modelo(metadatos["huella"], directorio):
+        tablas = [artefactos.leer_tabla("men", t, manifiesto["version"]) for t in TABLAS_MODELO]
+        materializar_modelo(*tablas, metadatos["huella"], directorio=directorio,
+                            extra={'registros_validos': metadatos["registros_validos"],
+                                   'version_artefactos': manifiesto["version"]})
+    return metadatos["huella"]
+
+
+# ===================================================================
+# Función: cargar_modelo
+# ===================================================================
+def cargar_modelo(huella: str, directorio: str = DIRECTORIO_ALMACEN) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Lee dimensiones y tabla de hechos del modelo con esa huella. La lectura se
+    comparte entre sesiones y entre los workers del nodo (memoria compartida,
+    solo lectura).
+    Returns:
+        tuple: (dim_tiempo, dim_geo, df_fact)
+    """
+    ruta = ruta_modelo(huella, directorio)
+    return tuple(
+        dataframe_compartido(f"almacen-{tabla}", huella, lambda tabla=tabla: consultar(f"SELECT * FROM {tabla}", ruta=ruta))
+        for tabla in ("dim_tiempo", "dim_geo", "hechos")
+    )
+
+
+# ===================================================================
+# Función: consultar
+# ===================================================================
+def consultar(sql: str, ruta: str, params: tuple = ()) -> pd.DataFrame:
+    """
+    Ejecuta una consulta de solo lectura sobre la base de un modelo (`ruta_modelo`).
+    """
+    with _conectar(ruta) as con:
+        return pd.read_sql(sql, con, params=params)
+
+
+# ===================================================================
+# Función: cubo_vigente
+# ===================================================================
+def cubo_vigente(huella: str, directorio: str = DIRECTORIO_ALMACEN) -> CuboAgregado:
+    """
+    Devuelve el cubo agregado del modelo con esa huella. Se lee del almacén una
+    sola vez por huella en todo el nodo, y lo comparten todas las sesiones y
+    workers que trabajan con los mismos datos.
+    """
+    ruta = ruta_modelo(huella, directorio)
+    return CACHE_DATOS.obtener(
+        ("almacen-cubo", ruta),
+        lambda: CuboAgregado(dataframe_compartido("almacen-cubo", huella,
+                                                  lambda: consultar("SELECT * FROM cubo", ruta=ruta))),
+    )
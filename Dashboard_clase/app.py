@@ -1,9 +1,33 @@
+import os
+import sys
+
 import streamlit as st
 
-from cargar_datos import show_data_tab, load_data_from_api
+# Permite importar el paquete compartido `comun` desde la raíz del repositorio
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from cargar_datos import show_data_tab, load_data_from_api, load_dane_local_files, usar_artefactos_men
 from transformacion import show_transform_tab
 from visualizaciones import show_visualization_tab
 from mapa import show_map_tab  
+from comun.precarga import iniciar_precarga, mostrar_progreso
+from comun.rendimiento import iniciar_traza, medir, mostrar_panel_rendimiento
+
+# Cada rerun es una traza: las etapas medidas abajo quedan agrupadas en ella
+iniciar_traza()
+
+# Con artefactos publicados por materializar.py la app solo los lee; sin ellos,
+# precarga en segundo plano de los datos más usados, que los botones de carga
+# encuentran luego en la caché compartida
+if usar_artefactos_men():
+    precarga = iniciar_precarga("men", {})
+else:
+    precarga = iniciar_precarga("men", {
+        "men_api": lambda: load_data_from_api(limit=50000, usar_cache=True),
+        "dane_local": load_dane_local_files,
+    })
+with st.sidebar:
+    mostrar_progreso(precarga)
 
 # Crear pestañas en el cuerpo de la aplicación
 tabs = st.tabs([
@@ -14,18 +38,21 @@ tabs = st.tabs([
 ])
 
 # Mostrar contenido en cada pestaña
-with tabs[0]:
+with tabs[0], medir("render", "Pestaña Carga de Datos"):
     show_data_tab()
 
-with tabs[1]:
+with tabs[1], medir("render", "Pestaña Transformación"):
     show_transform_tab()
 
-with tabs[2]:
+with tabs[2], medir("render", "Pestaña Visualizaciones"):
     show_visualization_tab()
 
-with tabs[3]:
+with tabs[3], medir("render", "Pestaña Mapa"):
     show_map_tab()  # ✅ Ahora funcionará correctamente
 
+# Al final, cuando todas las etapas del rerun ya se midieron
+mostrar_panel_rendimiento("dashboard_men")
+
 
 
 
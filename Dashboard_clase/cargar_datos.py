@@ -3,29 +3,77 @@ import pandas as pd
 import requests
 import os
 
+import almacen
+from comun import artefactos
+from comun.socrata import cargar_dataset
+from comun.cache_columnar import cargar_con_cache, huella_fuente, leer_excel_cacheado, leer_excels_cacheados
+from comun.cache_compartido import CACHE_DATOS, TTL_POR_DEFECTO, no_vacio
+from comun.memoria_compartida import dataframe_compartido, invalidar, version_por_tiempo
+from comun.rendimiento import medir
+
+DATASET_MEN = "nudc-7mev"
+EDAD_MAXIMA_CACHE_API = 24 * 3600  # segundos
+
+# Columnas del MEN que se convierten a número a medida que llega cada página
+COLUMNAS_NUMERICAS_MEN = [
+    'a_o', 'poblaci_n_5_16', 'tasa_matriculaci_n_5_16',
+    'cobertura_neta', 'cobertura_neta_transici_n', 'cobertura_neta_primaria',
+    'cobertura_neta_secundaria', 'cobertura_neta_media',
+    'cobertura_bruta', 'cobertura_bruta_transici_n', 'cobertura_bruta_primaria',
+    'cobertura_bruta_secundaria', 'cobertura_bruta_media'
+]
+
 # ===================================================================
 # Función: load_data_from_api
 # ===================================================================
-def load_data_from_api(limit: int = 50000) -> pd.DataFrame:
+@medir("carga", "API MEN")
+def load_data_from_api(limit: int | None = 50000, progreso=None, usar_cache: bool = False) -> pd.DataFrame:
     """
-    Carga datos desde la API de Socrata en formato JSON y los convierte en un DataFrame de pandas.
+    Carga datos desde la API de Socrata en páginas concurrentes y los convierte en un DataFrame de pandas.
+    Args:
+        limit (int | None): Límite de registros. `None` carga el dataset completo.
+        progreso (callable): Función opcional `(descargados, total)` para reportar avance.
+        usar_cache (bool): Reutiliza la copia Parquet local si tiene menos de 24 horas.
+            Si es False, se descarta también la copia en memoria compartida
+            (los otros workers conservan la suya hasta que venza).
     """
-    api_url = f"https://www.datos.gov.co/resource/nudc-7mev.json?$limit={limit}"
+    def descargar():
+        return cargar_dataset(DATASET_MEN, limit=limit,
+                              numericas=COLUMNAS_NUMERICAS_MEN, progreso=progreso)
+
+    def cargar():
+        if usar_cache:
+            return cargar_con_cache(f"api_{DATASET_MEN}_{limit or 'todo'}", descargar,
+                                    max_edad=EDAD_MAXIMA_CACHE_API)
+        return descargar()
+
+    # Todas las sesiones y workers del nodo comparten el mismo DataFrame en memoria
+    nombre = f"api-{DATASET_MEN}-{limit or 'todo'}"
     try:
-        response = requests.get(api_url)
-        response.raise_for_status()
-        data = response.json()
-        df = pd.DataFrame(data)
-        return df
+        if not usar_cache:
+            invalidar(nombre)
+        return dataframe_compartido(nombre, version_por_tiempo(TTL_POR_DEFECTO), cargar)
     except requests.exceptions.RequestException as e:
         st.error(f"❌ Error de conexión: {e}")
     except Exception as e:
         st.error(f"❌ Error inesperado: {e}")
     return pd.DataFrame()
 
+# ===================================================================
+# Función: leer_excel_compartido
+# ===================================================================
+def leer_excel_compartido(fuente) -> pd.DataFrame:
+    """
+    Lee un Excel del DANE una sola vez por proceso: las sesiones que suben o
+    cargan el mismo archivo reciben el mismo DataFrame.
+    """
+    return CACHE_DATOS.obtener(("excel", huella_fuente(fuente)),
+                               lambda: leer_excel_cacheado(fuente), guardar_si=no_vacio)
+
 # ===================================================================
 # Función: load_dane_local_files
 # ===================================================================
+@medir("carga", "Archivos DANE")
 def load_dane_local_files() -> tuple[pd.DataFrame, pd.DataFrame]:
     """
     Carga dos archivos locales del DANE:
@@ -36,14 +84,54 @@ def load_dane_local_files() -> tuple[pd.DataFrame, pd.DataFrame]:
         path_poblacion = os.path.join("..", "Datos", "Info_2005_2019.xlsx")
         path_densidad = os.path.join("..", "Datos", "Info_2020_2035.xlsx")
 
-        df_poblacion = pd.read_excel(path_poblacion)
-        df_densidad = pd.read_excel(path_densidad)
+        # Ambos libros se leen a la vez, en procesos separados, la primera vez;
+        # luego cada uno queda en memoria compartida para todos los workers
+        rutas = [path_poblacion, path_densidad]
+        leidos = []
+
+        def leer(i: int) -> pd.DataFrame:
+            if not leidos:
+                leidos.extend(leer_excels_cacheados(rutas))
+            return leidos[i]
+
+        df_poblacion, df_densidad = (
+            dataframe_compartido(f"dane-{nombre}", huella_fuente(ruta), lambda i=i: leer(i))
+            for i, (nombre, ruta) in enumerate(zip(["poblacion", "densidad"], rutas))
+        )
         return df_poblacion, df_densidad
 
     except Exception as e:
         st.error(f"❌ Error al cargar archivos locales: {e}")
         return pd.DataFrame(), pd.DataFrame()
 
+# ===================================================================
+# Función: usar_artefactos_men
+# ===================================================================
+@medir("carga", "Artefactos MEN")
+def usar_artefactos_men() -> str | None:
+    """
+    Si `materializar.py` publicó artefactos del MEN, deja en la sesión los datos
+    crudos y las bases del DANE, y en el almacén el modelo estrella ya construido.
+    Solo se leen archivos; una sesión recibe de nuevo los datos cuando se publica
+    una versión nueva, así que las cargas manuales posteriores se respetan.
+    Returns:
+        str | None: Versión en uso, o None si no hay artefactos (se calcula todo en la app).
+    """
+    version = artefactos.version_vigente("men")
+    if version is None:
+        return None
+    if st.session_state.get('version_artefactos') != version:
+        try:
+            st.session_state['df_raw'] = artefactos.leer_tabla("men", "df_raw", version)
+            st.session_state['df_poblacion'] = artefactos.leer_tabla("men", "df_poblacion", version)
+            st.session_state['df_densidad'] = artefactos.leer_tabla("men", "df_densidad", version)
+            almacen.sincronizar_con_artefactos(version)
+        except Exception as e:
+            st.error(f"❌ Error al leer los artefactos precalculados: {e}")
+            return None
+        st.session_state['version_artefactos'] = version
+    return version
+
 # ===================================================================
 # Función: show_data_tab
 # ===================================================================
@@ -53,13 +141,29 @@ def show_data_tab():
     """
     st.header("📥 Carga de Datos")
 
+    if 'version_artefactos' in st.session_state:
+        manifiesto = artefactos.leer_manifiesto("men", st.session_state['version_artefactos'])
+        if manifiesto is not None:
+            st.info(f"📦 Datos precalculados: versión `{manifiesto['version']}` "
+                    f"(generada el {manifiesto['creado']}). Puedes recargarlos abajo.")
+
     # ========== API MEN ==========
     st.subheader("📡 Cargar datos del MEN (API)")
     st.markdown("Fuente: [datos.gov.co](https://www.datos.gov.co/Educaci-n/MEN_ESTADISTICAS_EN_EDUCACION_EN_PREESCOLAR-B-SICA/nudc-7mev)")
 
+    cargar_todo = st.checkbox("Cargar todo el histórico (sin límite de 50.000 registros)")
+    usar_cache = st.checkbox("Usar copia local si tiene menos de 24 horas", value=True)
+
     if st.button("🔄 Cargar datos del MEN"):
-        with st.spinner("Cargando desde la API..."):
-            df_raw = load_data_from_api()
+        barra = st.progress(0.0, text="Cargando desde la API...")
+
+        def actualizar_progreso(descargados, total):
+            barra.progress(min(descargados / max(total, 1), 1.0),
+                           text=f"Cargando desde la API... {descargados:,}/{total:,}")
+
+        df_raw = load_data_from_api(limit=None if cargar_todo else 50000,
+                                    progreso=actualizar_progreso, usar_cache=usar_cache)
+        barra.empty()
 
         if not df_raw.empty:
             st.session_state['df_raw'] = df_raw
@@ -104,7 +208,7 @@ def show_data_tab():
 
     if up_pob:
         try:
-            df_pob = pd.read_excel(up_pob)
+            df_pob = leer_excel_compartido(up_pob)
             st.session_state['df_poblacion'] = df_pob
             st.success("✅ Población cargada correctamente")
             st.dataframe(df_pob.head())
@@ -113,7 +217,7 @@ def show_data_tab():
 
     if up_dens:
         try:
-            df_dens = pd.read_excel(up_dens)
+            df_dens = leer_excel_compartido(up_dens)
             st.session_state['df_densidad'] = df_dens
             st.success("✅ Densidad escolar cargada correctamente")
             st.dataframe(df_dens.head())
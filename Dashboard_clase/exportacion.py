@@ -0,0 +1,68 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from comun.cache_compartido import CACHE_DATOS
+from comun.rendimiento import medir
+
+# Formato -> (extensión, tipo MIME)
+FORMATOS = {
+    "Excel (.xlsx)": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "Parquet (.parquet)": ("parquet", "application/vnd.apache.parquet"),
+    "CSV comprimido (.csv.gz)": ("csv.gz", "application/gzip"),
+}
+
+
+# ===================================================================
+# Función: escribir_xlsx
+# ===================================================================
+def _celda(valor):
+    # openpyxl no acepta NaN / NaT / pd.NA ni escalares de NumPy
+    if pd.api.types.is_scalar(valor) and pd.isna(valor):
+        return None
+    return valor.item() if isinstance(valor, np.generic) else valor
+
+
+def escribir_xlsx(df: pd.DataFrame, hoja: str = "Hoja1") -> bytes:
+    """
+    Escribe el DataFrame con el modo de solo escritura de openpyxl, que va
+    volcando las filas al archivo y usa memoria constante sin importar el
+    tamaño de la tabla.
+    """
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(hoja)
+    ws.append([str(col) for col in df.columns])
+    # Se convierte fila por fila (sin copiar la tabla completa a `object`)
+    for fila in df.itertuples(index=False, name=None):
+        ws.append([_celda(v) for v in fila])
+    output = io.BytesIO()
+    wb.save(output)
+    return output.getvalue()
+
+
+# ===================================================================
+# Función: exportar_tabla
+# ===================================================================
+@medir("exportación", "Exportación tabla de hechos")
+def exportar_tabla(df: pd.DataFrame, formato: str, huella: str, hoja: str = "Hoja1") -> bytes:
+    """
+    Genera el archivo en el formato pedido. El resultado queda en la caché
+    compartida del proceso por (huella de los datos, formato), así que se
+    serializa una sola vez por versión de la tabla aunque lo pidan varias sesiones.
+    """
+    return CACHE_DATOS.obtener(("exportacion", huella, formato), lambda: _serializar(df, formato, hoja))
+
+
+def _serializar(df: pd.DataFrame, formato: str, hoja: str) -> bytes:
+    extension, _ = FORMATOS[formato]
+    if extension == "xlsx":
+        return escribir_xlsx(df, hoja)
+    output = io.BytesIO()
+    if extension == "parquet":
+        df.to_parquet(output, index=False)
+    else:
+        df.to_csv(output, index=False, compression={"method": "gzip", "compresslevel": 6})
+    return output.getvalue()
@@ -0,0 +1,126 @@
+import copy
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from comun import artefactos
+from comun.rendimiento import medir
+
+# Shapefile de departamentos del MGN y carpeta donde se guardan las versiones simplificadas
+RUTA_SHAPES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Data", "shapes", "MGN_ANM_DPTOS.shp")
+DIRECTORIO_CACHE_GEO = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache_geo")
+CODIGO_COL = "DPTO_CCDGO"
+
+# Tolerancia de simplificación (grados WGS84) según el zoom del mapa
+TOLERANCIAS_ZOOM = {
+    5: 0.01,    # país completo
+    7: 0.003,   # región
+    9: 0.001,   # departamento
+}
+
+_geometrias = {}
+
+
+def tolerancia_para_zoom(zoom: int) -> float:
+    """
+    Devuelve la tolerancia configurada para el mayor zoom que no supere `zoom`.
+    """
+    niveles = [z for z in sorted(TOLERANCIAS_ZOOM) if z <= zoom] or [min(TOLERANCIAS_ZOOM)]
+    return TOLERANCIAS_ZOOM[niveles[-1]]
+
+
+def nombre_artefacto(tolerancia: float) -> str:
+    return f"geometria_{tolerancia:g}"
+
+
+def _ruta_cache(tolerancia: float, ruta_shp: str, directorio: str) -> str:
+    stat = os.stat(ruta_shp)
+    clave = hashlib.sha1(f"{os.path.abspath(ruta_shp)}|{stat.st_mtime_ns}|{stat.st_size}|{tolerancia}".encode())
+    return os.path.join(directorio, f"dptos_{clave.hexdigest()[:16]}.geojson")
+
+
+# ===================================================================
+# Función: preparar_geometria
+# ===================================================================
+@medir("carga", "Geometría (shapefile)")
+def preparar_geometria(tolerancia: float, ruta_shp: str = RUTA_SHAPES,
+                       directorio: str = DIRECTORIO_CACHE_GEO) -> str:
+    """
+    Lee el shapefile, lo reproyecta a WGS84, simplifica las geometrías conservando
+    los límites compartidos entre departamentos y guarda un GeoJSON compacto
+    (solo código y geometría, coordenadas con 5 decimales).
+    Returns:
+        str: Ruta del GeoJSON en caché.
+    """
+    ruta = _ruta_cache(tolerancia, ruta_shp, directorio)
+    if os.path.exists(ruta):
+        return ruta
+
+    import geopandas as gpd
+
+    gdf = gpd.read_file(ruta_shp).to_crs(epsg=4326)
+    gdf[CODIGO_COL] = gdf[CODIGO_COL].astype(str).str.zfill(2)
+    gdf = gdf[[CODIGO_COL, "geometry"]]
+
+    # simplify_coverage (geopandas >= 1.1 con shapely >= 2.1) simplifica los bordes
+    # compartidos una sola vez, sin huecos ni solapes entre departamentos
+    try:
+        gdf["geometry"] = gdf.geometry.simplify_coverage(tolerancia)
+    except (AttributeError, NotImplementedError):
+        gdf["geometry"] = gdf.geometry.simplify(tolerancia, preserve_topology=True)
+
+    os.makedirs(directorio, exist_ok=True)
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    gdf.to_file(temporal, driver="GeoJSON", COORDINATE_PRECISION=5)
+    os.replace(temporal, ruta)
+    return ruta
+
+
+# ===================================================================
+# Función: geometria_departamentos
+# ===================================================================
+def geometria_departamentos(zoom: int = 5, ruta_shp: str = RUTA_SHAPES) -> dict:
+    """
+    Devuelve el GeoJSON simplificado de los departamentos para el zoom indicado,
+    con el código del departamento como `id` de cada feature. Se lee de disco
+    una sola vez por proceso.
+    """
+    tolerancia = tolerancia_para_zoom(zoom)
+    # La versión publicada por `materializar.py` evita leer el shapefile en la app
+    version = artefactos.version_vigente("men")
+    if ruta_shp == RUTA_SHAPES and version is not None and \
+            artefactos.tiene("men", nombre_artefacto(tolerancia), version):
+        ruta = artefactos.ruta_artefacto("men", nombre_artefacto(tolerancia), version)
+    else:
+        ruta = preparar_geometria(tolerancia, ruta_shp)
+    if ruta not in _geometrias:
+        with open(ruta, encoding="utf-8") as f:
+            geojson = json.load(f)
+        for feature in geojson["features"]:
+            feature["id"] = feature["properties"][CODIGO_COL]
+        _geometrias[ruta] = geojson
+    return _geometrias[ruta]
+
+
+# ===================================================================
+# Función: adjuntar_metricas
+# ===================================================================
+def adjuntar_metricas(geojson: dict, valores: pd.DataFrame, codigo_col: str = CODIGO_COL) -> dict:
+    """
+    Copia el GeoJSON en caché agregando a las propiedades de cada feature las
+    columnas de `valores` (una fila por código de departamento). La geometría no
+    se copia: las features nuevas la comparten con la versión en caché.
+    """
+    registros = (
+        valores.astype(object).where(valores.notna(), None)
+        .set_index(codigo_col).to_dict(orient="index")
+    )
+    vacio = {col: None for col in valores.columns if col != codigo_col}
+    features = []
+    for feature in geojson["features"]:
+        nueva = copy.copy(feature)
+        nueva["properties"] = {**feature["properties"], **registros.get(feature["id"], vacio)}
+        features.append(nueva)
+    return {**geojson, "features": features}
@@ -1,73 +1,94 @@
 import streamlit as st
 import pandas as pd
-import geopandas as gpd
-import folium
-from streamlit_folium import st_folium
+import streamlit.components.v1 as components
+
+import almacen
+from geometria import CODIGO_COL, geometria_departamentos, adjuntar_metricas
+
+METRICAS_MAPA = {
+    'Cobertura Neta (%)': 'cobertura_neta',
+    'Cobertura Bruta (%)': 'cobertura_bruta',
+    'Tasa de Matriculación 5-16 (%)': 'tasa_matriculaci_n_5_16'
+}
+
+
+@st.cache_data(show_spinner=False)
+def _html_mapa_cliente(huella: str) -> str:
+    # El HTML depende solo del modelo materializado; la huella es la llave de la caché
+    from mapa_cliente import construir_mapa_cliente
+
+    metricas = {col: etiqueta for etiqueta, col in METRICAS_MAPA.items()}
+    return construir_mapa_cliente(almacen.cubo_vigente(huella), metricas)
+
 
 def show_map_tab():
     st.header("🗺️ Mapa Interactivo por Departamento")
 
-    if 'df_fact' not in st.session_state:
+    huella = st.session_state.get('huella_modelo')
+    if not almacen.existe_modelo(huella):
         st.warning("Primero debes construir la tabla de hechos en la pestaña 'Transformación y Métricas'.")
         return
 
-    df_fact = st.session_state['df_fact']
-    dim_geo = st.session_state['dim_geo']
-    dim_tiempo = st.session_state['dim_tiempo']
-
-    # Merge de tabla de hechos con dimensiones
-    df = df_fact.merge(dim_geo, on='id_geo').merge(dim_tiempo, on='id_tiempo')
+    modo = st.radio("Modo del mapa", ["Cambio en el navegador", "Clásico"], horizontal=True,
+                    help="En el modo 'Cambio en el navegador' la métrica y el año se eligen "
+                         "dentro del mapa, sin recargar la página.")
+    if modo == "Cambio en el navegador":
+        st.subheader("🧭 Indicadores por Departamento")
+        try:
+            html = _html_mapa_cliente(huella)
+        except Exception as e:
+            st.error(f"❌ Error al leer el archivo .shp: {e}")
+            return
+        components.html(html, width=750, height=550)
+        return
 
     # Selector de métrica
-    metricas = {
-        'Cobertura Neta (%)': 'cobertura_neta',
-        'Cobertura Bruta (%)': 'cobertura_bruta',
-        'Tasa de Matriculación 5-16 (%)': 'tasa_matriculaci_n_5_16'
-    }
+    metricas = METRICAS_MAPA
 
     metrica_label = st.selectbox("Selecciona la métrica", list(metricas.keys()))
     metrica_col = metricas[metrica_label]
 
     # Selector de año
-    años = sorted(df['a_o'].unique())
+    cubo = almacen.cubo_vigente(huella)
+    años = cubo.valores('a_o')
     año_sel = st.selectbox("Selecciona el año", años, index=len(años)-1)
 
-    # Agrupación por código de departamento
-    df_filtrado = df[df['a_o'] == año_sel]
+    # Promedio por código de departamento, leído del cubo precalculado
     resumen = (
-        df_filtrado
-        .groupby(['c_digo_departamento', 'departamento'])[metrica_col]
-        .mean()
-        .reset_index()
+        cubo.corte(['c_digo_departamento', 'departamento'], [metrica_col], a_o=año_sel)
         .rename(columns={'c_digo_departamento': 'codigo_departamento'})
     )
     resumen['codigo_departamento'] = resumen['codigo_departamento'].astype(str).str.zfill(2)
 
-    # Leer shapefile
+    # Geometría simplificada y reproyectada, preparada una sola vez y guardada en caché
+    zoom = 5
     try:
-        gdf = gpd.read_file("data/shapes/MGN_ANM_DPTOS.shp")
+        geojson = geometria_departamentos(zoom)
     except Exception as e:
         st.error(f"❌ Error al leer el archivo .shp: {e}")
         return
 
-    # Unir shapefile con datos
-    codigo_col = "DPTO_CCDGO"
-    gdf[codigo_col] = gdf[codigo_col].astype(str).str.zfill(2)
-    resumen[codigo_col] = resumen["codigo_departamento"]
-    gdf_merged = gdf.merge(resumen, on=codigo_col, how="left")
+    # Solo se agregan los valores de la métrica a la geometría en caché
+    codigo_col = CODIGO_COL
+    resumen = resumen.rename(columns={'codigo_departamento': codigo_col})
+    geojson_metricas = adjuntar_metricas(geojson, resumen[[codigo_col, 'departamento', metrica_col]])
 
     # Mostrar tabla para depurar
     st.write("✅ Datos combinados para el mapa:")
-    st.dataframe(gdf_merged[[codigo_col, 'departamento', metrica_col]].head())
+    st.dataframe(resumen[[codigo_col, 'departamento', metrica_col]].head())
+
+    # folium y streamlit_folium solo se cargan cuando se dibuja el mapa clásico
+    import folium
+    from streamlit_folium import st_folium
 
     # Crear mapa con estilo limpio
-    m = folium.Map(location=[4.6, -74.1], zoom_start=5, tiles="CartoDB positron")
+    m = folium.Map(location=[4.6, -74.1], zoom_start=zoom, tiles="CartoDB positron")
 
     # Coropletas
-    folium.Choropleth(
-        geo_data=gdf_merged,
+    coropletas = folium.Choropleth(
+        geo_data=geojson_metricas,
         name="choropleth",
-        data=gdf_merged,
+        data=resumen,
         columns=[codigo_col, metrica_col],
         key_on=f"feature.properties.{codigo_col}",
         fill_color="YlOrRd",
@@ -78,12 +99,9 @@ def show_map_tab():
         highlight=True
     ).add_to(m)
 
-    # Tooltips personalizados
-    folium.GeoJson(
-        gdf_merged,
-        name="Labels",
-        style_function=lambda x: {"fillColor": "transparent", "color": "transparent"},
-        tooltip=folium.GeoJsonTooltip(
+    # Tooltips personalizados sobre la misma capa, sin enviar la geometría dos veces
+    coropletas.geojson.add_child(
+        folium.GeoJsonTooltip(
             fields=["departamento", metrica_col],
             aliases=["Departamento:", f"{metrica_label}:"],
             localize=True,
@@ -96,7 +114,7 @@ def show_map_tab():
                 box-shadow: 3px;
             """
         )
-    ).add_to(m)
+    )
 
     folium.LayerControl().add_to(m)
 
@@ -0,0 +1,153 @@
+import folium
+import pandas as pd
+from branca.element import MacroElement
+from jinja2 import Template
+
+from pipeline.cubo import CuboAgregado
+from geometria import CODIGO_COL, geometria_departamentos, adjuntar_metricas
+
+# Escala YlOrRd de 6 clases (la misma paleta del mapa clásico)
+COLORES_YLORRD = ['#ffffb2', '#fed976', '#feb24c', '#fd8d3c', '#f03b20', '#bd0026']
+
+
+# ===================================================================
+# Clase: SelectorMetricaAnio
+# ===================================================================
+class SelectorMetricaAnio(MacroElement):
+    """
+    Capa GeoJSON única con todos los valores año × métrica en las propiedades de
+    cada departamento, más un control Leaflet (lista de métricas y deslizador de
+    años) que vuelve a pintar la capa en el navegador con `setStyle`, sin
+    volver a ejecutar Python ni reenviar la geometría.
+    """
+    _template = Template("""
+    {% macro script(this, kwargs) %}
+    (function() {
+        var mapa = {{ this._parent.get_name() }};
+        var datos = {{ this.geojson|tojson }};
+        var metricas = {{ this.metricas|tojson }};
+        var anios = {{ this.anios|tojson }};
+        var rangos = {{ this.rangos|tojson }};
+        var colores = {{ this.colores|tojson }};
+        var estado = {metrica: Object.keys(metricas)[0], anio: anios[anios.length - 1]};
+
+        function valor(f) {
+            var serie = f.properties.valores ? f.properties.valores[estado.metrica] : null;
+            var v = serie ? serie[estado.anio] : null;
+            return (v === undefined || v === null) ? null : v;
+        }
+        function color(v) {
+            if (v === null) { return 'lightgray'; }
+            var r = rangos[estado.metrica];
+            var t = (v - r[0]) / ((r[1] - r[0]) || 1);
+            return colores[Math.max(0, Math.min(colores.length - 1, Math.floor(t * colores.length)))];
+        }
+        function estilo(f) {
+            return {fillColor: color(valor(f)), fillOpacity: 0.75, color: '#555555', weight: 0.6, opacity: 0.3};
+        }
+
+        var capa = L.geoJson(datos, {
+            style: estilo,
+            onEachFeature: function(f, l) {
+                l.bindTooltip(function() {
+                    var v = valor(f);
+                    return '<b>Departamento:</b> ' + (f.properties.departamento || '') +
+                           '<br><b>' + metricas[estado.metrica] + ' (' + estado.anio + '):</b> ' +
+                           (v === null ? 's/d' : v.toFixed(2));
+                }, {sticky: true});
+            }
+        }).addTo(mapa);
+
+        var control = L.control({position: 'topright'});
+        control.onAdd = function() {
+            var div = L.DomUtil.create('div');
+            div.style.cssText = 'background:white;padding:8px;border-radius:4px;font:12px sans-serif;';
+            var opciones = Object.keys(metricas).map(function(m) {
+                return '<option value="' + m + '">' + metricas[m] + '</option>';
+            }).join('');
+            div.innerHTML =
+                '<select style="width:100%">' + opciones + '</select>' +
+                '<div style="margin-top:6px">Año: <b class="anio">' + estado.anio + '</b></div>' +
+                '<input type="range" style="width:100%" min="0" max="' + (anios.length - 1) +
+                '" value="' + (anios.length - 1) + '">' +
+                '<div class="leyenda" style="margin-top:4px"></div>';
+            var selector = div.querySelector('select');
+            var deslizador = div.querySelector('input');
+            var etiqueta = div.querySelector('.anio');
+            var leyenda = div.querySelector('.leyenda');
+
+            function actualizar() {
+                var r = rangos[estado.metrica];
+                leyenda.innerHTML = colores.map(function(c) {
+                    return '<span style="display:inline-block;width:16px;height:10px;background:' + c + '"></span>';
+                }).join('') + '<br>' + r[0].toFixed(1) + ' – ' + r[1].toFixed(1);
+                capa.setStyle(estilo);
+            }
+            selector.onchange = function() { estado.metrica = selector.value; actualizar(); };
+            deslizador.oninput = function() {
+                estado.anio = anios[deslizador.value];
+                etiqueta.innerHTML = estado.anio;
+                actualizar();
+            };
+            L.DomEvent.disableClickPropagation(div);
+            actualizar();
+            return div;
+        };
+        control.addTo(mapa);
+    })();
+    {% endmacro %}
+    """)
+
+    def __init__(self, geojson: dict, metricas: dict, anios: list, rangos: dict):
+        super().__init__()
+        self._name = "SelectorMetricaAnio"
+        self.geojson = geojson
+        self.metricas = metricas
+        self.anios = anios
+        self.rangos = rangos
+        self.colores = COLORES_YLORRD
+
+
+# ===================================================================
+# Función: valores_por_departamento
+# ===================================================================
+def valores_por_departamento(cubo: CuboAgregado, metricas: list[str]) -> pd.DataFrame:
+    """
+    Una fila por departamento con la columna `valores` = {métrica: {año: promedio}}.
+    """
+    tabla = cubo.rollup(['c_digo_departamento', 'departamento', 'a_o'])[metricas].reset_index()
+    tabla[CODIGO_COL] = tabla['c_digo_departamento'].astype(str).str.zfill(2)
+
+    filas = []
+    for (codigo, departamento), grupo in tabla.groupby([CODIGO_COL, 'departamento']):
+        grupo = grupo.set_index('a_o')
+        valores = {
+            m: {int(anio): float(v) for anio, v in grupo[m].items() if pd.notna(v)}
+            for m in metricas
+        }
+        filas.append({CODIGO_COL: codigo, 'departamento': departamento, 'valores': valores})
+    return pd.DataFrame(filas, columns=[CODIGO_COL, 'departamento', 'valores'])
+
+
+# ===================================================================
+# Función: construir_mapa_cliente
+# ===================================================================
+def construir_mapa_cliente(cubo: CuboAgregado, metricas: dict, zoom: int = 5) -> str:
+    """
+    Construye el HTML del mapa con cambio de métrica y año en el navegador.
+    Args:
+        metricas (dict): {columna: etiqueta} de las métricas a incluir.
+    Returns:
+        str: HTML autocontenido del mapa.
+    """
+    columnas = list(metricas)
+    valores = valores_por_departamento(cubo, columnas)
+    geojson = adjuntar_metricas(geometria_departamentos(zoom), valores)
+
+    rollup = cubo.rollup(['c_digo_departamento', 'a_o'])
+    rangos = {m: [float(rollup[m].min()), float(rollup[m].max())] for m in columnas}
+    anios = [int(a) for a in cubo.valores('a_o')]
+
+    m = folium.Map(location=[4.6, -74.1], zoom_start=zoom, tiles="CartoDB positron")
+    SelectorMetricaAnio(geojson, metricas, anios, rangos).add_to(m)
+    return m.get_root().render()
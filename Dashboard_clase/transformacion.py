@@ -1,7 +1,8 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import io
+
+import almacen
+from exportacion import FORMATOS, exportar_tabla
+from pipeline.modelo_estrella import construir_modelo_estrella
 
 # Colores institucionales
 UST_BLUE = "#002855"
@@ -52,22 +53,7 @@ def show_transform_tab():
         st.warning("🔺 Primero debes cargar los datos desde la pestaña correspondiente.")
         return
 
-    df = st.session_state['df_raw'].copy()
-
-    tabla_deptos = (
-        df.query("departamento != 'NACIONAL'")
-        [['c_digo_departamento', 'departamento']]
-        .drop_duplicates()
-        .groupby('c_digo_departamento')
-        .sample(n=1, random_state=1)
-        .reset_index(drop=True)
-    )
-
-    df = (
-        df.query("departamento != 'NACIONAL'")
-        .drop(columns='departamento')
-        .merge(tabla_deptos, on='c_digo_departamento', how='left')
-    )
+    df_raw = st.session_state['df_raw']
 
     st.markdown("### 🔧 Etapas del Flujo de Trabajo")
     etapas = [
@@ -84,61 +70,39 @@ def show_transform_tab():
     st.markdown("---")
     st.subheader("1️⃣ Limpieza y Validación de Datos")
 
-    columnas_relevantes = [
-        'a_o', 'departamento', 'municipio', 'c_digo_departamento',
-        'poblaci_n_5_16', 'tasa_matriculaci_n_5_16',
-        'cobertura_neta', 'cobertura_bruta'
-    ]
-    columnas_faltantes = [col for col in columnas_relevantes if col not in df.columns]
-    if columnas_faltantes:
-        st.error(f"❌ Columnas faltantes: {columnas_faltantes}")
-        return
+    # La pestaña de carga guarda la población del DANE como 'df_poblacion'
+    df_pob = None
+    if 'df_poblacion' in st.session_state and not st.session_state['df_poblacion'].empty:
+        df_pob = st.session_state['df_poblacion']
 
-    df = df[columnas_relevantes]
-    df.columns = [c.lower() for c in df.columns]
-    for col in df.columns:
-        if col not in ['departamento', 'municipio', 'c_digo_departamento']:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-    df_clean = df.dropna()
+    # El modelo solo se reconstruye si cambian los datos de origen
+    huella = almacen.huella_datos(df_raw, df_pob)
+    if almacen.existe_modelo(huella):
+        dim_tiempo, dim_geo, df_fact = almacen.cargar_modelo(huella)
+        registros_validos = int(almacen.leer_metadatos(huella).get('registros_validos', len(df_fact)))
+    else:
+        try:
+            modelo = construir_modelo_estrella(df_raw, df_pob)
+        except ValueError as e:
+            st.session_state.pop('huella_modelo', None)
+            st.error(f"❌ {e}")
+            return
+        dim_tiempo, dim_geo, df_fact = modelo.dim_tiempo, modelo.dim_geo, modelo.df_fact
+        registros_validos = modelo.registros_validos
+        almacen.materializar_modelo(dim_tiempo, dim_geo, df_fact, modelo.df_cubo, huella,
+                                    extra={'registros_validos': registros_validos})
+    # Las demás pestañas leen del almacén el modelo de los datos de esta sesión
+    st.session_state['huella_modelo'] = huella
 
     col1, col2 = st.columns(2)
-    col1.metric("Registros originales", len(st.session_state['df_raw']))
-    col2.metric("Registros válidos", len(df_clean))
+    col1.metric("Registros originales", len(df_raw))
+    col2.metric("Registros válidos", registros_validos)
 
     # ========= 2️⃣ Enriquecimiento con Datos del DANE =========
     st.markdown("---")
     st.subheader("2️⃣ Enriquecimiento con Datos del DANE")
 
-    if 'df_pob' in st.session_state and not st.session_state['df_pob'].empty:
-        df_pob = st.session_state['df_pob'].copy()
-
-        columnas_esperadas = ['DPNOM', 'DPMP', 'AÑO', 'Población']
-        if not all(col in df_pob.columns for col in columnas_esperadas):
-            st.error("❌ Las columnas esperadas no están presentes en el archivo de población.")
-            return
-
-        df_pob["Población"] = (
-            df_pob["Población"]
-            .astype(str)
-            .str.replace(".", "", regex=False)
-            .str.replace(",", "", regex=False)
-            .astype(float)
-        )
-
-        poblacion_agregada = df_pob.groupby(['DPNOM', 'DPMP', 'AÑO'], as_index=False)['Población'].sum()
-
-        df_enriq = df_clean.merge(
-            poblacion_agregada,
-            left_on=['departamento', 'municipio', 'a_o'],
-            right_on=['DPNOM', 'DPMP', 'AÑO'],
-            how='left'
-        )
-
-        df_enriq = df_enriq.dropna(subset=['Población'])
-        df_enriq['%_matriculados_vs_pob_total'] = (
-            df_enriq['poblaci_n_5_16'] / df_enriq['Población']) * 100
-
-        df_clean = df_enriq
+    if df_pob is not None:
         st.success("✅ Datos enriquecidos correctamente con los nombres originales.")
     else:
         st.info("ℹ️ No se han cargado datos del DANE. Puedes continuar sin el enriquecimiento.")
@@ -147,21 +111,6 @@ def show_transform_tab():
     st.markdown("---")
     st.subheader("3️⃣ Dimensiones del Modelo Estrella")
 
-    def crear_dimension(df, cols, nombre, sort_col=None):
-        dim = df[cols].drop_duplicates()
-        if sort_col:
-            dim = dim.sort_values(by=sort_col)
-        dim = dim.reset_index(drop=True)
-        dim[f"id_{nombre}"] = dim.index + 1
-        return dim[[f"id_{nombre}"] + cols]
-
-    dim_tiempo = crear_dimension(df_clean, ['a_o'], 'tiempo')
-    dim_geo = df_clean[['c_digo_departamento', 'departamento', 'municipio']].copy()
-    dim_geo = dim_geo.sort_values(by=['c_digo_departamento', 'municipio'])
-    dim_geo = dim_geo.drop_duplicates(subset=['c_digo_departamento'], keep='first').reset_index(drop=True)
-    dim_geo['id_geo'] = dim_geo.index + 1
-    dim_geo = dim_geo[['id_geo', 'c_digo_departamento', 'departamento', 'municipio']]
-
     col3, col4 = st.columns(2)
     col3.metric("Dimensión Tiempo", len(dim_tiempo))
     col4.metric("Dimensión Geográfica", len(dim_geo))
@@ -170,16 +119,6 @@ def show_transform_tab():
     st.markdown("---")
     st.subheader("4️⃣ Tabla de Hechos")
 
-    df_fact = df_clean.merge(dim_tiempo, on='a_o') \
-                      .merge(dim_geo, on=['departamento', 'municipio', 'c_digo_departamento'], how='inner')
-
-    columnas_fact = ['id_tiempo', 'id_geo', 'poblaci_n_5_16',
-                     'tasa_matriculaci_n_5_16', 'cobertura_neta', 'cobertura_bruta']
-    if '%_matriculados_vs_pob_total' in df_fact.columns:
-        columnas_fact.append('%_matriculados_vs_pob_total')
-
-    df_fact = df_fact[columnas_fact]
-
     st.success(f"✅ Tabla de hechos construida con {len(df_fact):,} registros.")
     st.session_state['df_fact'] = df_fact
     st.session_state['dim_geo'] = dim_geo
@@ -189,15 +128,19 @@ def show_transform_tab():
     st.markdown("---")
     st.subheader("5️⃣ Indicadores y Visualizaciones")
 
-    escolaridad_prom = df_fact.groupby('id_geo')[['tasa_matriculaci_n_5_16']].mean().reset_index()
-    escolaridad_prom = escolaridad_prom.merge(dim_geo, on='id_geo')
-    top_mpios = escolaridad_prom.sort_values(by='tasa_matriculaci_n_5_16', ascending=False).head(10)
+    import plotly.express as px
+
+    # Los rankings salen del cubo agregado construido junto con el modelo
+    cubo = almacen.cubo_vigente(huella)
+    n_top = st.slider("Tamaño del ranking", min_value=5, max_value=30, value=10, step=5)
+    top_mpios = cubo.ranking(['c_digo_departamento', 'departamento', 'municipio'],
+                             'tasa_matriculaci_n_5_16', n=n_top)
 
     fig = px.bar(
         top_mpios,
         x='municipio',
         y='tasa_matriculaci_n_5_16',
-        title='Top 10 Municipios con Mayor Tasa de Escolaridad (5-16 años)',
+        title=f'Top {n_top} Municipios con Mayor Tasa de Escolaridad (5-16 años)',
         labels={'tasa_matriculaci_n_5_16': 'Tasa de Escolaridad (%)'},
         color='tasa_matriculaci_n_5_16',
         color_continuous_scale=px.colors.sequential.Blues,
@@ -214,29 +157,30 @@ def show_transform_tab():
     )
     st.plotly_chart(fig, use_container_width=True)
 
-    cobertura_depto = df_fact.merge(dim_geo, on='id_geo') \
-        .groupby('departamento')['cobertura_neta'].mean().sort_values(ascending=False).head(10)
+    cobertura_depto = cubo.ranking(['departamento'], 'cobertura_neta', n=n_top)
 
     st.markdown("🏛️ **Top Departamentos por Cobertura Neta Promedio**")
-    st.dataframe(cobertura_depto.reset_index())
+    st.dataframe(cobertura_depto[['departamento', 'cobertura_neta']])
 
     # ========= 6️⃣ Descarga =========
     st.markdown("---")
     st.subheader("6️⃣ Descarga y Resumen")
 
     st.dataframe(df_fact.head(50))
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df_fact.to_excel(writer, index=False, sheet_name='TablaHechos')
-    output.seek(0)
-
-    st.download_button(
-        label="📥 Descargar Tabla de Hechos",
-        data=output,
-        file_name='tabla_hechos_educacion.xlsx',
-        mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-
-    df_fact_ext = df_fact.merge(dim_geo, on='id_geo').merge(dim_tiempo, on='id_tiempo')
-    resumen = df_fact_ext.groupby(['departamento', 'a_o'])[
-        ['tasa_matriculaci_n_5_16', 'cobertura_neta', 'cobertura_bruta']].mean().reset_index()
+
+    # El archivo solo se genera cuando se pide, y queda en caché por huella de los datos
+    formato = st.selectbox("Formato de descarga", list(FORMATOS.keys()))
+    extension, mime = FORMATOS[formato]
+    if st.button("⚙️ Preparar archivo"):
+        st.session_state['archivo_hechos'] = (huella, formato)
+
+    if st.session_state.get('archivo_hechos') == (huella, formato):
+        st.download_button(
+            label="📥 Descargar Tabla de Hechos",
+            data=exportar_tabla(df_fact, formato, huella, hoja='TablaHechos'),
+            file_name=f'tabla_hechos_educacion.{extension}',
+            mime=mime)
+
+    resumen = cubo.corte(['departamento', 'a_o'],
+                         ['tasa_matriculaci_n_5_16', 'cobertura_neta', 'cobertura_bruta'])
     st.dataframe(resumen.head(20))
\ No newline at end of file
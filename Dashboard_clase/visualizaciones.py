@@ -1,7 +1,7 @@
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
+
+import almacen
 
 def show_visualization_tab():
     st.header("📈 Visualizaciones por Departamento")
@@ -17,23 +17,23 @@ def show_visualization_tab():
     else:
         st.warning("⚠️ Base de densidad escolar NO cargada")
 
-    if 'df_fact' not in st.session_state:
+    huella = st.session_state.get('huella_modelo')
+    if not almacen.existe_modelo(huella):
         st.warning("Primero debes construir la tabla de hechos en la pestaña 'Transformación y Métricas'.")
         return
 
-    # Preparación de datos
-    df_fact = st.session_state['df_fact']
-    dim_geo = st.session_state['dim_geo']
-    dim_tiempo = st.session_state['dim_tiempo']
-    df = df_fact.merge(dim_geo, on='id_geo').merge(dim_tiempo, on='id_tiempo')
-    df.columns = [col.lower() for col in df.columns]
-    deptos = sorted(df['departamento'].unique())
+    # plotly se importa al dibujar, no al abrir la app
+    import plotly.graph_objects as go
+    import plotly.express as px
+
+    # Las series se leen del cubo agregado del modelo estrella
+    cubo = almacen.cubo_vigente(huella)
+    deptos = cubo.valores('departamento')
 
     # GRAFICO 1
     st.subheader("📊 Serie de tiempo: Tasa de Matriculación vs Cobertura Neta")
     selected_depto_1 = st.selectbox("Selecciona un departamento (Gráfico 1)", deptos)
-    df_1 = df[df['departamento'] == selected_depto_1]
-    df_1 = df_1.groupby('a_o')[['tasa_matriculaci_n_5_16', 'cobertura_neta']].mean().reset_index()
+    df_1 = cubo.corte(['a_o'], ['tasa_matriculaci_n_5_16', 'cobertura_neta'], departamento=selected_depto_1)
 
     fig1 = go.Figure()
     fig1.add_trace(go.Scatter(x=df_1['a_o'], y=df_1['tasa_matriculaci_n_5_16'],
@@ -51,14 +51,11 @@ def show_visualization_tab():
     # GRAFICO 2
     st.subheader("📊 Serie de tiempo: Cobertura Bruta vs Otra Métrica")
     selected_depto_2 = st.selectbox("Selecciona un departamento (Gráfico 2)", deptos, index=deptos.index(selected_depto_1))
-    df_2 = df[df['departamento'] == selected_depto_2].groupby('a_o')[['cobertura_bruta']].mean().reset_index()
+    df_2 = cubo.corte(['a_o'], ['cobertura_bruta', 'tasa_matriculaci_n_5_16'], departamento=selected_depto_2)
 
-    if 'repitencia_secundaria' in df.columns:
-        df_2['otra_metrica'] = df[df['departamento'] == selected_depto_2].groupby('a_o')['repitencia_secundaria'].mean().values
-        nombre_metrica = 'Repitencia secundaria'
-    else:
-        df_2['otra_metrica'] = df[df['departamento'] == selected_depto_2].groupby('a_o')['tasa_matriculaci_n_5_16'].mean().values
-        nombre_metrica = 'Tasa de Matriculación (5-16)'
+    # La tabla de hechos no incluye repitencia; se compara con la tasa de matriculación
+    df_2 = df_2.rename(columns={'tasa_matriculaci_n_5_16': 'otra_metrica'})
+    nombre_metrica = 'Tasa de Matriculación (5-16)'
 
     fig2 = go.Figure()
     fig2.add_trace(go.Scatter(x=df_2['a_o'], y=df_2['cobertura_bruta'],
@@ -75,8 +72,8 @@ def show_visualization_tab():
 
     # GRAFICOS DE POBLACION (solo si df_poblacion existe)
     if 'df_poblacion' in st.session_state:
-        df_pob = st.session_state['df_poblacion'].copy()
-        df_pob.columns = [col.lower() for col in df_pob.columns]
+        # Solo se renombran las columnas: los datos siguen siendo los compartidos
+        df_pob = st.session_state['df_poblacion'].rename(columns=str.lower, copy=False)
 
         st.subheader("🌍 Composición Urbana vs Rural - Pie Chart")
         if 'área geográfica' in df_pob.columns:
@@ -1,22 +1,44 @@
+import os
+import sys
+
 import streamlit as st
+
+# Permite importar el paquete compartido `comun` desde la raíz del repositorio
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
 from cargar_datos_secop import show_data_tab
 from transformacion_secop import show_transformations_tab 
-from visualizaciones_secop import show_visualizations_tab
+from visualizaciones_secop import show_visualizations_tab, cargar_datos_contratacion, cargar_poblacion
+from comun.precarga import iniciar_precarga, mostrar_progreso
+from comun.rendimiento import iniciar_traza, medir, mostrar_panel_rendimiento
  
 st.set_page_config(page_title="Dashboard SECOP", layout="wide")
 st.title("📊 Dashboard SECOP - Prototipo Inicial")
 
+# Cada rerun es una traza: las etapas medidas abajo quedan agrupadas en ella
+iniciar_traza()
+
+# Precarga en segundo plano de contratos y población mientras se dibuja la interfaz
+precarga = iniciar_precarga("secop", {
+    "contratacion": cargar_datos_contratacion,
+    "poblacion": cargar_poblacion,
+})
+with st.sidebar:
+    mostrar_progreso(precarga)
+
 # ✅ Agregar pestaña de Transformaciones
 tabs = st.tabs(["📋 Carga de Datos", "🔧 Transformaciones", "📈 Visualizaciones", ])
 
-with tabs[0]:
+with tabs[0], medir("render", "Pestaña Carga de Datos"):
     show_data_tab()
 
-with tabs[1]:
+with tabs[1], medir("render", "Pestaña Transformaciones"):
     show_transformations_tab() 
 
-with tabs[2]:
+with tabs[2], medir("render", "Pestaña Visualizaciones"):
     show_visualizations_tab()
 
+# Al final, cuando todas las etapas del rerun ya se midieron
+mostrar_panel_rendimiento("dashboard_secop")
+
  
 
@@ -1,32 +1,139 @@
 import streamlit as st
 import pandas as pd
 import requests
-from transformacion_secop import clean_secop_data  
+import json
+import os
+from pipeline.secop import clean_secop_data, COLUMNAS_CATEGORICAS
+from comun.socrata import cargar_dataset
+from comun.cache_compartido import CACHE_DATOS, no_vacio
+from comun.rendimiento import medir
+
+DATASET_SECOP = "rpmr-utcd"
+
+# Almacenamiento local de la sincronización incremental
+DIRECTORIO_SYNC = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache_secop")
+CAMPO_MARCA = "fecha_de_firma_del_contrato"
+CLAVE_CONTRATO = "numero_del_contrato"
 
 # ===========================================================
 # FUNCION: Cargar datos desde SECOP Integrado
 # ===========================================================
-def load_data_from_api(limit: int = 5000) -> pd.DataFrame:
+@medir("carga", "API SECOP")
+def load_data_from_api(limit: int | None = 5000, where: str | None = None,
+                       select: str | None = None) -> pd.DataFrame:
     """
     Carga datos desde la API de SECOP Integrado (datos.gov.co).
     Args:
-        limit (int): Límite de registros (por defecto 5000).
+        limit (int | None): Límite de registros (por defecto 5000). `None` carga todo.
+        where (str | None): Filtro SoQL `$where` opcional.
+        select (str | None): Columnas `$select` opcionales.
     Returns:
         pd.DataFrame: DataFrame con los datos cargados o vacío si falla.
     """
-    api_url = f"https://www.datos.gov.co/resource/rpmr-utcd.json?$limit={limit}"
     try:
-        response = requests.get(api_url)
-        response.raise_for_status()
-        data = response.json()
-        df = pd.DataFrame(data)
-        return df
+        return cargar_dataset(DATASET_SECOP, limit=limit, where=where, select=select)
     except requests.exceptions.RequestException as e:
         st.error(f"❌ Error al conectar con la API: {e}")
     except Exception as e:
         st.error(f"❌ Error inesperado: {e}")
     return pd.DataFrame()
 
+# ===========================================================
+# FUNCION: Sincronización incremental con marca de agua
+# ===========================================================
+def _rutas_sync(directorio: str) -> tuple[str, str]:
+    return (os.path.join(directorio, "estado.json"),
+            os.path.join(directorio, "secop_limpio.pkl"))
+
+def _guardar_json(datos: dict, ruta: str):
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(datos, f)
+
+def _escribir_atomico(ruta: str, escribir):
+    """
+    Ejecuta `escribir(ruta_temporal)` y reemplaza `ruta` solo si terminó bien.
+    """
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    try:
+        escribir(temporal)
+        os.replace(temporal, ruta)
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+
+def leer_estado_sync(directorio: str = DIRECTORIO_SYNC) -> dict:
+    """
+    Lee la última marca de agua guardada (campo y valor más reciente visto).
+    """
+    ruta_estado, _ = _rutas_sync(directorio)
+    if not os.path.exists(ruta_estado):
+        return {}
+    with open(ruta_estado, encoding="utf-8") as f:
+        return json.load(f)
+
+def fusionar_contratos(df_actual: pd.DataFrame, df_nuevo: pd.DataFrame) -> pd.DataFrame:
+    """
+    Une los contratos nuevos con los existentes. Si un contrato llega de nuevo se
+    conserva la versión más reciente; las filas sin número de contrato se mantienen.
+    """
+    df = pd.concat([df_actual, df_nuevo], ignore_index=True)
+    if CLAVE_CONTRATO not in df.columns:
+        return df.drop_duplicates(ignore_index=True)
+    con_numero = df[CLAVE_CONTRATO].fillna("").astype(str).str.strip() != ""
+    duplicado = df.duplicated(subset=CLAVE_CONTRATO, keep="last") & con_numero
+    return df[~duplicado].reset_index(drop=True)
+
+@medir("carga", "Sincronización SECOP")
+def sincronizar_secop(limit_inicial: int = 50000, campo_marca: str = CAMPO_MARCA,
+                      directorio: str = DIRECTORIO_SYNC,
+                      optimizar_memoria: bool = False) -> pd.DataFrame:
+    """
+    Sincroniza SECOP de forma incremental. La primera vez descarga `limit_inicial`
+    registros; las siguientes solo pide las filas con `campo_marca` igual o posterior
+    a la última marca guardada y las fusiona con el DataFrame limpio almacenado.
+    Args:
+        campo_marca (str): `fecha_de_firma_del_contrato` o el campo de sistema `:updated_at`.
+        optimizar_memoria (bool): Ver `clean_secop_data`.
+    Returns:
+        pd.DataFrame: DataFrame limpio con todos los contratos sincronizados.
+    """
+    ruta_estado, ruta_datos = _rutas_sync(directorio)
+    estado = leer_estado_sync(directorio)
+    select = ":*, *" if campo_marca.startswith(":") else None
+
+    df_actual = pd.DataFrame()
+    if estado.get("campo") == campo_marca and os.path.exists(ruta_datos):
+        df_actual = pd.read_pickle(ruta_datos)
+
+    if df_actual.empty:
+        df_nuevo = load_data_from_api(limit=limit_inicial, select=select)
+    else:
+        # Se usa ">=" para no perder contratos con la misma marca; los repetidos se deduplican
+        where = f"{campo_marca} >= '{estado['marca']}'"
+        df_nuevo = load_data_from_api(limit=None, where=where, select=select)
+
+    if df_nuevo.empty or campo_marca not in df_nuevo.columns:
+        return df_actual
+
+    # La marca se toma del texto ISO crudo antes de que la limpieza lo modifique
+    marca = df_nuevo[campo_marca].dropna().max()
+    df_limpio = fusionar_contratos(df_actual, clean_secop_data(df_nuevo, optimizar_memoria))
+    if optimizar_memoria:
+        # Al concatenar categorías distintas pandas vuelve a `object`
+        for col in COLUMNAS_CATEGORICAS:
+            if col in df_limpio.columns and df_limpio[col].dtype != "category":
+                df_limpio[col] = df_limpio[col].astype("category")
+
+    # Primero los datos y después la marca, cada uno con escritura atómica: si el
+    # proceso se cae a mitad, queda la versión anterior o una marca más vieja que
+    # los datos (se vuelven a pedir filas que ya están y se deduplican)
+    os.makedirs(directorio, exist_ok=True)
+    _escribir_atomico(ruta_datos, df_limpio.to_pickle)
+    if pd.notna(marca):
+        estado = {"campo": campo_marca, "marca": marca, "registros": len(df_limpio)}
+        _escribir_atomico(ruta_estado, lambda ruta: _guardar_json(estado, ruta))
+    return df_limpio
+
 # ===========================================================
 # FUNCION: Mostrar pestaña de carga de datos
 # ===========================================================
@@ -41,10 +148,9 @@ def show_data_tab():
 
     if st.button("🔄 Cargar datos"):
         with st.spinner("Cargando datos desde la API de SECOP..."):
-            df_raw = load_data_from_api(limit=5000)  # ✅ Límite ajustado
+            df_clean = get_df_raw(limit=5000, optimizar_memoria=True)  # ✅ Límite ajustado
 
-        if not df_raw.empty:
-            df_clean = clean_secop_data(df_raw)
+        if not df_clean.empty:
             st.session_state['df_raw'] = df_clean
             st.success(f"✅ ¡Datos cargados exitosamente! ({len(df_clean)} filas)")
             st.dataframe(df_clean.head(10))
@@ -56,10 +162,21 @@ def show_data_tab():
 # ===========================================================
 # FUNCION: Obtener df_raw limpio para usar en otras partes
 # ===========================================================
-def get_df_raw(limit: int = 5000) -> pd.DataFrame:
-    df = load_data_from_api(limit)
-    if not df.empty:
-        return clean_secop_data(df)
-    else:
-        return pd.DataFrame()
+def get_df_raw(limit: int = 5000, incremental: bool = False,
+               optimizar_memoria: bool = False) -> pd.DataFrame:
+    """
+    Devuelve los contratos limpios. El resultado se comparte entre sesiones
+    (caché del proceso con TTL), por lo que no debe modificarse en el lugar.
+    """
+    def cargar():
+        if incremental:
+            return sincronizar_secop(limit_inicial=limit, optimizar_memoria=optimizar_memoria)
+        df = load_data_from_api(limit)
+        if not df.empty:
+            return clean_secop_data(df, optimizar_memoria)
+        else:
+            return pd.DataFrame()
+
+    return CACHE_DATOS.obtener(("secop", limit, incremental, optimizar_memoria), cargar,
+                               guardar_si=no_vacio)
 
@@ -0,0 +1,116 @@
+import pandas as pd
+import requests
+from typing import Callable
+
+from comun.socrata import BASE_URL, consultar_agregado
+from comun.rendimiento import medir
+from pipeline.normalizacion import normalizar_departamentos, aplicar_por_valores_unicos, estandarizar_texto
+
+DATASET_SECOP = "rpmr-utcd"
+ANIO_DESDE = 2018
+
+# ===========================================================
+# Consolidación común (servidor y local)
+# ===========================================================
+def _consolidar_departamentos(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normaliza los nombres y vuelve a sumar: varias grafías del servidor pueden
+    corresponder al mismo departamento.
+    """
+    df = df[df['departamento_entidad'].notna()].copy()
+    df['departamento_entidad'] = normalizar_departamentos(df['departamento_entidad']).astype(str)
+    return df.groupby('departamento_entidad', as_index=False)['num_contratos'].sum()
+
+def _consolidar_tipos(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    df['tipo_de_contrato'] = aplicar_por_valores_unicos(df['tipo_de_contrato'], estandarizar_texto, categorica=False)
+    df = df.groupby(['anio_mes', 'tipo_de_contrato'], as_index=False)['valor_contrato'].sum()
+    return df[df['anio_mes'].dt.year >= ANIO_DESDE].reset_index(drop=True)
+
+# ===========================================================
+# Contratos para las visualizaciones
+# ===========================================================
+def preparar_contratacion(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convierte la fecha de inicio de ejecución y ordena por ella. Devuelve un
+    DataFrame nuevo: el original puede estar compartido entre sesiones.
+    """
+    if 'fecha_inicio_ejecuci_n' in df.columns:
+        df = df.assign(fecha_inicio_ejecuci_n=pd.to_datetime(df['fecha_inicio_ejecuci_n'], errors='coerce'))
+        df = df.sort_values(by='fecha_inicio_ejecuci_n')
+    return df
+
+# ===========================================================
+# Agregaciones en el servidor (SoQL)
+# ===========================================================
+def contratos_por_departamento_api(base_url: str = BASE_URL) -> pd.DataFrame:
+    """
+    Número de contratos por departamento sobre todo SECOP Integrado.
+    """
+    df = consultar_agregado(
+        DATASET_SECOP,
+        select="departamento_entidad, count(*) AS num_contratos",
+        group="departamento_entidad",
+        base_url=base_url
+    )
+    if df.empty:
+        return pd.DataFrame(columns=['departamento_entidad', 'num_contratos'])
+    df['num_contratos'] = pd.to_numeric(df['num_contratos'], errors='coerce').fillna(0).astype(int)
+    return _consolidar_departamentos(df)
+
+def valor_mensual_por_tipo_api(base_url: str = BASE_URL) -> pd.DataFrame:
+    """
+    Valor contratado por mes de inicio de ejecución y tipo de contrato.
+    """
+    df = consultar_agregado(
+        DATASET_SECOP,
+        select="date_trunc_ym(fecha_inicio_ejecuci_n) AS anio_mes, tipo_de_contrato, "
+               "sum(valor_contrato) AS valor_contrato",
+        where=f"fecha_inicio_ejecuci_n >= '{ANIO_DESDE}-01-01T00:00:00'",
+        group="anio_mes, tipo_de_contrato",
+        base_url=base_url
+    )
+    if df.empty:
+        return pd.DataFrame(columns=['anio_mes', 'tipo_de_contrato', 'valor_contrato'])
+    df['anio_mes'] = pd.to_datetime(df['anio_mes'], errors='coerce')
+    df['valor_contrato'] = pd.to_numeric(df['valor_contrato'], errors='coerce')
+    return _consolidar_tipos(df[df['anio_mes'].notna()])
+
+# ===========================================================
+# Agregaciones locales (respaldo sin conexión)
+# ===========================================================
+def contratos_por_departamento_local(df_raw: pd.DataFrame) -> pd.DataFrame:
+    df = df_raw[['departamento_entidad']].copy()
+    df['num_contratos'] = 1
+    return _consolidar_departamentos(df)
+
+def valor_mensual_por_tipo_local(df_raw: pd.DataFrame) -> pd.DataFrame:
+    df = df_raw[['fecha_inicio_ejecuci_n', 'tipo_de_contrato', 'valor_contrato']].copy()
+    df['fecha_inicio_ejecuci_n'] = pd.to_datetime(df['fecha_inicio_ejecuci_n'], errors='coerce')
+    df = df[df['fecha_inicio_ejecuci_n'].notna()]
+    df['anio_mes'] = df['fecha_inicio_ejecuci_n'].dt.to_period('M').dt.to_timestamp()
+    return _consolidar_tipos(df)
+
+# ===========================================================
+# Punto de entrada con respaldo
+# ===========================================================
+@medir("agregación", "Agregados SECOP")
+def agregados_secop(cargar_local: Callable[[], pd.DataFrame], usar_servidor: bool = True,
+                    base_url: str = BASE_URL) -> tuple[pd.DataFrame, pd.DataFrame, str]:
+    """
+    Calcula los agregados de las gráficas de SECOP. Primero intenta la consulta
+    SoQL en el servidor; si falla (sin conexión, error HTTP) usa pandas sobre los
+    datos locales que devuelve `cargar_local`.
+    Returns:
+        tuple: (contratos por departamento, valor mensual por tipo, origen)
+               donde origen es "servidor" o "local".
+    """
+    if usar_servidor:
+        try:
+            return (contratos_por_departamento_api(base_url),
+                    valor_mensual_por_tipo_api(base_url),
+                    "servidor")
+        except (requests.exceptions.RequestException, ValueError, KeyError):
+            pass
+    df_raw = cargar_local()
+    return contratos_por_departamento_local(df_raw), valor_mensual_por_tipo_local(df_raw), "local"
@@ -0,0 +1,111 @@
+import io
+import json
+from functools import wraps
+
+import pandas as pd
+
+from comun.cache_compartido import CACHE_DATOS
+from comun.rendimiento import medir
+from pipeline.huella import huella_dataframe
+
+# ---------- Caché de figuras por huella de los datos ----------
+def cache_figura(funcion):
+    """
+    Guarda el resultado de `funcion(df, **opciones)` en la caché compartida del
+    proceso (LRU acotada en memoria, con candado), según la huella del DataFrame
+    de entrada. Mientras el agregado no cambie, volver a ejecutar la pestaña no
+    vuelve a construir la figura.
+    """
+    @wraps(funcion)
+    def envoltura(df: pd.DataFrame, **opciones):
+        clave = ("figura", funcion.__name__, huella_dataframe(df), tuple(sorted(opciones.items())))
+        return CACHE_DATOS.obtener(clave, lambda: funcion(df, **opciones))
+    return envoltura
+
+def _registros(df: pd.DataFrame) -> list[dict]:
+    # to_json convierte fechas a ISO y NaN a null, como espera Vega-Lite
+    return json.loads(df.to_json(orient="records", date_format="iso"))
+
+# ---------- Especificaciones Vega-Lite (se dibujan en el navegador) ----------
+@cache_figura
+def barras_top(df: pd.DataFrame, x: str, y: str, titulo: str, eje_x: str, eje_y: str) -> dict:
+    return {
+        "title": titulo,
+        "data": {"values": _registros(df[[x, y]])},
+        "mark": "bar",
+        "encoding": {
+            "x": {"field": x, "type": "quantitative", "title": eje_x},
+            "y": {"field": y, "type": "nominal", "sort": "-x", "title": eje_y},
+            "color": {"field": x, "type": "quantitative", "scale": {"scheme": "viridis"}, "legend": None},
+            "tooltip": [{"field": y}, {"field": x, "format": ",.2f"}]
+        }
+    }
+
+@cache_figura
+def dispersion(df: pd.DataFrame, x: str, y: str, titulo: str, eje_x: str, eje_y: str,
+               etiqueta: str = None) -> dict:
+    tooltip = [{"field": x, "format": ","}, {"field": y, "format": ","}]
+    if etiqueta:
+        tooltip.insert(0, {"field": etiqueta})
+    return {
+        "title": titulo,
+        "data": {"values": _registros(df[[c for c in (etiqueta, x, y) if c]])},
+        "mark": {"type": "point", "filled": True},
+        "encoding": {
+            "x": {"field": x, "type": "quantitative", "title": eje_x},
+            "y": {"field": y, "type": "quantitative", "title": eje_y},
+            "tooltip": tooltip
+        }
+    }
+
+@cache_figura
+def lineas(df: pd.DataFrame, x: str, y: str, color: str, titulo: str, eje_x: str, eje_y: str,
+           titulo_color: str) -> dict:
+    return {
+        "title": titulo,
+        "data": {"values": _registros(df[[x, y, color]])},
+        "mark": {"type": "line", "point": True},
+        "encoding": {
+            "x": {"field": x, "type": "temporal", "title": eje_x},
+            "y": {"field": y, "type": "quantitative", "title": eje_y},
+            "color": {"field": color, "type": "nominal", "title": titulo_color},
+            "tooltip": [{"field": color}, {"field": x, "type": "temporal"}, {"field": y, "format": ",.0f"}]
+        }
+    }
+
+# ---------- Imagen PNG con matplotlib (figura cerrada al terminar) ----------
+@medir("render", "Figura PNG (matplotlib)")
+@cache_figura
+def png_matplotlib(df: pd.DataFrame, tipo: str, x: str, y: str, titulo: str, eje_x: str, eje_y: str,
+                   color: str = None, ancho: float = 10, alto: float = 6) -> bytes:
+    """
+    Dibuja la figura con seaborn y devuelve los bytes PNG. La figura se cierra
+    explícitamente para que no se acumule en el registro de pyplot.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    sns.set_theme(style="whitegrid")
+    fig, ax = plt.subplots(figsize=(ancho, alto))
+    try:
+        if tipo == "barras":
+            sns.barplot(data=df, x=x, y=y, hue=y, palette='viridis', legend=False, ax=ax)
+        elif tipo == "dispersion":
+            sns.scatterplot(data=df, x=x, y=y, ax=ax)
+            ax.grid(True)
+        elif tipo == "lineas":
+            sns.lineplot(data=df, x=x, y=y, hue=color, marker='o', ax=ax)
+            ax.legend(title='Tipo de contrato', bbox_to_anchor=(1.05, 1), loc='upper left')
+            ax.tick_params(axis='x', rotation=45)
+        else:
+            raise ValueError(f"Tipo de gráfico no soportado: {tipo}")
+        ax.set_title(titulo)
+        ax.set_xlabel(eje_x)
+        ax.set_ylabel(eje_y)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png", bbox_inches="tight", dpi=100)
+        return buffer.getvalue()
+    finally:
+        plt.close(fig)
@@ -0,0 +1,181 @@
+import argparse
+import os
+from collections import deque
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from pipeline.secop import clean_secop_data, hash_contratos
+from comun.socrata import iterar_paginas
+
+DATASET_SECOP = "rpmr-utcd"
+TAMANO_LOTE = 50000
+MAX_HASHES = 2_000_000
+
+# ===========================================================
+# Fuentes de lotes
+# ===========================================================
+def leer_lotes_csv(ruta: str, tamano: int = TAMANO_LOTE) -> Iterator[pd.DataFrame]:
+    """
+    Lee un CSV de SECOP (por ejemplo `Codigos/df_secop.csv`) por bloques.
+    Todo se lee como texto, igual que llega desde la API.
+    """
+    yield from pd.read_csv(ruta, dtype=str, chunksize=tamano)
+
+def leer_lotes_api(limit: Optional[int] = None, tamano: int = TAMANO_LOTE) -> Iterator[pd.DataFrame]:
+    """
+    Lee SECOP Integrado desde la API página por página.
+    """
+    yield from iterar_paginas(DATASET_SECOP, limit=limit, page_size=tamano)
+
+# ===========================================================
+# Deduplicación entre lotes con memoria acotada
+# ===========================================================
+class ConjuntoHashesAcotado:
+    """
+    Conjunto de hashes de 64 bits con capacidad máxima. Al llenarse olvida los
+    hashes más antiguos, así que solo se detectan duplicados dentro de una
+    ventana de `capacidad` contratos.
+    """
+
+    def __init__(self, capacidad: int = MAX_HASHES):
+        self.capacidad = capacidad
+        self._vistos = set()
+        self._orden = deque()
+
+    def __len__(self):
+        return len(self._vistos)
+
+    def filtrar_nuevos(self, hashes: np.ndarray) -> np.ndarray:
+        """
+        Devuelve una máscara con True para los hashes no vistos antes (ni en el
+        mismo lote) y los registra.
+        """
+        nuevos = np.zeros(len(hashes), dtype=bool)
+        for i, h in enumerate(hashes.tolist()):
+            if h in self._vistos:
+                continue
+            nuevos[i] = True
+            self._vistos.add(h)
+            self._orden.append(h)
+            if len(self._orden) > self.capacidad:
+                self._vistos.discard(self._orden.popleft())
+        return nuevos
+
+# ===========================================================
+# Limpieza por lotes
+# ===========================================================
+def limpiar_lotes(lotes: Iterable[pd.DataFrame], max_hashes: int = MAX_HASHES,
+                  optimizar_memoria: bool = True, estadisticas: Optional[dict] = None) -> Iterator[pd.DataFrame]:
+    """
+    Aplica `clean_secop_data` a cada lote y elimina los contratos ya vistos en
+    lotes anteriores.
+    Args:
+        estadisticas (dict | None): Si se pasa, se actualiza con filas leídas,
+            filas entregadas y duplicados descartados.
+    """
+    vistos = ConjuntoHashesAcotado(max_hashes)
+    if estadisticas is None:
+        estadisticas = {}
+    estadisticas.update({"lotes": 0, "filas_leidas": 0, "filas_limpias": 0, "duplicados": 0})
+
+    for lote in lotes:
+        estadisticas["lotes"] += 1
+        estadisticas["filas_leidas"] += len(lote)
+        if lote.empty:
+            continue
+        limpio = clean_secop_data(lote, optimizar_memoria)
+        nuevos = vistos.filtrar_nuevos(hash_contratos(limpio).to_numpy())
+        limpio = limpio[nuevos]
+        estadisticas["duplicados"] += len(lote) - len(limpio)
+        estadisticas["filas_limpias"] += len(limpio)
+        if not limpio.empty:
+            yield limpio
+
+# ===========================================================
+# Escritura particionada por año y departamento
+# ===========================================================
+def agregar_particiones(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Agrega las columnas de partición `anio` (año de firma) y `departamento`.
+    """
+    fecha = pd.to_datetime(df.get('fecha_de_firma_del_contrato'), errors='coerce')
+    anio = pd.Series(fecha, index=df.index).dt.year
+    df = df.assign(
+        anio=anio.astype("Int64").astype(str).replace("<NA>", "sin_anio"),
+        departamento=df.get('departamento_entidad', pd.Series("", index=df.index))
+        .astype(str).replace("", "sin_departamento")
+    )
+    return df
+
+def _tipo_estable(serie: pd.Series) -> pa.DataType:
+    # Los tipos compactos cambian de un lote a otro (int16 / int32 / float64,
+    # índices de categorías); el archivo usa uno que sirva para todos
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return pa.timestamp('ns')
+    if pd.api.types.is_bool_dtype(serie):
+        return pa.bool_()
+    if pd.api.types.is_numeric_dtype(serie):
+        return pa.float64()
+    return pa.string()
+
+def esquema_particionado(df: pd.DataFrame) -> pa.Schema:
+    """
+    Esquema fijo del dataset, deducido del primer lote: numéricos en float64,
+    fechas en timestamp y el resto (texto, categorías) como string.
+    """
+    return pa.schema([(col, _tipo_estable(df[col])) for col in df.columns])
+
+def escribir_particionado(lotes: Iterable[pd.DataFrame], directorio: str) -> int:
+    """
+    Escribe cada lote limpio en un dataset Parquet particionado
+    `anio=<año>/departamento=<nombre>/`. Cada lote agrega archivos nuevos,
+    así que la memoria usada no depende del tamaño total.
+
+    Todos los archivos comparten el esquema del primer lote para que el dataset
+    se pueda leer completo; las columnas que falten en un lote quedan nulas y
+    las que no estaban en el primero se descartan.
+    Returns:
+        int: Número de filas escritas.
+    """
+    os.makedirs(directorio, exist_ok=True)
+    esquema = None
+    filas = 0
+    for lote in lotes:
+        lote = agregar_particiones(lote)
+        if esquema is None:
+            esquema = esquema_particionado(lote)
+        lote.reindex(columns=esquema.names).to_parquet(
+            directorio, partition_cols=['anio', 'departamento'], index=False, schema=esquema
+        )
+        filas += len(lote)
+    return filas
+
+def procesar_secop_por_lotes(lotes: Iterable[pd.DataFrame], directorio: str,
+                             max_hashes: int = MAX_HASHES) -> dict:
+    """
+    Pipeline completo: lotes crudos -> limpieza -> deduplicación -> Parquet particionado.
+    Returns:
+        dict: Estadísticas del proceso.
+    """
+    estadisticas = {}
+    escribir_particionado(limpiar_lotes(lotes, max_hashes, estadisticas=estadisticas), directorio)
+    return estadisticas
+
+# ---------- Ejecutar ----------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Limpieza de SECOP por lotes con memoria acotada")
+    parser.add_argument("salida", help="Carpeta de salida del dataset particionado")
+    parser.add_argument("--csv", help="CSV de entrada; si no se indica se usa la API")
+    parser.add_argument("--limite", type=int, default=None, help="Máximo de registros desde la API")
+    parser.add_argument("--tamano-lote", type=int, default=TAMANO_LOTE)
+    parser.add_argument("--max-hashes", type=int, default=MAX_HASHES)
+    args = parser.parse_args()
+
+    if args.csv:
+        fuente = leer_lotes_csv(args.csv, args.tamano_lote)
+    else:
+        fuente = leer_lotes_api(args.limite, args.tamano_lote)
+    print(procesar_secop_por_lotes(fuente, args.salida, args.max_hashes))
@@ -0,0 +1,41 @@
+import os
+import pandas as pd
+
+from comun.cache_columnar import leer_excels_cacheados
+from pipeline.normalizacion import catalogo_departamentos, normalizar_departamentos
+from pipeline.poblacion import COLUMNAS_DANE, IndicePoblacion, indice_poblacion
+
+DIRECTORIO_DATOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Datos")
+ARCHIVOS_POBLACION = [
+    os.path.join(DIRECTORIO_DATOS, "Info_2005_2019.xlsx"),
+    os.path.join(DIRECTORIO_DATOS, "Info_2020_2035.xlsx"),
+]
+
+# ---------- Índice de población del DANE (sin Streamlit) ----------
+def cargar_indice_poblacion(rutas: list[str] = ARCHIVOS_POBLACION) -> IndicePoblacion:
+    """
+    Construye el índice de población total (área 'Total') con todas las
+    proyecciones del DANE. Los libros se leen en paralelo y ya filtrados, y los
+    números se parsean una sola vez al construir el índice.
+    """
+    hojas = leer_excels_cacheados(rutas, columns=COLUMNAS_DANE, filtros={'ÁREA GEOGRÁFICA': ['Total']})
+    return indice_poblacion(*hojas)
+
+
+def catalogo_poblacion(indice: IndicePoblacion) -> dict:
+    """
+    Catálogo nombre de departamento normalizado -> código DANE, para cruzar SECOP.
+    """
+    deptos = indice.departamentos
+    return catalogo_departamentos(deptos.assign(departamento_entidad=normalizar_departamentos(deptos['DPNOM'])))
+
+
+# ---------- Población total por municipio y año (sin Streamlit) ----------
+def cargar_poblacion_total(rutas: list[str] = ARCHIVOS_POBLACION) -> pd.DataFrame:
+    """
+    Población del área geográfica 'total' por municipio y año, con el nombre
+    de departamento normalizado para los cruces con SECOP.
+    """
+    df_pob = cargar_indice_poblacion(rutas).tabla(area='total')
+    df_pob['departamento_entidad'] = normalizar_departamentos(df_pob['DPNOM'])
+    return df_pob
@@ -1,108 +1,176 @@
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import streamlit as st
-from scipy.stats import pearsonr
 from cargar_datos_secop import get_df_raw
-import unidecode
-import re
+from comun import artefactos
+from comun.cache_compartido import CACHE_DATOS, TTL_POR_DEFECTO
+from comun.memoria_compartida import dataframe_compartido, version_por_tiempo
+from comun.precarga import mostrar_progreso, precarga_de
+from pipeline.normalizacion import codificar_departamentos
+from pipeline.poblacion import TOTAL_DEPARTAMENTO, IndicePoblacion
+from pipeline.ranking import top_n
+from poblacion import cargar_indice_poblacion, catalogo_poblacion
+from consultas_secop import agregados_secop, preparar_contratacion
+import graficos_secop
 
 # ---------- Configuración ----------
 st.set_page_config(page_title="Visualización de Contratación Pública", layout="wide")
-sns.set(style="whitegrid")
-
-# ---------- Normalización y correcciones ----------
-def normalizar_departamento(nombre):
-    if pd.isna(nombre):
-        return ""
-    nombre = unidecode.unidecode(nombre.lower().strip())
-    nombre = re.sub(r"[-_\.]", " ", nombre)
-    nombre = re.sub(r"\s+", " ", nombre)
-    return nombre
-
-def corregir_alias_departamento(nombre):
-    alias_dict = {
-        "bogota dc": "bogota",
-        "distrito capital de bogota": "bogota",
-        "san andres providencia y santa catalina": "san andres",
-        "no definido": "sin_departamento"
-    }
-    return alias_dict.get(nombre, nombre)
 
 # ---------- Cache de carga de datos ----------
-@st.cache_data
+# Los contratos viven en memoria compartida por todos los workers del nodo (solo
+# lectura) y el índice de población en la caché del proceso; cada sesión recibe
+# la misma referencia, así que aquí no se modifican en el lugar.
+# Si `materializar.py` publicó artefactos de SECOP, solo se leen; si no, se calculan aquí.
+# La versión vigente se resuelve una vez por carga, para que una publicación a
+# mitad de camino no mezcle versiones.
 def cargar_datos_contratacion():
-    df = get_df_raw(limit=50000)
-    if 'fecha_inicio_ejecuci_n' in df.columns:
-        df['fecha_inicio_ejecuci_n'] = pd.to_datetime(df['fecha_inicio_ejecuci_n'], errors='coerce')
-        df = df.sort_values(by='fecha_inicio_ejecuci_n')
-    return df
+    version = artefactos.version_vigente("secop")
+    if version is not None and artefactos.tiene("secop", "contratacion", version):
+        return artefactos.leer_tabla("secop", "contratacion", version)
+    return dataframe_compartido(
+        "secop-contratacion", version_por_tiempo(TTL_POR_DEFECTO),
+        lambda: preparar_contratacion(get_df_raw(limit=50000, incremental=True, optimizar_memoria=True))
+    )
 
-@st.cache_data
 def cargar_poblacion():
-    df_2005_2019 = pd.read_excel("../Datos/Info_2005_2019.xlsx")
-    df_2020_2035 = pd.read_excel("../Datos/Info_2020_2035.xlsx")
-    df_pob = pd.concat([df_2005_2019, df_2020_2035], ignore_index=True)
-    df_pob = df_pob[df_pob['ÁREA GEOGRÁFICA'].str.lower() == 'total']
-    df_pob = df_pob[df_pob['AÑO'].notna()]
-    df_pob['AÑO'] = df_pob['AÑO'].astype(int)
-    df_pob['departamento_entidad'] = df_pob['DPNOM'].apply(normalizar_departamento).apply(corregir_alias_departamento)
-    return df_pob
+    version = artefactos.version_vigente("secop")
+    if version is not None and artefactos.tiene("secop", "poblacion_dane", version):
+        return CACHE_DATOS.obtener(("dane", "indice_poblacion", version),
+                                   lambda: IndicePoblacion(artefactos.leer_tabla("secop", "poblacion_dane", version)))
+    return CACHE_DATOS.obtener(("dane", "indice_poblacion"), cargar_indice_poblacion)
+
+@st.cache_data(ttl=3600, show_spinner="Calculando agregados de SECOP...")
+def _agregar_en_vivo(usar_servidor: bool):
+    return agregados_secop(cargar_datos_contratacion, usar_servidor)
+
+def origen_publicado(usar_servidor: bool = True, version: str = None):
+    # Los agregados del servidor solo existen si datos.gov.co respondió al materializar
+    for origen in (["servidor"] if usar_servidor else []) + ["local"]:
+        if artefactos.tiene("secop", f"por_departamento_{origen}", version):
+            return origen
+    return None
+
+def agregar_contratacion(usar_servidor: bool = True):
+    version = artefactos.version_vigente("secop")
+    origen = origen_publicado(usar_servidor, version) if version is not None else None
+    if origen is not None:
+        return (artefactos.leer_tabla("secop", f"por_departamento_{origen}", version),
+                artefactos.leer_tabla("secop", f"evolucion_{origen}", version), origen)
+    return _agregar_en_vivo(usar_servidor)
+
+def precargas_necesarias(usar_servidor: bool) -> list[str]:
+    """
+    Tareas de la precarga que la pestaña necesita según de dónde salen los datos:
+    con artefactos publicados o con agregación en el servidor no hace falta
+    esperar los contratos (sin conexión se cargan al momento del respaldo local).
+    """
+    necesarias = []
+    if origen_publicado(usar_servidor) is None and not usar_servidor:
+        necesarias.append("contratacion")
+    if not artefactos.tiene("secop", "poblacion_dane"):
+        necesarias.append("poblacion")
+    return necesarias
+
+# ---------- Renderizado de gráficos ----------
+def mostrar_grafico(tipo: str, df: pd.DataFrame, motor: str, x: str, y: str, titulo: str,
+                    eje_x: str, eje_y: str, color: str = None):
+    """
+    Dibuja un gráfico con el motor elegido. Las especificaciones Vega-Lite y los
+    PNG quedan en caché por la huella del agregado, y las figuras de matplotlib se
+    cierran al generarse.
+    """
+    if motor.startswith("Imagen"):
+        ancho, alto = (14, 7) if tipo == "lineas" else (10, 6)
+        st.image(graficos_secop.png_matplotlib(df, tipo=tipo, x=x, y=y, titulo=titulo, eje_x=eje_x,
+                                               eje_y=eje_y, color=color, ancho=ancho, alto=alto),
+                 use_container_width=True)
+        return
+
+    if tipo == "barras":
+        spec = graficos_secop.barras_top(df, x=x, y=y, titulo=titulo, eje_x=eje_x, eje_y=eje_y)
+    elif tipo == "dispersion":
+        spec = graficos_secop.dispersion(df, x=x, y=y, titulo=titulo, eje_x=eje_x, eje_y=eje_y,
+                                         etiqueta='departamento_entidad')
+    else:
+        spec = graficos_secop.lineas(df, x=x, y=y, color=color, titulo=titulo, eje_x=eje_x,
+                                     eje_y=eje_y, titulo_color="Tipo de contrato")
+    st.vega_lite_chart(spec, use_container_width=True)
 
 # ---------- Visualización ----------
 def show_visualizations_tab():
     st.header("📊 Visualizaciones de contratación pública")
 
-    df_raw = cargar_datos_contratacion()
-    df_pob = cargar_poblacion()
+    usar_servidor = st.toggle(
+        "Calcular sobre todo SECOP Integrado (agregación en el servidor)", value=True,
+        help="Envía consultas SoQL con count(*) y sum() a datos.gov.co. Sin conexión se usa la muestra local."
+    )
+
+    # Mientras la precarga de lo que se va a usar no termine, la pestaña muestra
+    # el avance en lugar de bloquearse
+    precarga = precarga_de("secop")
+    necesarias = precargas_necesarias(usar_servidor)
+    if necesarias and not mostrar_progreso(precarga, *necesarias,
+                                           texto="⏳ Precargando contratos y población"):
+        return
+    errores = precarga.errores() if precarga is not None else {}
+    for nombre in necesarias:
+        if nombre in errores:
+            st.warning(f"⚠️ Falló la precarga de '{nombre}' ({type(errores[nombre]).__name__}: "
+                       f"{errores[nombre]}); se intenta cargar de nuevo.")
+
+    df_contratos_por_dep, df_evol, origen = agregar_contratacion(usar_servidor)
+    if usar_servidor and origen == "local":
+        st.info("ℹ️ No fue posible consultar el servidor; se usan los datos cargados localmente.")
+    indice_pob = cargar_poblacion()
+    motor = st.radio("Motor de gráficos", ["Vega-Lite (interactivo)", "Imagen PNG (matplotlib)"],
+                     horizontal=True)
 
     # ---------- Tasa de contratos por 1.000 habitantes ----------
     st.subheader("🏙️ ¿Qué departamentos presentan mayor tasa de contratos por cada 1.000 habitantes?")
 
-    año_reciente = df_pob['AÑO'].max()
-    df_pob_dep = df_pob[df_pob['AÑO'] == año_reciente].groupby('departamento_entidad', as_index=False)['Población'].sum()
+    año_reciente = int(indice_pob.anios.max())
 
-    df_contratos = df_raw.copy()
-    df_contratos = df_contratos[df_contratos['departamento_entidad'].notna()]
-    df_contratos['departamento_entidad'] = (
-        df_contratos['departamento_entidad'].apply(normalizar_departamento).apply(corregir_alias_departamento)
+    # El cruce se hace por el código entero del DANE, no por el nombre: una
+    # consulta por lotes al índice de población departamental del último año
+    codigos = codificar_departamentos(df_contratos_por_dep['departamento_entidad'], catalogo_poblacion(indice_pob))
+    df_tasa = df_contratos_por_dep.assign(
+        codigo_departamento=codigos,
+        **{'Población': indice_pob.buscar(codigos, TOTAL_DEPARTAMENTO, año_reciente)}
     )
-
-    df_contratos_por_dep = df_contratos.groupby('departamento_entidad', as_index=False).size()
-    df_contratos_por_dep.rename(columns={'size': 'num_contratos'}, inplace=True)
-
-    df_tasa = pd.merge(df_contratos_por_dep, df_pob_dep, on='departamento_entidad', how='left')
     df_tasa['contratos_por_1000_hab'] = (df_tasa['num_contratos'] / df_tasa['Población']) * 1000
 
     # ⚠️ Diagnóstico de departamentos sin población cruzada
     # st.dataframe(df_tasa[df_tasa['Población'].isna()][['departamento_entidad', 'num_contratos']])
 
     # 📋 Mostrar tabla completa
-    st.markdown("📋 **Ranking completo por tasa de contratación**")
-    st.dataframe(df_tasa.sort_values(by='contratos_por_1000_hab', ascending=False), use_container_width=True)
+    # La tabla se ordena en el navegador al hacer clic en una columna; en Python
+    # solo se seleccionan las 10 primeras para la gráfica (selección parcial)
+    st.markdown("📋 **Tasa de contratación por departamento** (haz clic en una columna para ordenar)")
+    st.dataframe(df_tasa, use_container_width=True)
 
     # 📊 Top 10 en gráfica
-    df_top = df_tasa.sort_values(by='contratos_por_1000_hab', ascending=False).head(10)
-    fig1, ax1 = plt.subplots(figsize=(10, 6))
-    sns.barplot(data=df_top, x='contratos_por_1000_hab', y='departamento_entidad', palette='viridis', ax=ax1)
-    ax1.set_title("Top 10 departamentos con mayor tasa de contratación por 1.000 habitantes")
-    ax1.set_xlabel("Contratos por cada 1.000 habitantes")
-    ax1.set_ylabel("Departamento")
-    st.pyplot(fig1)
+    df_top = top_n(df_tasa, 'contratos_por_1000_hab', 10)
+    mostrar_grafico(
+        "barras", df_top, motor, x='contratos_por_1000_hab', y='departamento_entidad',
+        titulo="Top 10 departamentos con mayor tasa de contratación por 1.000 habitantes",
+        eje_x="Contratos por cada 1.000 habitantes", eje_y="Departamento"
+    )
 
     # ---------- Correlación población vs contratos ----------
     st.subheader("📈 ¿Se corresponde el volumen de contratación con la población?")
-    df_correl = pd.merge(df_contratos_por_dep, df_pob_dep, on='departamento_entidad', how='inner')
+    df_correl = df_tasa.dropna(subset=['Población'])
 
-    fig2, ax2 = plt.subplots(figsize=(10, 6))
-    sns.scatterplot(data=df_correl, x='Población', y='num_contratos', ax=ax2)
-    ax2.set_title("Relación entre población y número de contratos")
-    ax2.set_xlabel("Población estimada en 2035")
-    ax2.set_ylabel("Número de contratos")
-    ax2.grid(True)
-    st.pyplot(fig2)
+    mostrar_grafico(
+        "dispersion", df_correl, motor, x='Población', y='num_contratos',
+        titulo="Relación entre población y número de contratos",
+        eje_x=f"Población estimada en {año_reciente}", eje_y="Número de contratos"
+    )
 
     if len(df_correl) >= 2:
+        from scipy.stats import pearsonr
         corr, _ = pearsonr(df_correl['Población'], df_correl['num_contratos'])
         st.markdown(f"📈 **Correlación de Pearson**: `{corr:.2f}`")
     else:
@@ -110,22 +178,11 @@ def show_visualizations_tab():
 
     # ---------- Evolución mensual por tipo ----------
     st.subheader("📅 Evolución mensual del valor contratado por tipo de contrato")
-    df_contratos['tipo_de_contrato'] = df_contratos['tipo_de_contrato'].fillna("").str.strip().str.lower()
-    df_contratos = df_contratos[df_contratos['fecha_inicio_ejecuci_n'].notna()]
-    df_contratos['anio_mes'] = df_contratos['fecha_inicio_ejecuci_n'].dt.to_period('M')
-
-    df_evol = df_contratos.groupby(['anio_mes', 'tipo_de_contrato'])['valor_contrato'].sum().reset_index()
-    df_evol['anio_mes'] = df_evol['anio_mes'].dt.to_timestamp()
-    df_evol = df_evol[df_evol['anio_mes'].dt.year >= 2018]
-
-    fig3, ax3 = plt.subplots(figsize=(14, 7))
-    sns.lineplot(data=df_evol, x='anio_mes', y='valor_contrato', hue='tipo_de_contrato', marker='o', ax=ax3)
-    ax3.set_title("Evolución mensual del valor contratado por tipo de contrato")
-    ax3.set_xlabel("Fecha")
-    ax3.set_ylabel("Valor total contratado")
-    ax3.legend(title='Tipo de contrato', bbox_to_anchor=(1.05, 1), loc='upper left')
-    plt.xticks(rotation=45)
-    st.pyplot(fig3)
+    mostrar_grafico(
+        "lineas", df_evol, motor, x='anio_mes', y='valor_contrato', color='tipo_de_contrato',
+        titulo="Evolución mensual del valor contratado por tipo de contrato",
+        eje_x="Fecha", eje_y="Valor total contratado"
+    )
 
     # ---------- Total por tipo de contrato ----------
     st.subheader("💰 ¿Qué tipo de contratos concentran mayores valores?")
@@ -0,0 +1,170 @@
+"""
+Benchmark de los pipelines carga -> limpieza -> modelo estrella -> agregación.
+
+Se ejecuta sin Streamlit:
+
+    python benchmarks/bench_pipelines.py --escalas 1 10 100
+
+Cada corrida mide tiempo (mediana de las repeticiones) y memoria pico
+(tracemalloc) y se agrega a `benchmarks/historial.json`. Si un caso es más
+lento que en la corrida anterior por encima del umbral, se reporta como
+regresión y el proceso termina con código 1.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for carpeta in (RAIZ, os.path.join(RAIZ, "Dashboard_clase"), os.path.join(RAIZ, "Reto_dashboard")):
+    if carpeta not in sys.path:
+        sys.path.insert(0, carpeta)
+
+import pandas as pd
+
+from pipeline.cubo import CuboAgregado, construir_cubo
+from pipeline.modelo_estrella import (
+    construir_dimensiones, construir_tabla_hechos, limpiar_men, unificar_departamentos
+)
+from pipeline.secop import clean_secop_data
+from poblacion import cargar_poblacion_total
+
+RUTA_MEN = os.path.join(RAIZ, "Codigos", "df_men.csv")
+RUTA_SECOP = os.path.join(RAIZ, "Codigos", "df_secop.csv")
+RUTA_HISTORIAL = os.path.join(RAIZ, "benchmarks", "historial.json")
+
+
+# ===================================================================
+# Medición
+# ===================================================================
+def medir(funcion, repeticiones: int) -> dict:
+    """
+    Ejecuta `funcion` varias veces y devuelve la mediana del tiempo y la
+    memoria pico de la primera ejecución.
+    """
+    tiempos = []
+    pico = 0
+    for i in range(repeticiones):
+        if i == 0:
+            tracemalloc.start()
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+        if i == 0:
+            _, pico = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+    return {"segundos": round(statistics.median(tiempos), 4), "pico_mb": round(pico / 1e6, 2)}
+
+
+def escalar(df: pd.DataFrame, factor: int) -> pd.DataFrame:
+    return df if factor == 1 else pd.concat([df] * factor, ignore_index=True)
+
+
+# ===================================================================
+# Casos
+# ===================================================================
+def modelo_estrella(df_men: pd.DataFrame):
+    df_clean = limpiar_men(unificar_departamentos(df_men.copy()))
+    dim_tiempo, dim_geo = construir_dimensiones(df_clean)
+    df_fact = construir_tabla_hechos(df_clean, dim_tiempo, dim_geo)
+    return dim_tiempo, dim_geo, df_fact
+
+
+def agregaciones(dim_tiempo, dim_geo, df_fact):
+    cubo = CuboAgregado(construir_cubo(df_fact, dim_geo, dim_tiempo))
+    for anio in cubo.valores('a_o'):
+        cubo.corte(['c_digo_departamento', 'departamento'], ['cobertura_neta'], a_o=anio)
+    for departamento in cubo.valores('departamento'):
+        cubo.corte(['a_o'], ['tasa_matriculaci_n_5_16', 'cobertura_neta'], departamento=departamento)
+    cubo.ranking(['c_digo_departamento', 'departamento', 'municipio'], 'tasa_matriculaci_n_5_16', n=10)
+    cubo.ranking(['departamento'], 'cobertura_neta', n=10)
+
+
+def casos(escalas: list[int]):
+    df_men = pd.read_csv(RUTA_MEN, dtype=str)
+    df_secop = pd.read_csv(RUTA_SECOP, dtype=str)
+
+    yield "cargar_poblacion", 1, None, cargar_poblacion_total
+    for factor in escalas:
+        men = escalar(df_men, factor)
+        secop = escalar(df_secop, factor)
+        modelo = modelo_estrella(men)
+        yield "clean_secop_data", factor, len(secop), lambda: clean_secop_data(secop)
+        yield "clean_secop_data_optimizado", factor, len(secop), lambda: clean_secop_data(secop, True)
+        yield "modelo_estrella", factor, len(men), lambda: modelo_estrella(men)
+        yield "agregaciones_mapa_visualizaciones", factor, len(modelo[2]), lambda: agregaciones(*modelo)
+
+
+# ===================================================================
+# Historial
+# ===================================================================
+def commit_actual() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def leer_historial(ruta: str) -> list:
+    if not os.path.exists(ruta):
+        return []
+    with open(ruta, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def regresiones(actual: list[dict], anterior: list[dict], umbral: float) -> list[str]:
+    previos = {(r["caso"], r["escala"]): r for r in anterior}
+    avisos = []
+    for r in actual:
+        previo = previos.get((r["caso"], r["escala"]))
+        if previo and previo["segundos"] > 0 and r["segundos"] > previo["segundos"] * (1 + umbral):
+            avisos.append(f"{r['caso']} x{r['escala']}: {previo['segundos']}s -> {r['segundos']}s")
+    return avisos
+
+
+# ===================================================================
+# Ejecutar
+# ===================================================================
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de los pipelines de los dashboards")
+    parser.add_argument("--escalas", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--historial", default=RUTA_HISTORIAL)
+    parser.add_argument("--umbral", type=float, default=0.2,
+                        help="Fracción de aumento de tiempo que se considera regresión")
+    args = parser.parse_args(argv)
+
+    resultados = []
+    for caso, escala, filas, funcion in casos(args.escalas):
+        medicion = medir(funcion, args.repeticiones)
+        resultados.append({"caso": caso, "escala": escala, "filas": filas, **medicion})
+        print(f"{caso:<36} x{escala:<4} {medicion['segundos']:>9.4f}s {medicion['pico_mb']:>9.2f} MB")
+
+    historial = leer_historial(args.historial)
+    avisos = regresiones(resultados, historial[-1]["resultados"] if historial else [], args.umbral)
+
+    historial.append({
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit_actual(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "resultados": resultados,
+    })
+    os.makedirs(os.path.dirname(os.path.abspath(args.historial)), exist_ok=True)
+    with open(args.historial, "w", encoding="utf-8") as f:
+        json.dump(historial, f, indent=2, ensure_ascii=False)
+
+    for aviso in avisos:
+        print(f"⚠️ Regresión: {aviso}")
+    return 1 if avisos else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
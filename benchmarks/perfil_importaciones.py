@@ -0,0 +1,115 @@
+"""
+Perfil del tiempo de importación de los módulos de pestaña de ambos dashboards.
+
+Cada módulo se importa en un intérprete nuevo con `python -X importtime`, como
+lo haría un worker recién desplegado:
+
+    python benchmarks/perfil_importaciones.py --top 10
+
+Además del tiempo acumulado, se revisa que las librerías pesadas (folium,
+geopandas, matplotlib, scipy...) no se carguen al importar la pestaña,
+sino en su primer uso. Si alguna aparece, o si un módulo supera el límite de
+tiempo, el proceso termina con código 1.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULOS = {
+    "Dashboard_clase": ["cargar_datos", "transformacion", "visualizaciones", "mapa"],
+    "Reto_dashboard": ["cargar_datos_secop", "transformacion_secop", "visualizaciones_secop"],
+}
+
+# Librerías que solo deben importarse cuando la pestaña las usa
+LIBRERIAS_PESADAS = [
+    "plotly", "folium", "streamlit_folium", "branca", "geopandas", "shapely",
+    "matplotlib", "seaborn", "scipy", "openpyxl", "torch",
+]
+
+
+# ===================================================================
+# Medición
+# ===================================================================
+def perfil_importacion(carpeta: str, modulo: str) -> list[tuple[int, int, str]]:
+    """
+    Importa `modulo` en un proceso nuevo y devuelve las líneas de `-X importtime`
+    como tuplas (propio_us, acumulado_us, paquete).
+    """
+    entorno = dict(os.environ, PYTHONPATH=os.pathsep.join([RAIZ, os.path.join(RAIZ, carpeta)]),
+                   DIPLOMADO_PRECARGA="0")
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        cwd=os.path.join(RAIZ, carpeta), env=entorno, capture_output=True, text=True
+    )
+    if proceso.returncode != 0:
+        raise RuntimeError(f"No se pudo importar {carpeta}/{modulo}:\n{proceso.stderr[-2000:]}")
+
+    filas = []
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith("import time:") or "self [us]" in linea:
+            continue
+        propio, acumulado, paquete = linea[len("import time:"):].split("|")
+        filas.append((int(propio), int(acumulado), paquete.rstrip()))
+    return filas
+
+
+def _sangria(paquete: str) -> int:
+    return len(paquete) - len(paquete.lstrip())
+
+
+def resumir(filas: list[tuple[int, int, str]], modulo: str, top: int, base: set[str]) -> dict:
+    """
+    Resume el perfil de `modulo`: tiempo acumulado, librerías pesadas que carga
+    además de las de `base` (lo que ya importa Streamlit por sí mismo) y sus
+    dependencias directas más costosas.
+    """
+    # importtime imprime los hijos antes que el padre; el módulo pedido es de primer nivel
+    indice = next(i for i, (_, _, paquete) in enumerate(filas) if paquete.strip() == modulo)
+    nivel = _sangria(filas[indice][2])
+    hijos = []
+    for _, acum, paquete in reversed(filas[:indice]):
+        if _sangria(paquete) <= nivel:
+            break
+        if _sangria(paquete) == nivel + 2:
+            hijos.append((acum, paquete.strip()))
+
+    cargadas = {paquete.strip().split(".")[0] for _, _, paquete in filas}
+    return {
+        "total_ms": filas[indice][1] / 1000,
+        "pesadas": sorted((cargadas - base) & set(LIBRERIAS_PESADAS)),
+        "top": [(paquete, acum / 1000) for acum, paquete in sorted(hijos, reverse=True)[:top]],
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Tiempo de importación de las pestañas de los dashboards")
+    parser.add_argument("--top", type=int, default=5, help="Dependencias más costosas a mostrar por módulo")
+    parser.add_argument("--limite-ms", type=float, default=None,
+                        help="Tiempo máximo de importación por módulo antes de marcarlo")
+    args = parser.parse_args(argv)
+
+    # Lo que Streamlit carga por sí mismo (incluye parte de plotly) no se cuenta como pesado
+    base = {paquete.strip().split(".")[0] for _, _, paquete in perfil_importacion(".", "streamlit")}
+
+    avisos = []
+    for carpeta, modulos in MODULOS.items():
+        for modulo in modulos:
+            resumen = resumir(perfil_importacion(carpeta, modulo), modulo, args.top, base)
+            print(f"{carpeta + '/' + modulo:<40} {resumen['total_ms']:>9.1f} ms")
+            for paquete, ms in resumen["top"]:
+                print(f"    {paquete:<36} {ms:>9.1f} ms")
+            if resumen["pesadas"]:
+                avisos.append(f"{carpeta}/{modulo} importa al inicio: {', '.join(resumen['pesadas'])}")
+            if args.limite_ms is not None and resumen["total_ms"] > args.limite_ms:
+                avisos.append(f"{carpeta}/{modulo} tarda {resumen['total_ms']:.0f} ms (límite {args.limite_ms:.0f} ms)")
+
+    for aviso in avisos:
+        print(f"⚠️ {aviso}")
+    return 1 if avisos else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,3 @@
+"""
+Utilidades compartidas por los dashboards `Dashboard_clase` y `Reto_dashboard`.
+"""
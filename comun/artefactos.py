@@ -0,0 +1,225 @@
+import hashlib
+import json
+import os
+import shutil
+import stat
+import time
+from datetime import datetime
+from typing import Optional
+
+import pandas as pd
+
+from comun.memoria_compartida import dataframe_compartido
+
+# Carpeta de los artefactos publicados por `materializar.py`; se puede cambiar
+# con la variable de entorno DIPLOMADO_ARTEFACTOS (por ejemplo, un volumen compartido)
+DIRECTORIO_ARTEFACTOS = os.environ.get(
+    "DIPLOMADO_ARTEFACTOS",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "artefactos")
+)
+CONSERVAR_VERSIONES = 3
+
+MANIFIESTO = "manifiesto.json"
+VIGENTE = "VIGENTE"
+
+
+def _carpeta(conjunto: str, directorio: str) -> str:
+    return os.path.join(directorio, conjunto)
+
+
+def _sha256(ruta: str) -> str:
+    h = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def _solo_lectura(carpeta: str) -> None:
+    # Los archivos de una versión publicada no se vuelven a escribir
+    for nombre in os.listdir(carpeta):
+        os.chmod(os.path.join(carpeta, nombre), stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+
+
+# ===================================================================
+# Función: publicar_version
+# ===================================================================
+def publicar_version(conjunto: str, tablas: dict[str, pd.DataFrame],
+                     archivos: Optional[dict[str, str]] = None,
+                     metadatos: Optional[dict] = None,
+                     directorio: str = DIRECTORIO_ARTEFACTOS,
+                     conservar: int = CONSERVAR_VERSIONES) -> tuple[str, bool]:
+    """
+    Publica una versión inmutable de los artefactos de `conjunto` ('men', 'secop').
+    Las tablas se escriben en Parquet y los `archivos` (por ejemplo, GeoJSON) se
+    copian, todo en una carpeta temporal que se renombra al terminar; recién
+    entonces se actualiza el puntero `VIGENTE`. Los lectores ven la versión
+    anterior o la nueva completa, nunca una a medias.
+
+    Si el contenido es idéntico al de la versión vigente no se crea una nueva.
+    Args:
+        tablas (dict): nombre -> DataFrame.
+        archivos (dict | None): nombre -> ruta de un archivo ya generado.
+        conservar (int): Versiones que se mantienen en disco, incluida la vigente.
+    Returns:
+        tuple: (versión vigente, True si se publicó una versión nueva)
+    Raises:
+        ValueError: Si alguna tabla no se puede representar en Parquet.
+    """
+    carpeta = _carpeta(conjunto, directorio)
+    os.makedirs(carpeta, exist_ok=True)
+    temporal = os.path.join(carpeta, f".tmp-{os.getpid()}-{time.time_ns()}")
+    os.makedirs(temporal)
+
+    try:
+        contenido = {}
+        for nombre, df in tablas.items():
+            archivo = f"{nombre}.parquet"
+            try:
+                df.to_parquet(os.path.join(temporal, archivo), index=False)
+            except Exception as e:
+                raise ValueError(f"No se pudo escribir la tabla '{nombre}' en Parquet: {e}") from e
+            contenido[nombre] = {"archivo": archivo, "tipo": "tabla", "filas": len(df),
+                                 "columnas": list(map(str, df.columns))}
+        for nombre, origen in (archivos or {}).items():
+            archivo = f"{nombre}{os.path.splitext(origen)[1]}"
+            shutil.copyfile(origen, os.path.join(temporal, archivo))
+            contenido[nombre] = {"archivo": archivo, "tipo": "archivo"}
+        for entrada in contenido.values():
+            entrada["sha256"] = _sha256(os.path.join(temporal, entrada["archivo"]))
+
+        huella = hashlib.sha256(json.dumps(
+            {"contenido": contenido, "metadatos": metadatos or {}}, sort_keys=True, default=str
+        ).encode()).hexdigest()
+        vigente = leer_manifiesto(conjunto, directorio=directorio)
+        if vigente is not None and vigente["huella"] == huella:
+            shutil.rmtree(temporal)
+            return vigente["version"], False
+
+        creado = datetime.now()
+        version = f"{creado:%Y%m%dT%H%M%S}-{huella[:8]}"
+        with open(os.path.join(temporal, MANIFIESTO), "w", encoding="utf-8") as f:
+            json.dump({"conjunto": conjunto, "version": version, "huella": huella,
+                       "creado": creado.isoformat(timespec="seconds"),
+                       "metadatos": metadatos or {}, "contenido": contenido},
+                      f, ensure_ascii=False, indent=2, default=str)
+        _solo_lectura(temporal)
+        os.rename(temporal, os.path.join(carpeta, version))
+    except BaseException:
+        shutil.rmtree(temporal, ignore_errors=True)
+        raise
+
+    puntero = os.path.join(carpeta, f"{VIGENTE}.{os.getpid()}.tmp")
+    with open(puntero, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(puntero, os.path.join(carpeta, VIGENTE))
+
+    depurar_versiones(conjunto, conservar, directorio)
+    return version, True
+
+
+# ===================================================================
+# Función: versiones / depurar_versiones
+# ===================================================================
+def versiones(conjunto: str, directorio: str = DIRECTORIO_ARTEFACTOS) -> list[str]:
+    """
+    Versiones publicadas de `conjunto`, de la más antigua a la más reciente.
+    """
+    carpeta = _carpeta(conjunto, directorio)
+    if not os.path.isdir(carpeta):
+        return []
+    return sorted(v for v in os.listdir(carpeta)
+                  if os.path.isfile(os.path.join(carpeta, v, MANIFIESTO)))
+
+
+def depurar_versiones(conjunto: str, conservar: int = CONSERVAR_VERSIONES,
+                      directorio: str = DIRECTORIO_ARTEFACTOS) -> list[str]:
+    """
+    Borra las versiones más antiguas y deja las `conservar` más recientes; la
+    vigente nunca se borra. Los procesos que ya leyeron una versión borrada
+    conservan sus datos en memoria.
+    Returns:
+        list: Versiones borradas.
+    """
+    vigente = version_vigente(conjunto, directorio)
+    antiguas = [v for v in versiones(conjunto, directorio)[:-max(conservar, 1)] if v != vigente]
+    for version in antiguas:
+        carpeta = os.path.join(_carpeta(conjunto, directorio), version)
+        for nombre in os.listdir(carpeta):
+            os.chmod(os.path.join(carpeta, nombre), stat.S_IRUSR | stat.S_IWUSR)
+        shutil.rmtree(carpeta)
+    return antiguas
+
+
+# ===================================================================
+# Lectura
+# ===================================================================
+def version_vigente(conjunto: str, directorio: str = DIRECTORIO_ARTEFACTOS) -> Optional[str]:
+    """
+    Versión publicada más recientemente de `conjunto`, o None si no hay ninguna.
+    """
+    try:
+        with open(os.path.join(_carpeta(conjunto, directorio), VIGENTE), encoding="utf-8") as f:
+            version = f.read().strip()
+    except OSError:
+        return None
+    return version or None
+
+
+def leer_manifiesto(conjunto: str, version: Optional[str] = None,
+                    directorio: str = DIRECTORIO_ARTEFACTOS) -> Optional[dict]:
+    """
+    Manifiesto de una versión (por defecto la vigente): contenido, filas,
+    hashes y metadatos con los que se construyó. None si no existe.
+    """
+    version = version or version_vigente(conjunto, directorio)
+    if version is None:
+        return None
+    try:
+        with open(os.path.join(_carpeta(conjunto, directorio), version, MANIFIESTO), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def tiene(conjunto: str, nombre: str, version: Optional[str] = None,
+          directorio: str = DIRECTORIO_ARTEFACTOS) -> bool:
+    """
+    True si la versión indicada (por defecto la vigente) de `conjunto` incluye
+    el artefacto `nombre`. Para leerlo después, pasar la misma `version` a
+    `leer_tabla`: la vigente puede cambiar entre ambas llamadas.
+    """
+    manifiesto = leer_manifiesto(conjunto, version, directorio)
+    return manifiesto is not None and nombre in manifiesto["contenido"]
+
+
+def _entrada(conjunto: str, nombre: str, version: Optional[str], directorio: str) -> tuple[str, dict]:
+    manifiesto = leer_manifiesto(conjunto, version, directorio)
+    if manifiesto is None or nombre not in manifiesto["contenido"]:
+        raise KeyError(f"No hay artefacto '{nombre}' publicado para '{conjunto}'")
+    entrada = manifiesto["contenido"][nombre]
+    return os.path.join(_carpeta(conjunto, directorio), manifiesto["version"], entrada["archivo"]), entrada
+
+
+def ruta_artefacto(conjunto: str, nombre: str, version: Optional[str] = None,
+                   directorio: str = DIRECTORIO_ARTEFACTOS) -> str:
+    """
+    Ruta del archivo de un artefacto en la versión indicada (por defecto la vigente).
+    Raises:
+        KeyError: Si no hay versión publicada o no incluye `nombre`.
+    """
+    return _entrada(conjunto, nombre, version, directorio)[0]
+
+
+def leer_tabla(conjunto: str, nombre: str, version: Optional[str] = None,
+               directorio: str = DIRECTORIO_ARTEFACTOS) -> pd.DataFrame:
+    """
+    Lee una tabla publicada. El primer worker del nodo la convierte a Arrow en
+    memoria compartida (`comun.memoria_compartida`); los demás la adjuntan sin
+    copiarla. El DataFrame es de solo lectura.
+    Raises:
+        KeyError: Si no hay versión publicada o no incluye `nombre`.
+    """
+    ruta, entrada = _entrada(conjunto, nombre, version, directorio)
+    return dataframe_compartido(f"artefacto-{conjunto}-{nombre}", entrada["sha256"],
+                                lambda: pd.read_parquet(ruta, memory_map=True))
@@ -0,0 +1,163 @@
+import hashlib
+import io
+import json
+import os
+import time
+import pandas as pd
+from typing import Callable, Optional
+
+from comun.excel_rapido import MAX_PROCESOS, leer_hoja, leer_hojas_paralelo
+
+# Carpeta de la caché en disco; se puede cambiar con la variable de entorno DIPLOMADO_CACHE
+DIRECTORIO_CACHE = os.environ.get(
+    "DIPLOMADO_CACHE",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache_datos")
+)
+
+
+# ===================================================================
+# Función: huella_fuente
+# ===================================================================
+def huella_fuente(fuente, **kwargs) -> str:
+    """
+    Calcula la clave de caché de un archivo: ruta absoluta, fecha de modificación,
+    tamaño y hash del contenido, más los argumentos de lectura.
+    Acepta una ruta o un objeto tipo archivo (por ejemplo, un archivo subido).
+    """
+    h = hashlib.sha1()
+    if isinstance(fuente, (str, os.PathLike)):
+        ruta = os.path.abspath(fuente)
+        stat = os.stat(ruta)
+        h.update(f"{ruta}|{stat.st_mtime_ns}|{stat.st_size}".encode())
+        with open(ruta, "rb") as f:
+            for bloque in iter(lambda: f.read(1 << 20), b""):
+                h.update(bloque)
+    else:
+        posicion = fuente.tell()
+        fuente.seek(0)
+        h.update(fuente.read())
+        fuente.seek(posicion)
+    h.update(json.dumps(kwargs, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+def _ruta_cache(clave: str, directorio: str) -> str:
+    nombre = "".join(c if c.isalnum() or c in "-_" else "_" for c in clave)
+    return os.path.join(directorio, f"{nombre}.parquet")
+
+
+# ===================================================================
+# Función: guardar_cache / leer_cache
+# ===================================================================
+def guardar_cache(clave: str, df: pd.DataFrame, directorio: str = DIRECTORIO_CACHE) -> bool:
+    """
+    Guarda el DataFrame en Parquet. La escritura es atómica (archivo temporal +
+    `os.replace`) para que otros procesos nunca lean un archivo a medias.
+    Devuelve False si el DataFrame no se puede representar en Parquet.
+    """
+    os.makedirs(directorio, exist_ok=True)
+    ruta = _ruta_cache(clave, directorio)
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    try:
+        df.to_parquet(temporal, index=False)
+        os.replace(temporal, ruta)
+        return True
+    except Exception:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        return False
+
+
+def leer_cache(clave: str, columns: Optional[list[str]] = None,
+               max_edad: Optional[float] = None,
+               directorio: str = DIRECTORIO_CACHE) -> Optional[pd.DataFrame]:
+    """
+    Lee una entrada de la caché con memoria mapeada, solo con las columnas pedidas.
+    Args:
+        max_edad (float | None): Antigüedad máxima en segundos; None no expira.
+    Returns:
+        pd.DataFrame | None: None si no existe, expiró o no se pudo leer.
+    """
+    ruta = _ruta_cache(clave, directorio)
+    if not os.path.exists(ruta):
+        return None
+    if max_edad is not None and time.time() - os.path.getmtime(ruta) > max_edad:
+        return None
+    try:
+        return pd.read_parquet(ruta, columns=columns, memory_map=True)
+    except Exception:
+        return None
+
+
+# ===================================================================
+# Función: cargar_con_cache
+# ===================================================================
+def cargar_con_cache(clave: str, cargar: Callable[[], pd.DataFrame],
+                     max_edad: Optional[float] = None,
+                     directorio: str = DIRECTORIO_CACHE) -> pd.DataFrame:
+    """
+    Devuelve la entrada de caché si existe; si no, ejecuta `cargar`, guarda el
+    resultado y lo devuelve. Los DataFrames vacíos no se guardan.
+    """
+    df = leer_cache(clave, max_edad=max_edad, directorio=directorio)
+    if df is not None:
+        return df
+    df = cargar()
+    if not df.empty:
+        guardar_cache(clave, df, directorio)
+    return df
+
+
+# ===================================================================
+# Función: leer_excels_cacheados
+# ===================================================================
+def leer_excels_cacheados(fuentes: list, columns: Optional[list[str]] = None,
+                          filtros: Optional[dict[str, list]] = None,
+                          directorio: str = DIRECTORIO_CACHE,
+                          max_procesos: int = MAX_PROCESOS) -> list[pd.DataFrame]:
+    """
+    Lee varios Excel con el lector rápido (`comun.excel_rapido`) y los convierte
+    a Parquet la primera vez. Los archivos que no están en caché se leen en
+    paralelo, en procesos separados, ya reducidos a `columns` y a las filas que
+    pasan `filtros`; la clave de caché incluye ambos.
+    """
+    # `lector` cambia cuando cambian los tipos que entrega el lector, para no reusar entradas viejas
+    claves = [f"excel_{huella_fuente(f, columns=columns, filtros=filtros, lector='rapido-2')}" for f in fuentes]
+    resultados = [leer_cache(clave, directorio=directorio) for clave in claves]
+
+    faltantes = [i for i, df in enumerate(resultados) if df is None]
+    rutas = [i for i in faltantes if isinstance(fuentes[i], (str, os.PathLike))]
+    for i, df in zip(rutas, leer_hojas_paralelo([fuentes[i] for i in rutas], columns, filtros, max_procesos)):
+        resultados[i] = df
+    for i in faltantes:
+        if resultados[i] is None:
+            # Archivos subidos: se leen en este proceso
+            fuentes[i].seek(0)
+            resultados[i] = leer_hoja(fuentes[i].read(), columns, filtros)
+        guardar_cache(claves[i], resultados[i], directorio)
+    return resultados
+
+
+# ===================================================================
+# Función: leer_excel_cacheado
+# ===================================================================
+def leer_excel_cacheado(fuente, columns: Optional[list[str]] = None,
+                        directorio: str = DIRECTORIO_CACHE, **kwargs) -> pd.DataFrame:
+    """
+    Reemplazo de `pd.read_excel` que convierte el archivo a Parquet la primera vez.
+    Las lecturas siguientes (en cualquier proceso o tras reiniciar) leen el Parquet.
+    Sin argumentos extra de `pd.read_excel` se usa el lector rápido.
+    """
+    if not kwargs:
+        return leer_excels_cacheados([fuente], columns=columns, directorio=directorio)[0]
+
+    clave = f"excel_{huella_fuente(fuente, **kwargs)}"
+    df = leer_cache(clave, columns=columns, directorio=directorio)
+    if df is not None:
+        return df
+    if not isinstance(fuente, (str, os.PathLike)):
+        fuente.seek(0)
+        fuente = io.BytesIO(fuente.read())
+    df = pd.read_excel(fuente, **kwargs)
+    guardar_cache(clave, df, directorio)
+    return df[columns] if columns else df
@@ -0,0 +1,162 @@
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+import numpy as np
+import pandas as pd
+
+# Límites por defecto de la caché del proceso; se cambian con variables de entorno
+TTL_POR_DEFECTO = float(os.environ.get("DIPLOMADO_CACHE_TTL", 3600))  # segundos
+PRESUPUESTO_MB = float(os.environ.get("DIPLOMADO_CACHE_MB", 1024))
+
+
+# ===================================================================
+# Función: tamano_bytes
+# ===================================================================
+def tamano_bytes(valor) -> int:
+    """
+    Estima la memoria que ocupa un valor cacheado. Los DataFrames se miden con
+    `memory_usage(deep=True)` y los arreglos de NumPy con `nbytes`; las tuplas,
+    listas y diccionarios suman sus elementos, y los demás objetos sus atributos
+    (por ejemplo, un dataclass con varios DataFrames).
+    """
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(index=True, deep=True).sum())
+    if isinstance(valor, pd.Series):
+        return int(valor.memory_usage(index=True, deep=True))
+    if isinstance(valor, (tuple, list)):
+        return sum(tamano_bytes(v) for v in valor)
+    if isinstance(valor, np.ndarray):
+        return int(valor.nbytes)
+    if isinstance(valor, dict):
+        return sum(tamano_bytes(v) for v in valor.values())
+    if hasattr(valor, "__dict__") and not isinstance(valor, type):
+        return sys.getsizeof(valor) + sum(tamano_bytes(v) for v in vars(valor).values())
+    return sys.getsizeof(valor)
+
+
+# ===================================================================
+# Clase: CacheCompartido
+# ===================================================================
+class CacheCompartido:
+    """
+    Caché en memoria compartida por todas las sesiones del proceso.
+
+    Las entradas vencen a los `ttl` segundos. Cuando el total supera
+    `max_bytes`, se descartan las menos usadas (LRU). Si varias sesiones piden
+    la misma clave a la vez, solo una ejecuta la carga y las demás esperan el
+    resultado.
+
+    Los valores se entregan por referencia, sin copiarlos: quien los reciba no
+    debe modificarlos en el lugar.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float = TTL_POR_DEFECTO):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entradas = OrderedDict()  # clave -> (valor, bytes, vence)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._cargas = {}  # clave -> Lock de la carga en curso
+        self.aciertos = 0
+        self.fallos = 0
+
+    def _buscar(self, clave: Hashable):
+        entrada = self._entradas.get(clave)
+        if entrada is None:
+            return None
+        if entrada[2] < time.monotonic():
+            self._quitar(clave)
+            return None
+        self._entradas.move_to_end(clave)
+        return entrada
+
+    def _quitar(self, clave: Hashable):
+        _, tamano, _ = self._entradas.pop(clave)
+        self._bytes -= tamano
+
+    def get(self, clave: Hashable, default=None):
+        with self._lock:
+            entrada = self._buscar(clave)
+        return default if entrada is None else entrada[0]
+
+    def put(self, clave: Hashable, valor, ttl: Optional[float] = None):
+        """
+        Guarda un valor. Si por sí solo excede el presupuesto, no se guarda.
+        """
+        tamano = tamano_bytes(valor)
+        if tamano > self.max_bytes:
+            return
+        vence = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            if clave in self._entradas:
+                self._quitar(clave)
+            self._entradas[clave] = (valor, tamano, vence)
+            self._bytes += tamano
+            while self._bytes > self.max_bytes:
+                self._quitar(next(iter(self._entradas)))
+
+    def obtener(self, clave: Hashable, cargar: Callable[[], object], ttl: Optional[float] = None,
+                guardar_si: Callable[[object], bool] = lambda valor: True):
+        """
+        Devuelve el valor de `clave` o lo calcula con `cargar()`. El resultado solo
+        se guarda si `guardar_si(valor)` es verdadero (por ejemplo, para no cachear
+        un DataFrame vacío producto de un error de red).
+        """
+        with self._lock:
+            entrada = self._buscar(clave)
+            if entrada is not None:
+                self.aciertos += 1
+                return entrada[0]
+            carga = self._cargas.setdefault(clave, threading.Lock())
+
+        with carga:
+            # Otra sesión pudo haberlo cargado mientras se esperaba
+            with self._lock:
+                entrada = self._buscar(clave)
+                if entrada is not None:
+                    self.aciertos += 1
+                    return entrada[0]
+                self.fallos += 1
+            try:
+                valor = cargar()
+                if guardar_si(valor):
+                    self.put(clave, valor, ttl)
+                return valor
+            finally:
+                with self._lock:
+                    self._cargas.pop(clave, None)
+
+    def invalidar(self, filtro: Optional[Callable[[Hashable], bool]] = None):
+        """
+        Descarta todas las entradas, o solo las claves que cumplan `filtro`.
+        """
+        with self._lock:
+            for clave in [c for c in self._entradas if filtro is None or filtro(c)]:
+                self._quitar(clave)
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            return {
+                "entradas": len(self._entradas),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+            }
+
+
+# Instancia única del proceso, compartida por todas las sesiones de Streamlit
+CACHE_DATOS = CacheCompartido(max_bytes=int(PRESUPUESTO_MB * 1024 * 1024))
+
+
+def no_vacio(valor) -> bool:
+    """
+    Criterio de `guardar_si` para no cachear resultados vacíos.
+    """
+    if isinstance(valor, tuple):
+        return all(no_vacio(v) for v in valor)
+    return not getattr(valor, "empty", False)
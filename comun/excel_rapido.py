@@ -0,0 +1,134 @@
+import importlib.util
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+import pandas as pd
+
+# python-calamine (lector en Rust) es opcional; sin él se usa pd.read_excel
+CALAMINE_DISPONIBLE = importlib.util.find_spec("python_calamine") is not None
+MAX_PROCESOS = 4
+
+# Por debajo de este tamaño total se lee en serie. Medido con calamine: cada
+# libro se lee a ~2,4 MB/s y arrancar los procesos (que importan pandas) cuesta
+# ~1 s, así que con dos libros el paralelo empata hacia los 5 MB y gana desde
+# unos 8 MB. Los dos libros del DANE incluidos (3,6 MB) se leen en serie.
+MIN_MB_PARALELO = float(os.environ.get("DIPLOMADO_EXCEL_MB_PARALELO", 8))
+
+
+def _contexto_procesos():
+    # forkserver/spawn evitan heredar los hilos de Streamlit (fork con hilos puede bloquearse)
+    metodos = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in metodos else "spawn")
+
+
+def _tipar(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Deja los tipos como los deja `pd.read_excel`: las columnas de texto cuyos
+    valores son todos numéricos (códigos DANE guardados como texto, '05',
+    '05001') pasan a número, y las enteras sin nulos a int64 (calamine entrega
+    todos los números como float).
+    """
+    df = df.infer_objects()
+    for col in df.select_dtypes("object").columns:
+        try:
+            df[col] = pd.to_numeric(df[col])
+        except (ValueError, TypeError):
+            pass
+    for col in df.select_dtypes("float").columns:
+        serie = df[col]
+        if serie.notna().all() and (serie % 1 == 0).all():
+            df[col] = serie.astype("int64")
+    return df
+
+
+# ===================================================================
+# Función: leer_hoja
+# ===================================================================
+def leer_hoja(fuente, columnas: Optional[list[str]] = None,
+              filtros: Optional[dict[str, list]] = None) -> pd.DataFrame:
+    """
+    Lee la primera hoja de un Excel quedándose solo con `columnas` y con las
+    filas cuyo valor en cada columna de `filtros` esté entre los permitidos
+    (comparación sin mayúsculas ni espacios). Con calamine el filtro se aplica
+    mientras se recorren las filas, sin armar antes la hoja completa.
+    Args:
+        fuente: Ruta, bytes u objeto tipo archivo.
+        filtros (dict): Por ejemplo `{'ÁREA GEOGRÁFICA': ['Total']}`.
+    Raises:
+        ValueError: Si falta alguna columna pedida en el encabezado.
+    """
+    filtros = {col: {str(v).strip().lower() for v in valores} for col, valores in (filtros or {}).items()}
+    if isinstance(fuente, bytes):
+        fuente = io.BytesIO(fuente)
+
+    if not CALAMINE_DISPONIBLE:
+        df = pd.read_excel(fuente)
+        faltantes = [c for c in (columnas or []) + list(filtros) if c not in df.columns]
+        if faltantes:
+            raise ValueError(f"Columnas faltantes en el Excel: {faltantes}")
+        for col, permitidos in filtros.items():
+            df = df[df[col].astype(str).str.strip().str.lower().isin(permitidos)]
+        return (df[columnas] if columnas else df).reset_index(drop=True)
+
+    from python_calamine import load_workbook
+
+    filas = load_workbook(fuente).get_sheet_by_index(0).iter_rows()
+    encabezado = [str(c) for c in next(filas, [])]
+    columnas = columnas or encabezado
+    faltantes = [c for c in columnas + list(filtros) if c not in encabezado]
+    if faltantes:
+        raise ValueError(f"Columnas faltantes en el Excel: {faltantes}")
+
+    posiciones = [encabezado.index(c) for c in columnas]
+    condiciones = [(encabezado.index(c), permitidos) for c, permitidos in filtros.items()]
+    datos = [
+        [fila[i] for i in posiciones] for fila in filas
+        if all(str(fila[j]).strip().lower() in permitidos for j, permitidos in condiciones)
+    ]
+    # Las celdas vacías llegan como "" y se tratan como nulos
+    return _tipar(pd.DataFrame(datos, columns=columnas).replace({"": None}))
+
+
+# ===================================================================
+# Función: leer_hojas_paralelo
+# ===================================================================
+def _cpus_disponibles() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # macOS / Windows
+        return os.cpu_count() or 1
+
+
+def _conviene_paralelo(rutas: list, max_procesos: int) -> bool:
+    if len(rutas) <= 1 or min(max_procesos, _cpus_disponibles()) <= 1:
+        return False
+    try:
+        total = sum(os.path.getsize(ruta) for ruta in rutas)
+    except (OSError, TypeError):
+        return True
+    return total >= MIN_MB_PARALELO * 1e6
+
+
+def leer_hojas_paralelo(rutas: list[str], columnas: Optional[list[str]] = None,
+                        filtros: Optional[dict[str, list]] = None,
+                        max_procesos: int = MAX_PROCESOS) -> list[pd.DataFrame]:
+    """
+    Lee varios Excel a la vez, uno por proceso, y devuelve los DataFrames en el
+    mismo orden de `rutas`. Cada proceso devuelve solo las filas y columnas ya
+    filtradas, así que el proceso principal nunca tiene la hoja completa.
+    Con una sola CPU o menos de `MIN_MB_PARALELO` en total se leen en serie.
+    """
+    if not _conviene_paralelo(rutas, max_procesos):
+        return [leer_hoja(ruta, columnas, filtros) for ruta in rutas]
+    try:
+        with ProcessPoolExecutor(max_workers=min(max_procesos, len(rutas)),
+                                 mp_context=_contexto_procesos()) as ejecutor:
+            futuros = [ejecutor.submit(leer_hoja, os.fspath(ruta), columnas, filtros) for ruta in rutas]
+            return [futuro.result() for futuro in futuros]
+    except (BrokenProcessPool, OSError):
+        # Sin procesos disponibles (entorno restringido, intérprete interactivo): lectura secuencial
+        return [leer_hoja(ruta, columnas, filtros) for ruta in rutas]
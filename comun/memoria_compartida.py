@@ -0,0 +1,245 @@
+import os
+import re
+import tempfile
+import threading
+import time
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueo entre procesos, cada uno puede cargar por su cuenta
+    fcntl = None
+
+# Se desactiva con DIPLOMADO_COMPARTIR=0; entonces cada proceso guarda su propia copia
+COMPARTIR_ACTIVO = os.environ.get("DIPLOMADO_COMPARTIR", "1") != "0"
+
+# /dev/shm es memoria (tmpfs): los procesos que mapean el mismo archivo comparten
+# sus páginas. Se cambia con DIPLOMADO_MEMORIA_COMPARTIDA
+DIRECTORIO_COMPARTIDO = os.environ.get(
+    "DIPLOMADO_MEMORIA_COMPARTIDA",
+    os.path.join("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), "diplomado1")
+)
+
+# Las columnas de texto se leen como string[pyarrow], que apunta a los buffers de Arrow
+_TIPOS_PANDAS = {pa.large_string(): pd.StringDtype("pyarrow")}.get
+
+
+# ===================================================================
+# Conversión sin copias
+# ===================================================================
+def _columna_arrow(serie: pd.Series) -> pa.Array:
+    """
+    Convierte una columna de modo que, al volver a pandas desde el archivo
+    mapeado, no haya que copiarla: los números conservan NaN como valor (sin
+    máscara de nulos), las fechas conservan NaT y el texto va como large_string.
+    Raises:
+        ValueError: Si el tipo de la columna no se puede compartir sin copias.
+    """
+    dtype = serie.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return pa.array(serie, from_pandas=True)
+    if isinstance(dtype, np.dtype) and dtype.kind in "biuf":
+        return pa.array(serie.to_numpy(), from_pandas=False)
+    if isinstance(dtype, np.dtype) and dtype.kind == "M":
+        unidad = np.datetime_data(dtype)[0]
+        return pa.array(serie.to_numpy().view("int64")).view(pa.timestamp(unidad))
+    if dtype == object or isinstance(dtype, pd.StringDtype):
+        try:
+            return pa.array(serie, type=pa.large_string(), from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            raise ValueError(f"La columna '{serie.name}' mezcla tipos: {e}") from e
+    raise ValueError(f"La columna '{serie.name}' tiene un tipo no compartible: {dtype}")
+
+
+def a_arrow(df: pd.DataFrame) -> pa.Table:
+    """
+    Tabla Arrow equivalente a `df`, sin el índice.
+    Raises:
+        ValueError: Si alguna columna no se puede compartir sin copias.
+    """
+    if not all(isinstance(col, str) for col in df.columns) or df.columns.has_duplicates:
+        raise ValueError("Los nombres de columna deben ser textos únicos")
+    return pa.table({col: _columna_arrow(df[col]) for col in df.columns})
+
+
+def _a_pandas(tabla: pa.Table) -> pd.DataFrame:
+    # split_blocks evita consolidar columnas (lo que obligaría a copiarlas)
+    return tabla.to_pandas(split_blocks=True, types_mapper=_TIPOS_PANDAS)
+
+
+# ===================================================================
+# Publicación y lectura
+# ===================================================================
+def _prefijo(nombre: str) -> str:
+    return re.sub(r"[^0-9A-Za-z_.-]", "_", f"{nombre}--")
+
+
+def _ruta(nombre: str, version: str, directorio: str, extension: str = "arrow") -> str:
+    limpio = _prefijo(nombre) + re.sub(r"[^0-9A-Za-z_.-]", "_", version)
+    return os.path.join(directorio, f"{limpio}.{extension}")
+
+
+def _ruta_bloqueo(nombre: str, directorio: str) -> str:
+    # Un solo archivo de bloqueo por nombre, para todas sus versiones
+    return os.path.join(directorio, f"{_prefijo(nombre)}.lock")
+
+
+def _borrar_versiones(nombre: str, directorio: str, conservar: tuple = ()) -> None:
+    # Los .lock no se borran nunca: si otro proceso espera sobre un archivo
+    # desenlazado, el siguiente crearía uno nuevo y ya no se excluirían
+    if not os.path.isdir(directorio):
+        return
+    for archivo in os.listdir(directorio):
+        ruta = os.path.join(directorio, archivo)
+        if archivo.startswith(_prefijo(nombre)) and archivo.endswith(".arrow") and ruta not in conservar:
+            try:
+                os.remove(ruta)
+            except OSError:
+                pass
+
+
+def publicar(nombre: str, version: str, df: pd.DataFrame,
+             directorio: str = DIRECTORIO_COMPARTIDO) -> str:
+    """
+    Escribe `df` como archivo Arrow IPC sin compresión y borra las versiones
+    anteriores de `nombre`. La escritura es atómica; los procesos que ya tenían
+    mapeada una versión borrada la siguen leyendo hasta soltarla.
+    Returns:
+        str: Ruta del archivo publicado.
+    Raises:
+        ValueError: Si alguna columna no se puede compartir sin copias.
+    """
+    tabla = a_arrow(df)
+    os.makedirs(directorio, exist_ok=True)
+    ruta = _ruta(nombre, version, directorio)
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    try:
+        with pa.OSFile(temporal, "wb") as archivo, pa.ipc.new_file(archivo, tabla.schema) as escritor:
+            escritor.write_table(tabla)
+        os.replace(temporal, ruta)
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+
+    _borrar_versiones(nombre, directorio, conservar=(ruta,))
+    return ruta
+
+
+def adjuntar(ruta: str) -> pd.DataFrame:
+    """
+    Mapea un archivo publicado y devuelve un DataFrame de solo lectura cuyas
+    columnas apuntan a la memoria del archivo (salvo los códigos de las
+    categorías, que son pequeños). Modificarlo en el lugar lanza un error.
+    """
+    # El mapa queda abierto mientras algún buffer lo use
+    return _a_pandas(pa.ipc.open_file(pa.memory_map(ruta, "r")).read_all())
+
+
+class _Bloqueo:
+    """
+    Bloqueo entre procesos sobre un archivo (`flock`). Sirve para que un solo
+    worker cargue y publique cada versión mientras los demás esperan.
+    """
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.ruta), exist_ok=True)
+        self._archivo = open(self.ruta, "a")
+        if fcntl is not None:
+            fcntl.flock(self._archivo, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *_):
+        if fcntl is not None:
+            fcntl.flock(self._archivo, fcntl.LOCK_UN)
+        self._archivo.close()
+        return False
+
+
+# ===================================================================
+# Función: dataframe_compartido
+# ===================================================================
+_adjuntos: dict[str, tuple[str, pd.DataFrame]] = {}  # nombre -> (versión, DataFrame)
+_lock = threading.Lock()
+
+
+def dataframe_compartido(nombre: str, version: str, cargar: Callable[[], pd.DataFrame],
+                         directorio: str = DIRECTORIO_COMPARTIDO) -> pd.DataFrame:
+    """
+    Devuelve la `version` de `nombre` como vista de solo lectura sobre memoria
+    compartida entre todos los workers del nodo. El primer proceso que la pide
+    ejecuta `cargar` y la publica; los demás solo mapean el archivo, sin parsear
+    ni copiar nada, así que la memoria por nodo no crece con los workers.
+
+    Dentro de un proceso se adjunta una vez por versión y todas las sesiones
+    reciben el mismo DataFrame. Los DataFrames vacíos no se publican, y los que
+    no se pueden compartir sin copias (tipos mixtos, columnas no textuales) se
+    guardan solo en el proceso.
+    Args:
+        version (str): Identifica el contenido (huella, hash del artefacto...);
+            al cambiar, la versión anterior se descarta.
+    """
+    with _lock:
+        guardado = _adjuntos.get(nombre)
+    if guardado is not None and guardado[0] == version:
+        return guardado[1]
+
+    if not COMPARTIR_ACTIVO:
+        df = cargar()
+    else:
+        ruta = _ruta(nombre, version, directorio)
+        with _Bloqueo(_ruta_bloqueo(nombre, directorio)):
+            if os.path.exists(ruta):
+                df = adjuntar(ruta)
+            else:
+                df = cargar()
+                if df.empty:
+                    return df
+                try:
+                    df = adjuntar(publicar(nombre, version, df, directorio))
+                except (ValueError, OSError):
+                    pass
+
+    with _lock:
+        _adjuntos[nombre] = (version, df)
+    return df
+
+
+def version_por_tiempo(ttl: float) -> str:
+    """
+    Versión para datos sin huella conocida antes de cargarlos (por ejemplo, una
+    consulta a la API): todos los workers calculan la misma mientras no pasen
+    `ttl` segundos, y al cambiar de ventana uno solo vuelve a cargar.
+    """
+    return str(int(time.time() // ttl))
+
+
+def invalidar(nombre: str, directorio: str = DIRECTORIO_COMPARTIDO) -> None:
+    """
+    Descarta `nombre` en este proceso y en el directorio compartido, para que
+    la próxima lectura vuelva a cargarlo. Los otros procesos conservan la
+    versión que ya tenían adjunta.
+    """
+    with _lock:
+        _adjuntos.pop(nombre, None)
+    _borrar_versiones(nombre, directorio)
+
+
+def estadisticas(directorio: str = DIRECTORIO_COMPARTIDO) -> dict:
+    """
+    Archivos publicados en el nodo (MB) y nombres adjuntos en este proceso.
+    """
+    publicados = {}
+    if os.path.isdir(directorio):
+        for archivo in sorted(os.listdir(directorio)):
+            if archivo.endswith(".arrow"):
+                publicados[archivo] = round(os.path.getsize(os.path.join(directorio, archivo)) / 1e6, 2)
+    with _lock:
+        adjuntos = {nombre: version for nombre, (version, _) in _adjuntos.items()}
+    return {"publicados": publicados, "adjuntos": adjuntos}
@@ -0,0 +1,110 @@
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+# Se desactiva con DIPLOMADO_PRECARGA=0 (por ejemplo, en pruebas o sin red)
+PRECARGA_ACTIVA = os.environ.get("DIPLOMADO_PRECARGA", "1") != "0"
+MAX_HILOS = 4
+
+
+# ===================================================================
+# Clase: Precarga
+# ===================================================================
+class Precarga:
+    """
+    Ejecuta en segundo plano las cargas de datos de una app mientras la interfaz
+    arranca. Cada tarea queda como un `Future` que las pestañas pueden consultar
+    sin bloquear el renderizado. Las tareas deben guardar su resultado en la
+    caché compartida, de modo que la carga normal de la pestaña lo encuentre listo.
+    """
+
+    def __init__(self, tareas: dict[str, Callable[[], object]], max_hilos: int = MAX_HILOS):
+        self.duraciones = {}
+        ejecutor = ThreadPoolExecutor(max_workers=max(1, min(max_hilos, len(tareas))),
+                                      thread_name_prefix="precarga")
+        self.futuros: dict[str, Future] = {
+            nombre: ejecutor.submit(self._ejecutar, nombre, tarea) for nombre, tarea in tareas.items()
+        }
+        # Los hilos terminan solos al acabar las tareas
+        ejecutor.shutdown(wait=False)
+
+    def _ejecutar(self, nombre: str, tarea: Callable[[], object]):
+        inicio = time.perf_counter()
+        try:
+            return tarea()
+        finally:
+            self.duraciones[nombre] = time.perf_counter() - inicio
+
+    def listo(self, *nombres: str) -> bool:
+        """
+        True si las tareas indicadas (o todas) terminaron, con o sin error.
+        """
+        return all(self.futuros[n].done() for n in (nombres or self.futuros) if n in self.futuros)
+
+    def progreso(self, *nombres: str) -> tuple[int, int]:
+        """
+        Devuelve (terminadas, total) de las tareas indicadas, o de todas.
+        """
+        futuros = [self.futuros[n] for n in (nombres or self.futuros) if n in self.futuros]
+        return sum(f.done() for f in futuros), len(futuros)
+
+    def resultado(self, nombre: str, timeout: Optional[float] = None):
+        """
+        Espera el resultado de una tarea. Relanza la excepción si la tarea falló.
+        """
+        return self.futuros[nombre].result(timeout=timeout)
+
+    def errores(self) -> dict[str, BaseException]:
+        return {n: f.exception() for n, f in self.futuros.items() if f.done() and f.exception()}
+
+
+_precargas: dict[str, Precarga] = {}
+_lock = threading.Lock()
+
+
+# ===================================================================
+# Función: iniciar_precarga
+# ===================================================================
+def iniciar_precarga(app: str, tareas: dict[str, Callable[[], object]],
+                     max_hilos: int = MAX_HILOS) -> Optional[Precarga]:
+    """
+    Lanza la precarga de `app` una sola vez por proceso. Las llamadas siguientes
+    (cada rerun de Streamlit) devuelven la misma instancia.
+    """
+    if not PRECARGA_ACTIVA:
+        return None
+    with _lock:
+        if app not in _precargas:
+            _precargas[app] = Precarga(tareas, max_hilos)
+        return _precargas[app]
+
+
+def precarga_de(app: str) -> Optional[Precarga]:
+    return _precargas.get(app)
+
+
+# ===================================================================
+# Función: mostrar_progreso
+# ===================================================================
+def mostrar_progreso(precarga: Optional[Precarga], *nombres: str, texto: str = "⏳ Precargando datos") -> bool:
+    """
+    Muestra el avance de la precarga y se refresca solo cada segundo; al terminar
+    relanza la app para que la pestaña se dibuje con los datos ya en caché.
+    Devuelve True si las tareas indicadas ya terminaron.
+    """
+    import streamlit as st
+
+    if precarga is None or precarga.listo(*nombres):
+        return True
+
+    @st.fragment(run_every=1)
+    def _avance():
+        hechas, total = precarga.progreso(*nombres)
+        if hechas == total:
+            st.rerun()
+        st.progress(hechas / total, text=f"{texto} ({hechas}/{total})...")
+
+    _avance()
+    return False
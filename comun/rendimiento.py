@@ -0,0 +1,253 @@
+import functools
+import json
+import os
+import secrets
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+import pandas as pd
+
+# Se desactiva con DIPLOMADO_RENDIMIENTO=0
+RENDIMIENTO_ACTIVO = os.environ.get("DIPLOMADO_RENDIMIENTO", "1") != "0"
+MAX_MEDICIONES = 2000
+
+ETAPAS = ("carga", "limpieza", "transformación", "agregación", "render", "exportación", "materialización")
+
+
+# ===================================================================
+# Clase: Medicion
+# ===================================================================
+@dataclass
+class Medicion:
+    """
+    Una etapa medida. `traza_id`, `span_id` y `padre_id` siguen el modelo de
+    OpenTelemetry para poder anidar etapas (por ejemplo, la carga dentro del render).
+    """
+    etapa: str
+    nombre: str
+    traza_id: str
+    span_id: str
+    padre_id: Optional[str]
+    inicio_ns: int
+    duracion_s: float = 0.0
+    filas_entrada: Optional[int] = None
+    filas_salida: Optional[int] = None
+    memoria_delta_mb: Optional[float] = None
+    error: Optional[str] = None
+    hilo: str = field(default_factory=lambda: threading.current_thread().name)
+
+
+# Últimas mediciones del proceso (todas las sesiones)
+REGISTRO: deque = deque(maxlen=MAX_MEDICIONES)
+_local = threading.local()
+
+
+def _memoria_mb() -> Optional[float]:
+    # Memoria residente del proceso; /proc solo existe en Linux
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def contar_filas(valor) -> Optional[int]:
+    """
+    Filas de un DataFrame o Serie; en tuplas o listas, las del primer DataFrame.
+    """
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        return len(valor)
+    if isinstance(valor, (tuple, list)):
+        return next((len(v) for v in valor if isinstance(v, (pd.DataFrame, pd.Series))), None)
+    return None
+
+
+# ===================================================================
+# Trazas
+# ===================================================================
+def iniciar_traza() -> str:
+    """
+    Empieza una traza nueva en el hilo actual. Las apps la llaman al inicio de
+    cada rerun; todas las etapas medidas en ese rerun comparten el identificador.
+    """
+    _local.traza_id = secrets.token_hex(16)
+    _local.pila = []
+    return _local.traza_id
+
+
+def traza_actual() -> Optional[str]:
+    return getattr(_local, "traza_id", None)
+
+
+def mediciones(traza_id: Optional[str] = None) -> list[Medicion]:
+    """
+    Mediciones registradas, opcionalmente solo las de una traza.
+    """
+    return [m for m in list(REGISTRO) if traza_id is None or m.traza_id == traza_id]
+
+
+# ===================================================================
+# Clase: medir
+# ===================================================================
+class medir:
+    """
+    Mide una etapa: tiempo de pared, filas de entrada y salida y variación de
+    memoria residente. Sirve como context manager o como decorador:
+
+        with medir("transformación", "modelo estrella", filas_entrada=len(df)) as m:
+            ...
+            m.filas_salida = len(df_fact)
+
+        @medir("carga")
+        def load_data_from_api(...): ...
+
+    Como decorador, las filas se toman del primer argumento DataFrame y del
+    valor devuelto.
+    """
+
+    def __init__(self, etapa: str, nombre: Optional[str] = None, filas_entrada: Optional[int] = None):
+        self.etapa = etapa
+        self.nombre = nombre
+        self.filas_entrada = filas_entrada
+        self.filas_salida = None
+        self._medicion = None
+
+    def __enter__(self):
+        if not RENDIMIENTO_ACTIVO:
+            return self
+        pila = getattr(_local, "pila", None)
+        if pila is None or traza_actual() is None:
+            iniciar_traza()
+            pila = _local.pila
+        self._medicion = Medicion(
+            etapa=self.etapa, nombre=self.nombre or self.etapa,
+            traza_id=_local.traza_id, span_id=secrets.token_hex(8),
+            padre_id=pila[-1].span_id if pila else None,
+            inicio_ns=time.time_ns(), filas_entrada=self.filas_entrada,
+        )
+        pila.append(self._medicion)
+        # Se guarda la pila de la entrada: si `iniciar_traza` la reemplaza
+        # mientras la etapa corre, la etapa igual sale de la suya
+        self._pila = pila
+        self._memoria = _memoria_mb()
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, error, _traza):
+        m = self._medicion
+        if m is None:
+            return False
+        m.duracion_s = time.perf_counter() - self._inicio
+        m.filas_entrada = self.filas_entrada
+        m.filas_salida = self.filas_salida
+        memoria = _memoria_mb()
+        if memoria is not None and self._memoria is not None:
+            m.memoria_delta_mb = round(memoria - self._memoria, 2)
+        if error is not None:
+            m.error = f"{tipo.__name__}: {error}"
+        try:
+            self._pila.remove(m)
+        except ValueError:
+            pass  # la contabilidad de la pila nunca debe tapar el error de la etapa medida
+        REGISTRO.append(m)
+        return False
+
+    def __call__(self, funcion):
+        nombre = self.nombre or funcion.__qualname__
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            entrada = next((contar_filas(a) for a in args if contar_filas(a) is not None), None)
+            with medir(self.etapa, nombre, filas_entrada=entrada) as m:
+                resultado = funcion(*args, **kwargs)
+                m.filas_salida = contar_filas(resultado)
+                return resultado
+        return envoltura
+
+
+# ===================================================================
+# Exportación
+# ===================================================================
+def exportar_json(lista: list[Medicion]) -> str:
+    return json.dumps([asdict(m) for m in lista], ensure_ascii=False, indent=2)
+
+
+def exportar_otlp(lista: list[Medicion], servicio: str) -> str:
+    """
+    Serializa las mediciones en el formato JSON de OTLP (trazas de
+    OpenTelemetry), que pueden importar Jaeger, Tempo o el OpenTelemetry Collector.
+    """
+    def atributo(clave, valor):
+        if isinstance(valor, bool):
+            return {"key": clave, "value": {"boolValue": valor}}
+        if isinstance(valor, int):
+            return {"key": clave, "value": {"intValue": str(valor)}}
+        if isinstance(valor, float):
+            return {"key": clave, "value": {"doubleValue": valor}}
+        return {"key": clave, "value": {"stringValue": str(valor)}}
+
+    spans = []
+    for m in lista:
+        atributos = {"etapa": m.etapa, "hilo": m.hilo, "filas.entrada": m.filas_entrada,
+                     "filas.salida": m.filas_salida, "memoria.delta_mb": m.memoria_delta_mb}
+        span = {
+            "traceId": m.traza_id,
+            "spanId": m.span_id,
+            "name": m.nombre,
+            "kind": 1,
+            "startTimeUnixNano": str(m.inicio_ns),
+            "endTimeUnixNano": str(m.inicio_ns + int(m.duracion_s * 1e9)),
+            "attributes": [atributo(k, v) for k, v in atributos.items() if v is not None],
+            "status": {"code": 2, "message": m.error} if m.error else {"code": 1},
+        }
+        if m.padre_id:
+            span["parentSpanId"] = m.padre_id
+        spans.append(span)
+
+    return json.dumps({"resourceSpans": [{
+        "resource": {"attributes": [atributo("service.name", servicio)]},
+        "scopeSpans": [{"scope": {"name": "diplomado.rendimiento"}, "spans": spans}],
+    }]}, ensure_ascii=False)
+
+
+def segundos_en_render(lista: list[Medicion]) -> float:
+    """
+    Tiempo de render de una traza. Solo suman las etapas de primer nivel: una
+    etapa de render anidada (una figura dentro de la pestaña) ya está incluida
+    en la de su padre.
+    """
+    return sum(m.duracion_s for m in lista if m.etapa == "render" and m.padre_id is None)
+
+
+# ===================================================================
+# Función: mostrar_panel_rendimiento
+# ===================================================================
+def mostrar_panel_rendimiento(servicio: str):
+    """
+    Panel opcional "⏱️ Rendimiento" en la barra lateral con las etapas del rerun
+    actual y descargas JSON / OTLP. Se llama al final de la app, cuando todas
+    las etapas del rerun ya se midieron.
+    """
+    import streamlit as st
+
+    if not RENDIMIENTO_ACTIVO or not st.sidebar.toggle("⏱️ Rendimiento"):
+        return
+
+    actuales = mediciones(traza_actual())
+    with st.sidebar:
+        if not actuales:
+            st.caption("Sin mediciones en esta ejecución.")
+        else:
+            tabla = pd.DataFrame([asdict(m) for m in actuales])[
+                ['etapa', 'nombre', 'duracion_s', 'filas_entrada', 'filas_salida', 'memoria_delta_mb', 'error']]
+            st.caption(f"Ejecución actual: {segundos_en_render(actuales):.2f} s en render")
+            st.dataframe(tabla.sort_values('duracion_s', ascending=False), hide_index=True)
+
+        todas = mediciones()
+        st.download_button("📥 Trazas (JSON)", exportar_json(todas),
+                           file_name=f"rendimiento_{servicio}.json", mime="application/json")
+        st.download_button("📥 Trazas (OpenTelemetry)", exportar_otlp(todas, servicio),
+                           file_name=f"rendimiento_{servicio}.otlp.json", mime="application/json")
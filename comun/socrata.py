@@ -0,0 +1,314 @@
+import hashlib
+import json
+import os
+import threading
+import requests
+import pandas as pd
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from requests.adapters import HTTPAdapter
+from typing import Callable, Iterator, Optional
+from urllib3.util.retry import Retry
+
+# La URL base se puede apuntar a un servidor local de pruebas con DIPLOMADO_SOCRATA_URL
+BASE_URL = os.environ.get("DIPLOMADO_SOCRATA_URL", "https://www.datos.gov.co/resource")
+TAMANO_PAGINA = 10000
+MAX_HILOS = 4
+
+# Tiempo máximo (segundos) para conectar y para esperar cada respuesta
+TIMEOUT = (10, 120)
+
+# Reintentos con espera exponencial (0.5 s, 1 s, 2 s, ...) ante fallas transitorias
+REINTENTOS = 4
+FACTOR_ESPERA = 0.5
+ESTADOS_REINTENTO = (429, 500, 502, 503, 504)
+
+# Caché en disco de respuestas HTTP, revalidada con ETag / If-Modified-Since.
+# DIPLOMADO_CACHE_HTTP="" la desactiva.
+DIRECTORIO_HTTP = os.environ.get(
+    "DIPLOMADO_CACHE_HTTP",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache_http")
+)
+# Tamaño máximo de esa caché; al superarlo se borran las respuestas usadas hace más tiempo
+PRESUPUESTO_HTTP_MB = float(os.environ.get("DIPLOMADO_CACHE_HTTP_MB", 512))
+
+
+# ===================================================================
+# Función: crear_sesion
+# ===================================================================
+def crear_sesion(max_conexiones: int = MAX_HILOS) -> requests.Session:
+    """
+    Crea una sesión HTTP con un pool de conexiones keep-alive para reutilizar
+    los sockets entre páginas consecutivas, y reintentos con espera exponencial
+    para los errores de conexión y las respuestas 429/5xx.
+    """
+    reintentos = Retry(total=REINTENTOS, backoff_factor=FACTOR_ESPERA,
+                       status_forcelist=ESTADOS_REINTENTO, allowed_methods=["GET"],
+                       respect_retry_after_header=True, raise_on_status=False)
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=max_conexiones, pool_maxsize=max_conexiones,
+                          max_retries=reintentos)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_sesion = None
+_lock_sesion = threading.Lock()
+
+
+def sesion_compartida() -> requests.Session:
+    """
+    Sesión única del proceso, compartida por ambos dashboards y todas las
+    sesiones de Streamlit, para no abrir conexiones nuevas en cada carga.
+    """
+    global _sesion
+    with _lock_sesion:
+        if _sesion is None:
+            _sesion = crear_sesion(MAX_HILOS * 2)
+        return _sesion
+
+
+# ===================================================================
+# Función: obtener_json
+# ===================================================================
+def _rutas_respuesta(url: str, params: dict, directorio: str) -> tuple[str, str]:
+    clave = hashlib.sha1(f"{url}?{json.dumps(params, sort_keys=True, default=str)}".encode()).hexdigest()
+    return os.path.join(directorio, f"{clave}.json"), os.path.join(directorio, f"{clave}.meta")
+
+
+def _escribir_atomico(ruta: str, contenido: bytes):
+    temporal = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporal, "wb") as f:
+        f.write(contenido)
+    os.replace(temporal, ruta)
+
+
+def depurar_cache_http(directorio: str = DIRECTORIO_HTTP, max_mb: float = PRESUPUESTO_HTTP_MB) -> int:
+    """
+    Borra las respuestas guardadas menos usadas recientemente hasta que la
+    caché ocupe menos de `max_mb`. Cada revalidación (304) cuenta como uso.
+    Returns:
+        int: Número de respuestas borradas.
+    """
+    entradas = []
+    try:
+        archivos = list(os.scandir(directorio))
+    except OSError:
+        return 0
+    for archivo in archivos:
+        if archivo.name.endswith(".json"):
+            try:
+                info = archivo.stat()
+            except OSError:
+                continue
+            entradas.append((info.st_mtime, info.st_size, archivo.path))
+
+    total = sum(tamano for _, tamano, _ in entradas)
+    borradas = 0
+    for _, tamano, ruta in sorted(entradas):
+        if total <= max_mb * 1e6:
+            break
+        for ruta_archivo in (ruta, f"{ruta[:-len('.json')]}.meta"):
+            try:
+                os.remove(ruta_archivo)
+            except OSError:
+                pass  # otro hilo o proceso ya la borró
+        total -= tamano
+        borradas += 1
+    return borradas
+
+
+def _leer_guardada(ruta_cuerpo: str):
+    try:
+        with open(ruta_cuerpo, "rb") as f:
+            datos = json.loads(f.read())
+        os.utime(ruta_cuerpo)  # marca el uso para `depurar_cache_http`
+        return datos
+    except (OSError, ValueError):
+        return None
+
+
+def obtener_json(url: str, params: dict, session: Optional[requests.Session] = None,
+                 directorio: Optional[str] = None):
+    """
+    GET con timeout que devuelve el JSON de la respuesta. Si hay una copia en
+    disco, se revalida con `If-None-Match` / `If-Modified-Since`: ante un 304 se
+    usa la copia local y no se vuelve a descargar el cuerpo.
+    Args:
+        directorio (str | None): Caché en disco; por defecto `DIRECTORIO_HTTP`
+            y "" para no usarla. Se mantiene bajo `PRESUPUESTO_HTTP_MB`.
+    """
+    session = session or sesion_compartida()
+    directorio = DIRECTORIO_HTTP if directorio is None else directorio
+    if not directorio:
+        response = session.get(url, params=params, timeout=TIMEOUT)
+        response.raise_for_status()
+        return response.json()
+
+    ruta_cuerpo, ruta_meta = _rutas_respuesta(url, params, directorio)
+    encabezados = {}
+    if os.path.exists(ruta_cuerpo) and os.path.exists(ruta_meta):
+        try:
+            with open(ruta_meta, encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = {}
+        if meta.get("etag"):
+            encabezados["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            encabezados["If-Modified-Since"] = meta["last_modified"]
+
+    response = session.get(url, params=params, headers=encabezados, timeout=TIMEOUT)
+    if response.status_code == 304 and encabezados:
+        datos = _leer_guardada(ruta_cuerpo)
+        if datos is not None:
+            return datos
+        # La copia se depuró entre la consulta y la lectura: se descarga de nuevo
+        response = session.get(url, params=params, timeout=TIMEOUT)
+    response.raise_for_status()
+
+    meta = {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
+    if meta["etag"] or meta["last_modified"]:
+        os.makedirs(directorio, exist_ok=True)
+        _escribir_atomico(ruta_cuerpo, response.content)
+        _escribir_atomico(ruta_meta, json.dumps(meta).encode())
+        depurar_cache_http(directorio)
+    return response.json()
+
+
+# ===================================================================
+# Función: contar_registros
+# ===================================================================
+def contar_registros(dataset_id: str, where: Optional[str] = None,
+                     session: Optional[requests.Session] = None,
+                     base_url: str = BASE_URL) -> int:
+    """
+    Consulta el número total de registros del dataset con `$select=count(*)`.
+    """
+    params = {"$select": "count(*) AS total"}
+    if where:
+        params["$where"] = where
+    data = obtener_json(f"{base_url}/{dataset_id}.json", params, session)
+    return int(data[0]["total"]) if data else 0
+
+
+# ===================================================================
+# Función: obtener_pagina
+# ===================================================================
+def obtener_pagina(dataset_id: str, offset: int, limit: int,
+                   where: Optional[str] = None,
+                   session: Optional[requests.Session] = None,
+                   base_url: str = BASE_URL,
+                   select: Optional[str] = None) -> list[dict]:
+    """
+    Descarga una página del dataset ordenada por `:id` para que la paginación
+    con `$limit/$offset` sea estable.
+    """
+    params = {"$limit": limit, "$offset": offset, "$order": ":id"}
+    if where:
+        params["$where"] = where
+    if select:
+        params["$select"] = select
+    return obtener_json(f"{base_url}/{dataset_id}.json", params, session)
+
+
+# ===================================================================
+# Función: tipar_columnas
+# ===================================================================
+def tipar_columnas(df: pd.DataFrame, numericas: Optional[list[str]] = None) -> pd.DataFrame:
+    """
+    Convierte a numérico las columnas indicadas. Socrata devuelve todos los
+    valores como texto, así que se tipan página por página al llegar.
+    """
+    for col in numericas or []:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+
+# ===================================================================
+# Función: iterar_paginas
+# ===================================================================
+def iterar_paginas(dataset_id: str, limit: Optional[int] = None,
+                   page_size: int = TAMANO_PAGINA,
+                   where: Optional[str] = None,
+                   numericas: Optional[list[str]] = None,
+                   max_hilos: int = MAX_HILOS,
+                   progreso: Optional[Callable[[int, int], None]] = None,
+                   session: Optional[requests.Session] = None,
+                   base_url: str = BASE_URL,
+                   select: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """
+    Descarga el dataset en páginas concurrentes y entrega cada página como un
+    DataFrame ya tipado, en el mismo orden del dataset.
+    Args:
+        limit (int | None): Máximo de registros. `None` descarga todo el dataset.
+        page_size (int): Registros por página.
+        where (str | None): Filtro SoQL `$where` opcional.
+        select (str | None): Columnas `$select`; usar `":*, *"` para incluir campos de sistema.
+        progreso (callable): Función opcional `(descargados, total)`.
+    """
+    session = session or sesion_compartida()
+    total = contar_registros(dataset_id, where=where, session=session, base_url=base_url)
+    if limit is not None:
+        total = min(total, limit)
+
+    offsets = iter(range(0, total, page_size))
+    descargados = 0
+    with ThreadPoolExecutor(max_workers=max_hilos) as executor:
+        def pedir(offset: int) -> Future:
+            return executor.submit(obtener_pagina, dataset_id, offset,
+                                   min(page_size, total - offset), where, session, base_url, select)
+
+        # Solo `max_hilos` páginas en vuelo: la siguiente se pide al entregar una,
+        # así la memoria no crece con el tamaño del dataset
+        en_vuelo = deque(pedir(offset) for offset in islice(offsets, max_hilos))
+        while en_vuelo:
+            pagina = pd.DataFrame(en_vuelo.popleft().result())
+            if pagina.empty:
+                # El dataset tiene menos registros que los contados: no hay más páginas
+                break
+            siguiente = next(offsets, None)
+            if siguiente is not None:
+                en_vuelo.append(pedir(siguiente))
+            descargados += len(pagina)
+            if progreso:
+                progreso(descargados, total)
+            yield tipar_columnas(pagina, numericas)
+            del pagina
+
+
+# ===================================================================
+# Función: cargar_dataset
+# ===================================================================
+def cargar_dataset(dataset_id: str, limit: Optional[int] = None, **kwargs) -> pd.DataFrame:
+    """
+    Descarga el dataset completo (o hasta `limit` registros) y concatena las páginas.
+    """
+    paginas = [p for p in iterar_paginas(dataset_id, limit=limit, **kwargs) if not p.empty]
+    if not paginas:
+        return pd.DataFrame()
+    return pd.concat(paginas, ignore_index=True)
+
+
+# ===================================================================
+# Función: consultar_agregado
+# ===================================================================
+def consultar_agregado(dataset_id: str, select: str, group: Optional[str] = None,
+                       where: Optional[str] = None, order: Optional[str] = None,
+                       limit: int = 50000, session: Optional[requests.Session] = None,
+                       base_url: str = BASE_URL) -> pd.DataFrame:
+    """
+    Ejecuta una consulta SoQL agregada (`$select` + `$group`) en el servidor y
+    devuelve solo las filas resultantes, no los registros crudos.
+    """
+    params = {"$select": select, "$limit": limit}
+    if group:
+        params["$group"] = group
+    if where:
+        params["$where"] = where
+    if order:
+        params["$order"] = order
+    return pd.DataFrame(obtener_json(f"{base_url}/{dataset_id}.json", params, session))
@@ -0,0 +1,218 @@
+"""
+Materialización fuera de línea de los artefactos de ambos dashboards.
+
+Ejecuta sin Streamlit los pipelines del MEN y de SECOP y publica el resultado
+como una versión inmutable en `artefactos/<conjunto>/<versión>/` (ver
+`comun.artefactos`). Las apps leen la versión vigente en lugar de calcularla:
+
+    python materializar.py                      # MEN y SECOP desde datos.gov.co
+    python materializar.py men --men-csv Codigos/df_men.csv
+    python materializar.py secop --conservar 5
+
+Pensado para correr programado en un nodo de lotes, por ejemplo con cron:
+
+    0 5 * * *  cd /srv/diplomado1 && python materializar.py >> materializar.log 2>&1
+
+La carpeta de salida se cambia con DIPLOMADO_ARTEFACTOS. Si algún conjunto
+falla, se conserva su versión anterior y el proceso termina con código 1.
+"""
+import argparse
+import io
+import os
+import sys
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+for carpeta in (RAIZ, os.path.join(RAIZ, "Dashboard_clase"), os.path.join(RAIZ, "Reto_dashboard")):
+    if carpeta not in sys.path:
+        sys.path.insert(0, carpeta)
+
+import pandas as pd
+
+from comun import artefactos
+from comun.cache_columnar import leer_excels_cacheados
+from comun.rendimiento import iniciar_traza, medir, mediciones
+from comun.socrata import cargar_dataset
+from pipeline.modelo_estrella import construir_modelo_estrella
+from pipeline.poblacion import COLUMNAS_DANE, normalizar_poblacion
+from pipeline.secop import clean_secop_data
+
+LIMITE_MEN = 50000
+LIMITE_SECOP = 50000
+
+
+def _como_se_lee(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Pasa el DataFrame por Parquet para que su huella sea la misma que calculará
+    la app al leer el artefacto.
+    """
+    return pd.read_parquet(io.BytesIO(df.to_parquet(index=False)))
+
+
+# ===================================================================
+# Conjunto: MEN
+# ===================================================================
+def materializar_men(limite: int | None = LIMITE_MEN, ruta_csv: str | None = None) -> dict:
+    """
+    Datos del MEN, bases del DANE, modelo estrella enriquecido con la población
+    del DANE y su cubo, y geometría simplificada de los departamentos para cada
+    nivel de zoom del mapa.
+    Returns:
+        dict: `tablas`, `archivos` y `metadatos` para `publicar_version`.
+    Raises:
+        RuntimeError: Si no llegan datos del MEN.
+    """
+    import almacen
+    import geometria
+    from cargar_datos import COLUMNAS_NUMERICAS_MEN, DATASET_MEN
+
+    with medir("carga", "MEN"):
+        if ruta_csv:
+            df_raw = pd.read_csv(ruta_csv, dtype=str)
+        else:
+            df_raw = cargar_dataset(DATASET_MEN, limit=limite, numericas=COLUMNAS_NUMERICAS_MEN)
+    if df_raw.empty:
+        raise RuntimeError("La consulta del MEN no devolvió registros")
+    df_raw = _como_se_lee(df_raw)
+
+    rutas_dane = [os.path.join(RAIZ, "Datos", "Info_2005_2019.xlsx"),
+                  os.path.join(RAIZ, "Datos", "Info_2020_2035.xlsx")]
+    df_poblacion, df_densidad = (_como_se_lee(df) for df in leer_excels_cacheados(rutas_dane))
+
+    # Igual que la pestaña de transformación: el modelo se enriquece con la
+    # población que la app recibe del artefacto, así la huella coincide
+    modelo = construir_modelo_estrella(df_raw, df_poblacion)
+
+    archivos = {}
+    for tolerancia in sorted(set(geometria.TOLERANCIAS_ZOOM.values())):
+        try:
+            archivos[geometria.nombre_artefacto(tolerancia)] = geometria.preparar_geometria(tolerancia)
+        except Exception as e:
+            # Sin shapefile el mapa lo intentará en la app, como hasta ahora
+            print(f"⚠️ Geometría con tolerancia {tolerancia} omitida: {e}")
+
+    return {
+        "tablas": {
+            "df_raw": df_raw,
+            "df_poblacion": df_poblacion,
+            "df_densidad": df_densidad,
+            "dim_tiempo": modelo.dim_tiempo,
+            "dim_geo": modelo.dim_geo,
+            "hechos": modelo.df_fact,
+            "cubo": modelo.df_cubo,
+        },
+        "archivos": archivos,
+        "metadatos": {
+            "huella": almacen.huella_datos(df_raw, df_poblacion),
+            "registros_originales": modelo.registros_originales,
+            "registros_validos": modelo.registros_validos,
+            "enriquecido_dane": modelo.enriquecido,
+            "fuente": ruta_csv or f"datos.gov.co/{DATASET_MEN}",
+            "limite": None if ruta_csv else limite,
+        },
+    }
+
+
+# ===================================================================
+# Conjunto: SECOP
+# ===================================================================
+def materializar_secop(limite: int | None = LIMITE_SECOP, ruta_csv: str | None = None,
+                       usar_servidor: bool = True) -> dict:
+    """
+    Contratos limpios (sincronización incremental, la misma de la app), índice
+    de población del DANE y agregados por departamento y por mes. Los agregados
+    del servidor solo se publican si datos.gov.co respondió; los locales siempre.
+    Returns:
+        dict: `tablas`, `archivos` y `metadatos` para `publicar_version`.
+    Raises:
+        RuntimeError: Si no hay contratos.
+    """
+    from cargar_datos_secop import sincronizar_secop
+    from consultas_secop import agregados_secop, preparar_contratacion
+    from poblacion import ARCHIVOS_POBLACION
+
+    if ruta_csv:
+        with medir("carga", "SECOP (CSV)"):
+            df_secop = clean_secop_data(pd.read_csv(ruta_csv, dtype=str), optimizar_memoria=True)
+    else:
+        df_secop = sincronizar_secop(limit_inicial=limite, optimizar_memoria=True)
+    if df_secop.empty:
+        raise RuntimeError("No hay contratos de SECOP para materializar")
+    df_contratacion = preparar_contratacion(df_secop)
+
+    hojas = leer_excels_cacheados(ARCHIVOS_POBLACION, columns=COLUMNAS_DANE,
+                                  filtros={'ÁREA GEOGRÁFICA': ['Total']})
+    df_poblacion = pd.concat([normalizar_poblacion(h) for h in hojas], ignore_index=True)
+
+    tablas = {"contratacion": df_contratacion, "poblacion_dane": df_poblacion}
+    origenes = ["local"]
+    if usar_servidor:
+        por_departamento, evolucion, origen = agregados_secop(lambda: df_contratacion, True)
+        if origen == "servidor":
+            tablas.update(por_departamento_servidor=por_departamento, evolucion_servidor=evolucion)
+            origenes.insert(0, "servidor")
+    por_departamento, evolucion, _ = agregados_secop(lambda: df_contratacion, False)
+    tablas.update(por_departamento_local=por_departamento, evolucion_local=evolucion)
+
+    return {
+        "tablas": tablas,
+        "archivos": {},
+        "metadatos": {
+            "contratos": len(df_contratacion),
+            "agregados": origenes,
+            "fuente": ruta_csv or "datos.gov.co/rpmr-utcd",
+        },
+    }
+
+
+# ===================================================================
+# Ejecutar
+# ===================================================================
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Precalcula y publica los artefactos de los dashboards")
+    parser.add_argument("conjuntos", nargs="*", metavar="{men,secop}",
+                        help="Conjuntos a materializar (por defecto, ambos)")
+    parser.add_argument("--men-csv", help="CSV del MEN en lugar de la API (por ejemplo Codigos/df_men.csv)")
+    parser.add_argument("--secop-csv", help="CSV de SECOP en lugar de la API (por ejemplo Codigos/df_secop.csv)")
+    parser.add_argument("--limite-men", type=int, default=LIMITE_MEN)
+    parser.add_argument("--limite-secop", type=int, default=LIMITE_SECOP)
+    parser.add_argument("--sin-servidor", action="store_true",
+                        help="No consultar los agregados SoQL de SECOP en datos.gov.co")
+    parser.add_argument("--conservar", type=int, default=artefactos.CONSERVAR_VERSIONES,
+                        help="Versiones que se mantienen en disco por conjunto")
+    parser.add_argument("--directorio", default=artefactos.DIRECTORIO_ARTEFACTOS)
+    args = parser.parse_args(argv)
+
+    pipelines = {
+        "men": lambda: materializar_men(args.limite_men, args.men_csv),
+        "secop": lambda: materializar_secop(args.limite_secop, args.secop_csv, not args.sin_servidor),
+    }
+
+    desconocidos = set(args.conjuntos) - set(pipelines)
+    if desconocidos:
+        parser.error(f"conjuntos desconocidos: {', '.join(sorted(desconocidos))}")
+
+    fallidos = []
+    for conjunto in dict.fromkeys(args.conjuntos or pipelines):
+        traza = iniciar_traza()
+        try:
+            with medir("materialización", conjunto):
+                resultado = pipelines[conjunto]()
+                version, nueva = artefactos.publicar_version(
+                    conjunto, resultado["tablas"], resultado["archivos"], resultado["metadatos"],
+                    directorio=args.directorio, conservar=args.conservar
+                )
+        except Exception as e:
+            print(f"❌ {conjunto}: {e}")
+            fallidos.append(conjunto)
+            continue
+
+        estado = "publicada" if nueva else "sin cambios, se mantiene"
+        print(f"✅ {conjunto}: versión {version} {estado}")
+        for m in mediciones(traza):
+            print(f"    {m.etapa:<16} {m.nombre:<32} {m.duracion_s:>8.2f} s")
+
+    return 1 if fallidos else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
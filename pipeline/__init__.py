@@ -0,0 +1,10 @@
+"""
+Lógica de transformación de los dashboards, sin dependencias de Streamlit.
+
+Las pestañas, los benchmarks y los procesos por lotes llaman a estas funciones;
+los resultados pesados se memoizan por la huella de los datos de entrada.
+"""
+from pipeline.cubo import CuboAgregado, construir_cubo
+from pipeline.huella import huella_datos, memoizar_por_huella
+from pipeline.modelo_estrella import ModeloEstrella, construir_modelo_estrella
+from pipeline.secop import clean_secop_data
@@ -0,0 +1,87 @@
+import pandas as pd
+from typing import Sequence
+
+from pipeline.ranking import Ranking
+from comun.rendimiento import medir
+
+METRICAS_CUBO = ['cobertura_neta', 'cobertura_bruta', 'tasa_matriculaci_n_5_16']
+NIVELES_CUBO = ['c_digo_departamento', 'departamento', 'municipio', 'a_o']
+
+
+# ===================================================================
+# Función: construir_cubo
+# ===================================================================
+@medir("agregación", "Cubo agregado")
+def construir_cubo(df_fact: pd.DataFrame, dim_geo: pd.DataFrame, dim_tiempo: pd.DataFrame) -> pd.DataFrame:
+    """
+    Construye el cubo base con sumas y conteos por departamento, municipio y año.
+    Guardar sumas y conteos (y no promedios) permite obtener el promedio exacto
+    en cualquier nivel de agregación.
+    """
+    df = df_fact.merge(dim_geo, on='id_geo').merge(dim_tiempo, on='id_tiempo')
+    agregados = {}
+    for metrica in METRICAS_CUBO:
+        agregados[f'suma_{metrica}'] = (metrica, 'sum')
+        agregados[f'n_{metrica}'] = (metrica, 'count')
+    return df.groupby(NIVELES_CUBO, as_index=False).agg(**agregados)
+
+
+# ===================================================================
+# Clase: CuboAgregado
+# ===================================================================
+class CuboAgregado:
+    """
+    Consulta promedios sobre el cubo. Cada nivel de agregación se calcula una sola
+    vez (unas pocas filas) y queda indexado; las consultas de los widgets son
+    búsquedas sobre ese índice.
+    """
+
+    def __init__(self, base: pd.DataFrame):
+        self.base = base
+        self._rollups = {}
+        self._rankings = {}
+
+    def rollup(self, niveles: Sequence[str]) -> pd.DataFrame:
+        """
+        Devuelve los promedios de todas las métricas agrupados por `niveles`,
+        indexados y ordenados por esos mismos niveles.
+        """
+        niveles = tuple(niveles)
+        if niveles not in self._rollups:
+            sumas = self.base.groupby(list(niveles)).sum(numeric_only=True)
+            promedios = pd.DataFrame(index=sumas.index)
+            for metrica in METRICAS_CUBO:
+                promedios[metrica] = sumas[f'suma_{metrica}'] / sumas[f'n_{metrica}']
+            self._rollups[niveles] = promedios.sort_index()
+        return self._rollups[niveles]
+
+    def corte(self, niveles: Sequence[str], metricas=None, **filtros) -> pd.DataFrame:
+        """
+        Promedios agrupados por `niveles` + las llaves de `filtros`, restringidos a los
+        valores de `filtros`. Ejemplo: `corte(['departamento'], a_o=2023)`.
+        """
+        metricas = metricas or METRICAS_CUBO
+        llaves = list(filtros)
+        tabla = self.rollup(llaves + [n for n in niveles if n not in llaves])
+        if llaves:
+            clave = tuple(filtros.values()) if len(llaves) > 1 else filtros[llaves[0]]
+            try:
+                tabla = tabla.xs(clave, level=llaves if len(llaves) > 1 else 0, drop_level=True)
+            except KeyError:
+                tabla = tabla.iloc[0:0].droplevel(llaves)
+        return tabla[list(metricas)].reset_index()
+
+    def ranking(self, niveles: Sequence[str], metrica: str, n: int = 10,
+                ascendente: bool = False, **filtros) -> pd.DataFrame:
+        """
+        Las `n` entradas de `niveles` con mayor promedio de `metrica`, con filtros
+        opcionales sobre otros niveles. Ejemplo: `ranking(['departamento'], 'cobertura_neta', a_o=2023)`.
+        Los rankings quedan en caché por nivel, métrica y filtros.
+        """
+        niveles = tuple(niveles) + tuple(f for f in filtros if f not in niveles)
+        if niveles not in self._rankings:
+            self._rankings[niveles] = Ranking(self.rollup(niveles).reset_index())
+        return self._rankings[niveles].top(metrica, n, ascendente, **filtros)
+
+    def valores(self, nivel: str) -> list:
+        return sorted(self.base[nivel].dropna().unique().tolist())
@@ -0,0 +1,71 @@
+import hashlib
+import weakref
+from functools import wraps
+
+import pandas as pd
+
+from comun.cache_compartido import CACHE_DATOS, CacheCompartido
+
+# Huellas ya calculadas por identidad de objeto: id -> (referencia débil, huella)
+_huellas = {}
+
+
+# ===================================================================
+# Función: huella_dataframe
+# ===================================================================
+def huella_dataframe(df: pd.DataFrame) -> str:
+    """
+    Huella del contenido de un DataFrame (columnas y valores). Se recuerda por
+    identidad del objeto, así que pasar el mismo DataFrame en cada rerun no vuelve
+    a recorrerlo. Se asume que los DataFrames no se modifican en el lugar.
+    """
+    guardada = _huellas.get(id(df))
+    if guardada is not None and guardada[0]() is df:
+        return guardada[1]
+
+    h = hashlib.sha1("|".join(map(str, df.columns)).encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    huella = h.hexdigest()
+
+    clave = id(df)
+    _huellas[clave] = (weakref.ref(df, lambda _: _huellas.pop(clave, None)), huella)
+    return huella
+
+
+# ===================================================================
+# Función: huella_datos
+# ===================================================================
+def huella_datos(*objetos, sal: str = "") -> str:
+    """
+    Combina las huellas de varios argumentos. Los DataFrames se resumen con
+    `huella_dataframe`; `None` y los demás valores con su `repr`.
+    """
+    h = hashlib.sha1(sal.encode())
+    for obj in objetos:
+        h.update(huella_dataframe(obj).encode() if isinstance(obj, pd.DataFrame) else repr(obj).encode())
+        h.update(b"|")
+    return h.hexdigest()
+
+
+# ===================================================================
+# Decorador: memoizar_por_huella
+# ===================================================================
+def memoizar_por_huella(cache: CacheCompartido = CACHE_DATOS):
+    """
+    Memoiza una función pura según la huella de sus argumentos posicionales y
+    con nombre (los DataFrames se resumen por contenido). Los resultados viven
+    en la caché compartida del proceso (LRU con presupuesto de memoria y
+    candado), así que si dos sesiones piden lo mismo a la vez se calcula una vez.
+    """
+    def decorador(funcion):
+        prefijo = ("memo", funcion.__module__, funcion.__qualname__)
+
+        @wraps(funcion)
+        def envoltura(*args, **kwargs):
+            nombrados = [v for nombre in sorted(kwargs) for v in (nombre, kwargs[nombre])]
+            clave = prefijo + (huella_datos(*args, "**", *nombrados),)
+            return cache.obtener(clave, lambda: funcion(*args, **kwargs))
+
+        envoltura.limpiar_cache = lambda: cache.invalidar(lambda clave: clave[:3] == prefijo)
+        return envoltura
+    return decorador
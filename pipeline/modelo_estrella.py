@@ -0,0 +1,182 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import pandas as pd
+
+from pipeline.cubo import construir_cubo
+from pipeline.huella import memoizar_por_huella
+from comun.rendimiento import medir
+from pipeline.poblacion import COLUMNAS_DANE, indice_poblacion
+
+# Columnas del MEN que usa el modelo estrella
+COLUMNAS_RELEVANTES = [
+    'a_o', 'departamento', 'municipio', 'c_digo_departamento', 'c_digo_municipio',
+    'poblaci_n_5_16', 'tasa_matriculaci_n_5_16',
+    'cobertura_neta', 'cobertura_bruta'
+]
+
+COLUMNAS_POBLACION = COLUMNAS_DANE
+
+
+# ===================================================================
+# Función: unificar_departamentos
+# ===================================================================
+def unificar_departamentos(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Quita el total NACIONAL y deja un único nombre por código de departamento.
+    """
+    tabla_deptos = (
+        df.query("departamento != 'NACIONAL'")
+        [['c_digo_departamento', 'departamento']]
+        .drop_duplicates()
+        .groupby('c_digo_departamento')
+        .sample(n=1, random_state=1)
+        .reset_index(drop=True)
+    )
+
+    return (
+        df.query("departamento != 'NACIONAL'")
+        .drop(columns='departamento')
+        .merge(tabla_deptos, on='c_digo_departamento', how='left')
+    )
+
+
+# ===================================================================
+# Función: limpiar_men
+# ===================================================================
+@medir("limpieza", "Limpieza MEN")
+def limpiar_men(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Selecciona las columnas relevantes, convierte las métricas a número y
+    descarta filas incompletas. Se asume que las columnas ya fueron validadas.
+    """
+    df = df[COLUMNAS_RELEVANTES].copy()
+    df.columns = [c.lower() for c in df.columns]
+    for col in df.columns:
+        if col not in ['departamento', 'municipio', 'c_digo_departamento']:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df.dropna()
+
+
+# ===================================================================
+# Función: enriquecer_con_dane
+# ===================================================================
+@medir("transformación", "Enriquecimiento DANE")
+def enriquecer_con_dane(df_clean: pd.DataFrame, df_pob: pd.DataFrame) -> pd.DataFrame:
+    """
+    Agrega la población total del DANE de cada municipio y año, y calcula el
+    porcentaje de matriculados frente a esa población. El cruce es una consulta
+    por lotes al índice de población, por códigos DANE y no por nombres.
+    """
+    indice = indice_poblacion(df_pob)
+    df_enriq = df_clean.assign(**{'Población': indice.buscar(
+        df_clean['c_digo_departamento'], df_clean['c_digo_municipio'], df_clean['a_o'], area='total'
+    )})
+
+    df_enriq = df_enriq.dropna(subset=['Población'])
+    df_enriq['%_matriculados_vs_pob_total'] = (
+        df_enriq['poblaci_n_5_16'] / df_enriq['Población']) * 100
+    return df_enriq
+
+
+# ===================================================================
+# Función: crear_dimension
+# ===================================================================
+def crear_dimension(df, cols, nombre, sort_col=None):
+    dim = df[cols].drop_duplicates()
+    if sort_col:
+        dim = dim.sort_values(by=sort_col)
+    dim = dim.reset_index(drop=True)
+    dim[f"id_{nombre}"] = dim.index + 1
+    return dim[[f"id_{nombre}"] + cols]
+
+
+# ===================================================================
+# Función: construir_dimensiones
+# ===================================================================
+@medir("transformación", "Dimensiones")
+def construir_dimensiones(df_clean: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Construye las dimensiones de tiempo y geográfica.
+    """
+    dim_tiempo = crear_dimension(df_clean, ['a_o'], 'tiempo')
+    dim_geo = df_clean[['c_digo_departamento', 'departamento', 'municipio']].copy()
+    dim_geo = dim_geo.sort_values(by=['c_digo_departamento', 'municipio'])
+    dim_geo = dim_geo.drop_duplicates(subset=['c_digo_departamento'], keep='first').reset_index(drop=True)
+    dim_geo['id_geo'] = dim_geo.index + 1
+    dim_geo = dim_geo[['id_geo', 'c_digo_departamento', 'departamento', 'municipio']]
+    return dim_tiempo, dim_geo
+
+
+# ===================================================================
+# Función: construir_tabla_hechos
+# ===================================================================
+@medir("transformación", "Tabla de hechos")
+def construir_tabla_hechos(df_clean: pd.DataFrame, dim_tiempo: pd.DataFrame,
+                           dim_geo: pd.DataFrame) -> pd.DataFrame:
+    """
+    Une los datos limpios con las dimensiones y deja solo llaves y métricas.
+    """
+    df_fact = df_clean.merge(dim_tiempo, on='a_o') \
+                      .merge(dim_geo, on=['departamento', 'municipio', 'c_digo_departamento'], how='inner')
+
+    columnas_fact = ['id_tiempo', 'id_geo', 'poblaci_n_5_16',
+                     'tasa_matriculaci_n_5_16', 'cobertura_neta', 'cobertura_bruta']
+    if '%_matriculados_vs_pob_total' in df_fact.columns:
+        columnas_fact.append('%_matriculados_vs_pob_total')
+
+    return df_fact[columnas_fact]
+
+
+# ===================================================================
+# Clase: ModeloEstrella
+# ===================================================================
+@dataclass(frozen=True)
+class ModeloEstrella:
+    """
+    Resultado del pipeline del MEN: dimensiones, tabla de hechos y cubo agregado.
+    """
+    dim_tiempo: pd.DataFrame
+    dim_geo: pd.DataFrame
+    df_fact: pd.DataFrame
+    df_cubo: pd.DataFrame
+    registros_originales: int
+    registros_validos: int
+    enriquecido: bool
+
+
+# ===================================================================
+# Función: construir_modelo_estrella
+# ===================================================================
+@medir("transformación", "Modelo estrella")
+@memoizar_por_huella()
+def construir_modelo_estrella(df_raw: pd.DataFrame, df_pob: Optional[pd.DataFrame] = None) -> ModeloEstrella:
+    """
+    Ejecuta el pipeline completo del MEN sin depender de Streamlit: limpieza,
+    enriquecimiento opcional con el DANE, dimensiones, tabla de hechos y cubo.
+    El resultado se memoiza por la huella de las entradas.
+    Raises:
+        ValueError: Si faltan columnas en `df_raw` o en `df_pob`.
+    """
+    faltantes = [col for col in COLUMNAS_RELEVANTES if col not in df_raw.columns]
+    if faltantes:
+        raise ValueError(f"Columnas faltantes: {faltantes}")
+    if df_pob is not None and not all(col in df_pob.columns for col in COLUMNAS_POBLACION):
+        raise ValueError("Las columnas esperadas no están presentes en el archivo de población.")
+
+    df_clean = limpiar_men(unificar_departamentos(df_raw.copy()))
+    registros_validos = len(df_clean)
+    if df_pob is not None:
+        df_clean = enriquecer_con_dane(df_clean, df_pob)
+
+    dim_tiempo, dim_geo = construir_dimensiones(df_clean)
+    df_fact = construir_tabla_hechos(df_clean, dim_tiempo, dim_geo)
+    return ModeloEstrella(
+        dim_tiempo=dim_tiempo,
+        dim_geo=dim_geo,
+        df_fact=df_fact,
+        df_cubo=construir_cubo(df_fact, dim_geo, dim_tiempo),
+        registros_originales=len(df_raw),
+        registros_validos=registros_validos,
+        enriquecido=df_pob is not None,
+    )
@@ -0,0 +1,85 @@
+import re
+import numpy as np
+import pandas as pd
+import unidecode
+from typing import Callable, Optional
+
+# ---------- Tabla de alias configurable ----------
+# Nombre normalizado -> nombre canónico. Se puede pasar otra tabla a las funciones.
+ALIAS_DEPARTAMENTOS = {
+    "bogota dc": "bogota",
+    "bogota d c": "bogota",
+    "distrito capital de bogota": "bogota",
+    "bogota, d c": "bogota",
+    "archipielago de san andres": "san andres",
+    "san andres providencia y santa catalina": "san andres",
+    "no definido": "sin_departamento"
+}
+
+# ---------- Funciones escalares (se aplican solo a valores únicos) ----------
+def normalizar_departamento(nombre):
+    if pd.isna(nombre):
+        return ""
+    nombre = unidecode.unidecode(str(nombre).lower().strip())
+    nombre = re.sub(r"[-_\.]", " ", nombre)
+    nombre = re.sub(r"\s+", " ", nombre)
+    return nombre.strip()
+
+def estandarizar_texto(valor) -> str:
+    return "" if pd.isna(valor) else str(valor).strip().lower()
+
+def corregir_alias_departamento(nombre, alias: Optional[dict] = None):
+    alias = ALIAS_DEPARTAMENTOS if alias is None else alias
+    return alias.get(nombre, nombre)
+
+# ---------- Aplicación vectorizada por cardinalidad ----------
+def aplicar_por_valores_unicos(serie: pd.Series, funcion: Callable,
+                               categorica: bool = True) -> pd.Series:
+    """
+    Aplica `funcion` una sola vez por valor distinto y difunde el resultado a todas
+    las filas mediante los códigos enteros, así el costo depende de la cardinalidad
+    y no del número de filas.
+    Args:
+        serie (pd.Series): Serie de texto u objeto categórico.
+        categorica (bool): Si es True devuelve `category`; si no, `object`.
+    """
+    codigos, unicos = pd.factorize(serie, use_na_sentinel=False)
+    resultado = np.array([funcion(valor) for valor in unicos], dtype=object)
+    if not categorica:
+        return pd.Series(resultado.take(codigos), index=serie.index, name=serie.name)
+
+    # Varios valores pueden normalizarse al mismo resultado: se re-codifican los únicos
+    codigos_resultado, categorias = pd.factorize(resultado, use_na_sentinel=True)
+    return pd.Series(
+        pd.Categorical.from_codes(codigos_resultado.take(codigos), categories=categorias),
+        index=serie.index, name=serie.name
+    )
+
+def normalizar_departamentos(serie: pd.Series, alias: Optional[dict] = None,
+                             categorica: bool = True) -> pd.Series:
+    """
+    Normaliza y corrige alias de nombres de departamento de forma vectorizada.
+    """
+    return aplicar_por_valores_unicos(
+        serie, lambda nombre: corregir_alias_departamento(normalizar_departamento(nombre), alias),
+        categorica=categorica
+    )
+
+# ---------- Claves enteras para los cruces ----------
+def catalogo_departamentos(df_pob: pd.DataFrame, col_nombre: str = 'departamento_entidad',
+                           col_codigo: str = 'DP') -> dict:
+    """
+    Construye el catálogo nombre normalizado -> código DANE del departamento.
+    """
+    pares = df_pob[[col_nombre, col_codigo]].drop_duplicates(subset=col_nombre)
+    codigos = pd.to_numeric(pares[col_codigo], errors='coerce')
+    validos = codigos.notna()
+    return dict(zip(pares.loc[validos, col_nombre].astype(str), codigos[validos].astype(int)))
+
+def codificar_departamentos(serie: pd.Series, catalogo: dict) -> pd.Series:
+    """
+    Traduce nombres normalizados al código entero del DANE (`Int64`, nulo si no
+    existe en el catálogo). Solo se consulta el catálogo una vez por valor distinto.
+    """
+    codigos = aplicar_por_valores_unicos(serie, lambda nombre: catalogo.get(nombre), categorica=False)
+    return codigos.astype("Int64")
@@ -0,0 +1,154 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from pipeline.huella import memoizar_por_huella
+from comun.rendimiento import medir
+
+# Columnas de las proyecciones municipales del DANE
+COLUMNAS_DANE = ['DP', 'DPNOM', 'DPMP', 'MPIO', 'AÑO', 'ÁREA GEOGRÁFICA', 'Población']
+
+# Código numérico de cada área geográfica dentro de la llave del índice
+AREAS = {
+    'total': 0,
+    'cabecera municipal': 1,
+    'centros poblados y rural disperso': 2,
+}
+
+# Municipio 0 = agregado departamental, que se precalcula al construir el índice
+TOTAL_DEPARTAMENTO = 0
+
+
+# ===================================================================
+# Función: normalizar_poblacion
+# ===================================================================
+def normalizar_poblacion(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convierte una hoja del DANE a tipos numéricos una sola vez: códigos y año
+    como enteros, población como número (quitando separadores de miles si la
+    columna llega como texto) y área como código de `AREAS`. Se descartan las
+    filas de notas al pie, que no tienen códigos válidos.
+    """
+    poblacion = df['Población']
+    if not pd.api.types.is_numeric_dtype(poblacion):
+        poblacion = (poblacion.astype(str)
+                     .str.replace(".", "", regex=False)
+                     .str.replace(",", "", regex=False))
+
+    df = pd.DataFrame({
+        'DP': pd.to_numeric(df['DP'], errors='coerce'),
+        'MPIO': pd.to_numeric(df['MPIO'], errors='coerce'),
+        'AÑO': pd.to_numeric(df['AÑO'], errors='coerce'),
+        'area': df['ÁREA GEOGRÁFICA'].astype(str).str.strip().str.lower().map(AREAS),
+        'Población': pd.to_numeric(poblacion, errors='coerce'),
+        'DPNOM': df['DPNOM'],
+        'DPMP': df['DPMP'],
+    }).dropna(subset=['DP', 'MPIO', 'AÑO', 'area'])
+    return df.astype({'DP': 'int64', 'MPIO': 'int64', 'AÑO': 'int64', 'area': 'int64'})
+
+
+def _claves(dp, mpio, anio, area) -> np.ndarray:
+    """
+    Empaqueta (departamento, municipio, año, área) en un entero de 64 bits.
+    Conserva el orden lexicográfico de la tupla, así que ordenar las llaves
+    equivale a ordenar por departamento, municipio, año y área.
+    """
+    dp, mpio, anio, area = (np.asarray(v, dtype=np.int64) for v in (dp, mpio, anio, area))
+    return ((dp * 100_000 + mpio) * 10_000 + anio) * 10 + area
+
+
+# ===================================================================
+# Clase: IndicePoblacion
+# ===================================================================
+class IndicePoblacion:
+    """
+    Población del DANE indexada por (código de departamento, código de
+    municipio, año, área). Las llaves viven en un arreglo ordenado y las
+    consultas se resuelven por lotes con búsqueda binaria (`np.searchsorted`).
+
+    Además de los municipios, guarda el agregado de cada departamento con
+    municipio `TOTAL_DEPARTAMENTO`.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        """
+        Args:
+            df (pd.DataFrame): Salida de `normalizar_poblacion` (una o varias hojas unidas).
+        """
+        municipal = df.groupby(['DP', 'MPIO', 'AÑO', 'area'], as_index=False, sort=False)['Población'].sum()
+        departamental = (municipal.groupby(['DP', 'AÑO', 'area'], as_index=False, sort=False)['Población'].sum()
+                         .assign(MPIO=TOTAL_DEPARTAMENTO))
+        tabla = pd.concat([municipal, departamental], ignore_index=True)
+
+        claves = _claves(tabla['DP'], tabla['MPIO'], tabla['AÑO'], tabla['area'])
+        orden = np.argsort(claves, kind='stable')
+        self.claves = claves[orden]
+        self.valores = tabla['Población'].to_numpy(dtype=np.float64)[orden]
+
+        self.anios = np.unique(tabla['AÑO'].to_numpy())
+        self.departamentos = (df[['DP', 'DPNOM']].drop_duplicates(subset='DP')
+                              .sort_values('DP').reset_index(drop=True))
+        self.municipios = (df[['DP', 'MPIO', 'DPNOM', 'DPMP']].drop_duplicates(subset='MPIO')
+                           .sort_values('MPIO').reset_index(drop=True))
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.claves.nbytes + self.valores.nbytes
+                   + self.departamentos.memory_usage(deep=True).sum()
+                   + self.municipios.memory_usage(deep=True).sum())
+
+    def buscar(self, dp, mpio, anio, area: str = 'total') -> np.ndarray:
+        """
+        Devuelve la población para cada combinación de códigos (arreglos o
+        escalares que se difunden entre sí). Las llaves inexistentes o con
+        valores nulos devuelven NaN.
+        """
+        dp, mpio, anio = (pd.to_numeric(pd.Series(np.atleast_1d(v)), errors='coerce').to_numpy(dtype=np.float64)
+                          for v in (dp, mpio, anio))
+        dp, mpio, anio = np.broadcast_arrays(dp, mpio, anio)
+        validos = ~(np.isnan(dp) | np.isnan(mpio) | np.isnan(anio))
+
+        resultado = np.full(dp.shape, np.nan)
+        if not validos.any() or len(self.claves) == 0:
+            return resultado
+        buscadas = _claves(dp[validos], mpio[validos], anio[validos], AREAS[area])
+        posiciones = np.searchsorted(self.claves, buscadas)
+        posiciones = np.minimum(posiciones, len(self.claves) - 1)
+        encontradas = self.claves[posiciones] == buscadas
+        resultado[np.flatnonzero(validos)[encontradas]] = self.valores[posiciones[encontradas]]
+        return resultado
+
+    def tabla(self, area: str = 'total', nivel: str = 'municipio', anio: Optional[int] = None) -> pd.DataFrame:
+        """
+        Reconstruye un DataFrame del índice para un área, a nivel de 'municipio'
+        o de 'departamento', opcionalmente para un solo año.
+        """
+        anios = self.anios if anio is None else np.array([anio])
+        if nivel == 'departamento':
+            base = self.departamentos.assign(MPIO=TOTAL_DEPARTAMENTO)
+        else:
+            base = self.municipios
+        filas = base.loc[base.index.repeat(len(anios))].reset_index(drop=True)
+        filas['AÑO'] = np.tile(anios, len(base))
+        filas['Población'] = self.buscar(filas['DP'], filas['MPIO'], filas['AÑO'], area)
+        return filas.dropna(subset=['Población'])
+
+
+# ===================================================================
+# Función: indice_poblacion
+# ===================================================================
+@medir("transformación", "Índice de población")
+@memoizar_por_huella()
+def indice_poblacion(*hojas: pd.DataFrame) -> IndicePoblacion:
+    """
+    Construye el índice a partir de una o varias hojas crudas del DANE. Se
+    memoiza por la huella de las hojas, así que cada archivo se parsea una vez.
+    Raises:
+        ValueError: Si a alguna hoja le faltan columnas de `COLUMNAS_DANE`.
+    """
+    for hoja in hojas:
+        faltantes = [col for col in COLUMNAS_DANE if col not in hoja.columns]
+        if faltantes:
+            raise ValueError(f"Columnas faltantes en el archivo de población: {faltantes}")
+    return IndicePoblacion(pd.concat([normalizar_poblacion(h) for h in hojas], ignore_index=True))
@@ -0,0 +1,47 @@
+import math
+
+import pandas as pd
+
+
+# ===================================================================
+# Función: top_n
+# ===================================================================
+def top_n(df: pd.DataFrame, metrica: str, n: int = 10, ascendente: bool = False) -> pd.DataFrame:
+    """
+    Las `n` filas con mayor (o menor) `metrica`, ya ordenadas. Usa selección
+    parcial (`nlargest`/`nsmallest`), sin ordenar toda la tabla. Los NaN se omiten.
+    """
+    if ascendente:
+        return df.nsmallest(n, metrica)
+    return df.nlargest(n, metrica)
+
+
+# ===================================================================
+# Clase: Ranking
+# ===================================================================
+class Ranking:
+    """
+    Rankings sobre una tabla de agregados fija. Cada combinación de métrica,
+    sentido y filtros se calcula una vez; pedir un N menor o igual reutiliza el
+    resultado guardado, y solo un N mayor vuelve a seleccionar sobre la tabla.
+    """
+
+    def __init__(self, tabla: pd.DataFrame):
+        self.tabla = tabla
+        self._tops = {}  # (metrica, ascendente, filtros) -> (n calculado, top)
+
+    def top(self, metrica: str, n: int = 10, ascendente: bool = False, **filtros) -> pd.DataFrame:
+        """
+        Ejemplo: `top('cobertura_neta', 5, a_o=2023)`.
+        """
+        clave = (metrica, ascendente, tuple(sorted(filtros.items())))
+        calculado, top = self._tops.get(clave, (0, None))
+        if n > calculado:
+            tabla = self.tabla
+            for columna, valor in filtros.items():
+                tabla = tabla[tabla[columna] == valor]
+            top = top_n(tabla, metrica, n, ascendente).reset_index(drop=True)
+            # Si hay menos filas que n, el ranking ya está completo para cualquier N
+            calculado = n if len(top) == n else math.inf
+            self._tops[clave] = (calculado, top)
+        return top.head(n)
@@ -0,0 +1,126 @@
+import re
+import pandas as pd
+import unidecode
+
+from pipeline.normalizacion import aplicar_por_valores_unicos, estandarizar_texto
+from comun.rendimiento import medir
+
+def _limpiar_nombre_departamento(nombre: str) -> str:
+    nombre = unidecode.unidecode(nombre)
+    nombre = re.sub(r'[^a-z\s]', '', nombre)
+    nombre = re.sub(" +", " ", nombre)
+    return nombre.strip().lower()
+
+# Columnas de baja cardinalidad que se guardan como `category` en modo optimizado
+COLUMNAS_CATEGORICAS = [
+    'tipo_de_contrato', 'modalidad_de_contrataci_n', 'estado_del_proceso',
+    'departamento_entidad', 'municipio_entidad', 'origen'
+]
+
+# Columnas que identifican un contrato para la deduplicación por hash
+COLUMNAS_CLAVE = [
+    'numero_del_contrato', 'numero_de_proceso', 'nit_de_la_entidad',
+    'documento_proveedor', 'valor_contrato', 'fecha_de_firma_del_contrato'
+]
+
+def _reducir_numericos(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Reduce el tamaño de las columnas numéricas. Los flotantes solo pasan a entero
+    cuando no tienen nulos ni decimales, para no perder precisión en valores monetarios.
+    """
+    for col in df.select_dtypes(include='number').columns:
+        serie = df[col]
+        if serie.dtype.kind == 'f':
+            if serie.isna().any() or not (serie == serie.round()).all():
+                continue
+        df[col] = pd.to_numeric(serie, downcast='integer')
+    return df
+
+def _tipo_texto_libre() -> str:
+    try:
+        import pyarrow  # noqa: F401
+        return "string[pyarrow]"
+    except ImportError:
+        return "string"
+
+def _clave_normalizada(serie: pd.Series) -> pd.Series:
+    # `_reducir_numericos` decide el dtype por lote: el mismo valor puede llegar
+    # como int32 en un lote y como float64 en otro (si ese lote trae nulos)
+    if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+        return serie.astype('float64')
+    return serie.astype(str)
+
+def hash_contratos(df: pd.DataFrame) -> pd.Series:
+    """
+    Calcula un hash de 64 bits por fila a partir de las columnas clave, en lugar
+    de todas las columnas (textos largos como `objeto_a_contratar` o `url_contrato`).
+    Los numéricos se comparan como float64 y el resto como texto, así que un
+    contrato da el mismo hash en lotes con dtypes distintos.
+    """
+    claves = [col for col in COLUMNAS_CLAVE if col in df.columns] or list(df.columns)
+    normalizado = pd.DataFrame({col: _clave_normalizada(df[col]) for col in claves}, index=df.index)
+    return pd.util.hash_pandas_object(normalizado, index=False)
+
+def _filas_duplicadas(df: pd.DataFrame) -> pd.Series:
+    return hash_contratos(df).duplicated()
+
+@medir("limpieza", "Limpieza SECOP")
+def clean_secop_data(df: pd.DataFrame, optimizar_memoria: bool = False) -> pd.DataFrame:
+    """
+    Limpieza y transformación básica de datos de SECOP.
+    Args:
+        df (pd.DataFrame): DataFrame original cargado desde la API.
+        optimizar_memoria (bool): Usa `category` en columnas de baja cardinalidad,
+            reduce los numéricos, guarda el texto libre como cadenas Arrow y
+            deduplica por hash de las columnas clave.
+    Returns:
+        pd.DataFrame: DataFrame limpio y transformado.
+    """
+    df = df.copy()
+
+    # 1. Limpiar nombres de columnas
+    df.columns = df.columns.str.strip().str.lower()
+    df.columns = [unidecode.unidecode(col).replace(" ", "_") for col in df.columns]
+
+    # 2. Convertir columnas de fecha a datetime si existen
+    for col in ['fecha_inicio_ejecucion', 'fecha_fin_ejecucion']:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+
+    # 3. Convertir columnas numéricas
+    if 'valor_contrato' in df.columns:
+        df['valor_contrato'] = pd.to_numeric(df['valor_contrato'], errors='coerce')
+
+    if 'documento_proveedor' in df.columns and df['documento_proveedor'].dtype == object:
+        df['documento_proveedor'] = (
+            df['documento_proveedor']
+            .str.replace(".", "", regex=False)
+            .pipe(pd.to_numeric, errors='coerce')
+        )
+
+    # 4. Estandarizar texto en columnas de tipo objeto
+    texto_cols = df.select_dtypes(include='object').columns
+    for col in texto_cols:
+        if optimizar_memoria and col in COLUMNAS_CATEGORICAS:
+            df[col] = aplicar_por_valores_unicos(df[col], estandarizar_texto)
+        else:
+            df[col] = df[col].fillna("").str.strip().str.lower()
+
+    # 5. Normalización adicional de nombres de departamentos
+    if 'departamento_entidad' in df.columns:
+        # Se limpia una vez por valor distinto (~35 departamentos) y se difunde a las filas
+        df['departamento_entidad'] = aplicar_por_valores_unicos(
+            df['departamento_entidad'], _limpiar_nombre_departamento, categorica=optimizar_memoria
+        )
+
+    if not optimizar_memoria:
+        # 6. Eliminar duplicados
+        df.drop_duplicates(inplace=True)
+        return df
+
+    # 6. Tipos compactos y eliminación de duplicados por hash de columnas clave
+    df = _reducir_numericos(df)
+    tipo_texto = _tipo_texto_libre()
+    for col in df.select_dtypes(include='object').columns:
+        df[col] = df[col].astype(tipo_texto)
+    return df[~_filas_duplicadas(df).to_numpy()]
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Las apps importan sus módulos como planos (`import almacen`, `import consultas_secop`),
+# igual que cuando Streamlit las ejecuta desde su carpeta
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for carpeta in (RAIZ, os.path.join(RAIZ, "Dashboard_clase"), os.path.join(RAIZ, "Reto_dashboard")):
+    if carpeta not in sys.path:
+        sys.path.insert(0, carpeta)
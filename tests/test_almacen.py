@@ -0,0 +1,58 @@
+import os
+
+import pandas as pd
+import pytest
+
+import almacen
+
+
+def _modelo(n):
+    dim_tiempo = pd.DataFrame({"id_tiempo": range(n), "anio": range(2000, 2000 + n)})
+    dim_geo = pd.DataFrame({"id_geo": range(n), "departamento": [f"d{i}" for i in range(n)]})
+    hechos = pd.DataFrame({"id_tiempo": range(n), "id_geo": range(n), "valor": [1.0] * n})
+    cubo = pd.DataFrame({"departamento": [f"d{i}" for i in range(n)], "valor": [1.0] * n})
+    return dim_tiempo, dim_geo, hechos, cubo
+
+
+def test_un_modelo_por_huella(tmp_path):
+    directorio = str(tmp_path)
+    almacen.materializar_modelo(*_modelo(2), "h1", directorio=directorio)
+    almacen.materializar_modelo(*_modelo(3), "h2", extra={"registros_validos": 3}, directorio=directorio)
+
+    # El modelo de otros datos no reemplaza al de la primera sesión
+    assert almacen.existe_modelo("h1", directorio) and almacen.existe_modelo("h2", directorio)
+    assert not almacen.existe_modelo("h3", directorio) and not almacen.existe_modelo(None, directorio)
+    assert len(almacen.consultar("SELECT * FROM hechos", almacen.ruta_modelo("h1", directorio))) == 2
+    assert len(almacen.consultar("SELECT * FROM hechos", almacen.ruta_modelo("h2", directorio))) == 3
+    assert almacen.leer_metadatos("h2", directorio)["registros_validos"] == "3"
+    tablas = set(almacen.consultar("SELECT name FROM sqlite_master WHERE type = 'table'",
+                                   almacen.ruta_modelo("h2", directorio))["name"])
+    assert tablas == {"dim_tiempo", "dim_geo", "hechos", "cubo", "metadatos"}
+    assert sorted(os.listdir(directorio)) == ["h1.db", "h2.db"]
+
+
+def test_si_falla_no_queda_modelo_a_medias(tmp_path):
+    directorio = str(tmp_path)
+    almacen.materializar_modelo(*_modelo(2), "h1", directorio=directorio)
+
+    dim_tiempo, dim_geo, hechos, cubo = _modelo(3)
+    # Sin la columna `departamento` falla la creación de índices, después de escribir las tablas
+    with pytest.raises(Exception):
+        almacen.materializar_modelo(dim_tiempo, dim_geo.drop(columns="departamento"), hechos, cubo,
+                                    "h2", directorio=directorio)
+
+    assert not almacen.existe_modelo("h2", directorio)
+    assert os.listdir(directorio) == ["h1.db"]
+    assert len(almacen.consultar("SELECT * FROM hechos", almacen.ruta_modelo("h1", directorio))) == 2
+
+
+def test_conserva_solo_los_modelos_recientes(tmp_path, monkeypatch):
+    monkeypatch.setattr(almacen, "MODELOS_CONSERVADOS", 2)
+    directorio = str(tmp_path)
+    for i in range(3):
+        almacen.materializar_modelo(*_modelo(2), f"h{i}", directorio=directorio)
+        os.utime(almacen.ruta_modelo(f"h{i}", directorio), (i, i))
+
+    almacen.materializar_modelo(*_modelo(2), "h3", directorio=directorio)
+
+    assert sorted(os.listdir(directorio)) == ["h2.db", "h3.db"]
@@ -0,0 +1,26 @@
+import pandas as pd
+import pytest
+
+from comun import artefactos, memoria_compartida
+
+
+@pytest.fixture(autouse=True)
+def sin_memoria_compartida(monkeypatch):
+    monkeypatch.setattr(memoria_compartida, "COMPARTIR_ACTIVO", False)
+
+
+def test_version_resuelta_sobrevive_a_una_publicacion(tmp_path):
+    directorio = str(tmp_path)
+    v1, _ = artefactos.publicar_version("secop", {"poblacion_dane": pd.DataFrame({"DP": [5]})},
+                                        directorio=directorio)
+    version = artefactos.version_vigente("secop", directorio)
+
+    # Otra publicación entre resolver la versión y leer la tabla
+    v2, nueva = artefactos.publicar_version("secop", {"contratacion": pd.DataFrame({"x": [1]})},
+                                            directorio=directorio)
+    assert nueva and v2 != v1 == version
+    assert not artefactos.tiene("secop", "poblacion_dane", directorio=directorio)
+
+    assert artefactos.tiene("secop", "poblacion_dane", version, directorio)
+    leida = artefactos.leer_tabla("secop", "poblacion_dane", version, directorio)
+    assert leida["DP"].tolist() == [5]
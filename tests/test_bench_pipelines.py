@@ -0,0 +1,59 @@
+import importlib.util
+import json
+import os
+
+import pandas as pd
+import pytest
+
+# `benchmarks/` no es un paquete: el script se carga desde su ruta
+RUTA_BENCH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "bench_pipelines.py")
+_spec = importlib.util.spec_from_file_location("bench_pipelines", RUTA_BENCH)
+bench = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(bench)
+
+
+def test_regresiones_segun_umbral():
+    anterior = [{"caso": "a", "escala": 1, "segundos": 1.0}, {"caso": "b", "escala": 1, "segundos": 1.0}]
+    actual = [
+        {"caso": "a", "escala": 1, "segundos": 1.1},   # dentro del umbral
+        {"caso": "b", "escala": 1, "segundos": 1.5},   # regresión
+        {"caso": "b", "escala": 10, "segundos": 9.0},  # sin corrida anterior con esa escala
+    ]
+    assert bench.regresiones(actual, anterior, umbral=0.2) == ["b x1: 1.0s -> 1.5s"]
+
+
+def test_medir_y_escalar():
+    llamadas = []
+    medicion = bench.medir(lambda: llamadas.append(bytearray(2_000_000)), repeticiones=3)
+    assert len(llamadas) == 3
+    assert medicion["pico_mb"] >= 2 and medicion["segundos"] >= 0
+
+    df = pd.DataFrame({"a": [1, 2]})
+    assert bench.escalar(df, 1) is df
+    assert bench.escalar(df, 3)["a"].tolist() == [1, 2] * 3
+
+
+def test_main_agrega_al_historial_y_avisa_regresiones(tmp_path, monkeypatch, capsys):
+    duracion = {"caso": 0.0}
+    monkeypatch.setattr(bench, "casos", lambda escalas: [("caso", e, 10, lambda: None) for e in escalas])
+    monkeypatch.setattr(bench, "medir", lambda funcion, repeticiones: {"segundos": duracion["caso"], "pico_mb": 0.0})
+    historial = str(tmp_path / "historial.json")
+    argumentos = ["--escalas", "1", "--repeticiones", "1", "--historial", historial]
+
+    duracion["caso"] = 1.0
+    assert bench.main(argumentos) == 0
+    duracion["caso"] = 2.0
+    assert bench.main(argumentos) == 1
+    assert "Regresión: caso x1" in capsys.readouterr().out
+
+    with open(historial, encoding="utf-8") as f:
+        corridas = json.load(f)
+    assert [c["resultados"][0]["segundos"] for c in corridas] == [1.0, 2.0]
+    assert corridas[-1]["pandas"] == pd.__version__
+
+
+@pytest.mark.skipif(not os.path.exists(bench.RUTA_MEN), reason="sin la muestra del MEN")
+def test_modelo_estrella_y_agregaciones_sobre_la_muestra():
+    dim_tiempo, dim_geo, df_fact = bench.modelo_estrella(pd.read_csv(bench.RUTA_MEN, dtype=str, nrows=2000))
+    assert len(df_fact) > 0 and df_fact["id_geo"].isin(dim_geo["id_geo"]).all()
+    bench.agregaciones(dim_tiempo, dim_geo, df_fact)
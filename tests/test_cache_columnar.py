@@ -0,0 +1,66 @@
+import io
+import os
+import time
+
+import pandas as pd
+
+from comun import cache_columnar
+from comun.cache_columnar import cargar_con_cache, huella_fuente, leer_cache, leer_excels_cacheados
+
+
+def test_cargar_con_cache_reusa_y_expira(tmp_path):
+    directorio = str(tmp_path)
+    llamadas = []
+
+    def cargar():
+        llamadas.append(1)
+        return pd.DataFrame({"a": [1, 2], "b": ["x", "y"]})
+
+    primera = cargar_con_cache("api_prueba", cargar, directorio=directorio)
+    segunda = cargar_con_cache("api_prueba", cargar, directorio=directorio)
+    assert len(llamadas) == 1
+    pd.testing.assert_frame_equal(primera, segunda)
+    assert leer_cache("api_prueba", columns=["b"], directorio=directorio).columns.tolist() == ["b"]
+
+    ruta = os.path.join(directorio, "api_prueba.parquet")
+    os.utime(ruta, (time.time() - 100, time.time() - 100))
+    cargar_con_cache("api_prueba", cargar, max_edad=50, directorio=directorio)
+    assert len(llamadas) == 2
+
+
+def test_no_guarda_vacios(tmp_path):
+    cargar_con_cache("vacio", pd.DataFrame, directorio=str(tmp_path))
+    assert leer_cache("vacio", directorio=str(tmp_path)) is None
+
+
+def test_huella_cambia_con_contenido_y_argumentos(tmp_path):
+    ruta = tmp_path / "datos.xlsx"
+    ruta.write_bytes(b"uno")
+    base = huella_fuente(str(ruta), columns=["a"])
+    assert huella_fuente(str(ruta), columns=["b"]) != base
+    assert huella_fuente(io.BytesIO(b"uno"), columns=["a"]) == huella_fuente(io.BytesIO(b"uno"), columns=["a"])
+    ruta.write_bytes(b"dos")
+    assert huella_fuente(str(ruta), columns=["a"]) != base
+
+
+def test_excels_se_leen_una_sola_vez(tmp_path, monkeypatch):
+    fuentes = []
+    for nombre in ("a.xlsx", "b.xlsx"):
+        ruta = tmp_path / nombre
+        pd.DataFrame({"DP": [5, 8], "Población": [10, 20]}).to_excel(ruta, index=False)
+        fuentes.append(str(ruta))
+
+    lecturas = []
+    original = cache_columnar.leer_hojas_paralelo
+
+    def contar(rutas, *args, **kwargs):
+        lecturas.extend(rutas)
+        return original(rutas, *args, **kwargs)
+
+    monkeypatch.setattr(cache_columnar, "leer_hojas_paralelo", contar)
+    cache = str(tmp_path / "cache")
+    primera = leer_excels_cacheados(fuentes, columns=["DP"], directorio=cache)
+    segunda = leer_excels_cacheados(fuentes, columns=["DP"], directorio=cache)
+    assert lecturas == fuentes
+    assert [df["DP"].tolist() for df in segunda] == [[5, 8], [5, 8]]
+    pd.testing.assert_frame_equal(primera[0], segunda[0])
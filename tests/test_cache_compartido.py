@@ -0,0 +1,84 @@
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from comun import cache_compartido
+from comun.cache_compartido import CacheCompartido, no_vacio, tamano_bytes
+
+
+def test_descarta_las_entradas_menos_usadas_al_pasar_el_presupuesto():
+    cache = CacheCompartido(max_bytes=300)
+    for clave in "abc":
+        cache.put(clave, b"x" * 60)  # ~93 bytes cada una
+    cache.get("a")  # `a` pasa a ser la más reciente
+    cache.put("d", b"x" * 60)
+
+    assert cache.get("b") is None
+    assert all(cache.get(clave) is not None for clave in "acd")
+    assert cache.estadisticas()["bytes"] <= 300
+
+    # Un valor que por sí solo excede el presupuesto no desplaza a nadie
+    cache.put("enorme", b"x" * 1000)
+    assert cache.get("enorme") is None and cache.estadisticas()["entradas"] == 3
+
+
+def test_las_entradas_vencen(monkeypatch):
+    ahora = [1000.0]
+    monkeypatch.setattr(cache_compartido.time, "monotonic", lambda: ahora[0])
+    cache = CacheCompartido(max_bytes=10_000, ttl=60)
+    cache.put("corta", 1, ttl=5)
+    cache.put("larga", 2)
+
+    ahora[0] += 10
+    assert cache.get("corta") is None and cache.get("larga") == 2
+    ahora[0] += 60
+    assert cache.get("larga") is None
+    assert cache.estadisticas()["bytes"] == 0
+
+
+def test_obtener_carga_una_vez_y_respeta_guardar_si():
+    cache = CacheCompartido(max_bytes=10_000)
+    cargas = []
+
+    def cargar():
+        cargas.append(1)
+        time.sleep(0.05)
+        return pd.DataFrame({"a": [1]})
+
+    resultados = []
+    hilos = [threading.Thread(target=lambda: resultados.append(cache.obtener("df", cargar))) for _ in range(4)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    # Las sesiones que esperaban reciben el mismo objeto, cargado una sola vez
+    assert len(cargas) == 1 and all(r is resultados[0] for r in resultados)
+
+    # Un resultado vacío (por ejemplo, un error de red) no se guarda
+    vacios = []
+    for _ in range(2):
+        cache.obtener("vacio", lambda: vacios.append(1) or pd.DataFrame(), guardar_si=no_vacio)
+    assert len(vacios) == 2
+
+    cache.invalidar(lambda clave: clave == "df")
+    cache.obtener("df", cargar)
+    assert len(cargas) == 2
+    assert cache.estadisticas()["aciertos"] == 3
+
+
+def test_tamano_bytes():
+    df = pd.DataFrame({"a": np.arange(1000, dtype=np.int64)})
+    assert tamano_bytes(df) >= 8000
+    assert tamano_bytes(np.zeros(500)) == 4000
+    assert tamano_bytes((df, [df])) >= 16000
+
+    @dataclass(frozen=True)
+    class Modelo:
+        tabla: pd.DataFrame
+        registros: int
+
+    assert tamano_bytes(Modelo(df, 3)) >= 8000
+    assert not no_vacio((df, pd.DataFrame())) and no_vacio((df, df))
@@ -0,0 +1,46 @@
+import json
+
+import pandas as pd
+import pytest
+
+import cargar_datos_secop
+from cargar_datos_secop import leer_estado_sync, sincronizar_secop
+
+
+def _contratos(numeros, fecha):
+    return pd.DataFrame({"numero_del_contrato": numeros,
+                         "fecha_de_firma_del_contrato": [fecha] * len(numeros),
+                         "valor_contrato": ["100"] * len(numeros)})
+
+
+def test_sincronizacion_incremental(tmp_path, monkeypatch):
+    lotes = iter([_contratos(["c1", "c2"], "2024-01-01T00:00:00.000"),
+                  _contratos(["c2", "c3"], "2024-02-01T00:00:00.000")])
+    monkeypatch.setattr(cargar_datos_secop, "load_data_from_api", lambda **_: next(lotes))
+
+    sincronizar_secop(directorio=str(tmp_path))
+    df = sincronizar_secop(directorio=str(tmp_path))
+    assert sorted(df["numero_del_contrato"]) == ["c1", "c2", "c3"]
+    assert leer_estado_sync(str(tmp_path))["marca"] == "2024-02-01T00:00:00.000"
+    assert not [p for p in tmp_path.iterdir() if p.name.endswith(".tmp")]
+
+
+def test_falla_al_escribir_conserva_datos_y_marca(tmp_path, monkeypatch):
+    lotes = iter([_contratos(["c1"], "2024-01-01T00:00:00.000"),
+                  _contratos(["c2"], "2024-02-01T00:00:00.000")])
+    monkeypatch.setattr(cargar_datos_secop, "load_data_from_api", lambda **_: next(lotes))
+    sincronizar_secop(directorio=str(tmp_path))
+    estado = (tmp_path / "estado.json").read_text()
+
+    def escritura_cortada(self, ruta, *args, **kwargs):
+        with open(ruta, "wb") as f:
+            f.write(b"truncado")
+        raise OSError("disco lleno")
+
+    monkeypatch.setattr(pd.DataFrame, "to_pickle", escritura_cortada)
+    with pytest.raises(OSError):
+        sincronizar_secop(directorio=str(tmp_path))
+
+    assert (tmp_path / "estado.json").read_text() == estado
+    assert pd.read_pickle(tmp_path / "secop_limpio.pkl")["numero_del_contrato"].tolist() == ["c1"]
+    assert json.loads(estado)["registros"] == 1
@@ -0,0 +1,102 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import pytest
+import requests
+
+from comun import socrata
+from consultas_secop import DATASET_SECOP, agregados_secop
+
+# Contratos ya limpios, como los tiene la app para el respaldo local
+CONTRATOS = pd.DataFrame({
+    "departamento_entidad": ["antioquia", "antioquia", "caldas", "bogota d.c.", None],
+    "tipo_de_contrato": ["prestación de servicios", "obra", "obra", "obra", "suministros"],
+    "fecha_inicio_ejecuci_n": ["2023-01-10", "2023-01-20", "2023-02-01", "2017-05-01", "2023-02-15"],
+    "valor_contrato": [1000.5, 2000.0, 300.0, 50.0, 75.25],
+})
+# El servidor conserva las grafías originales; la app las consolida
+GRAFIAS_SERVIDOR = {"antioquia": "ANTIOQUIA", "caldas": "Caldas", "bogota d.c.": "Bogotá D.C."}
+
+
+def _responder_soql(params: dict) -> list[dict]:
+    """
+    Resuelve las dos consultas agregadas de `consultas_secop` sobre CONTRATOS,
+    con el formato de Socrata: todos los valores como texto.
+    """
+    df = CONTRATOS.assign(
+        departamento_entidad=CONTRATOS["departamento_entidad"].map(GRAFIAS_SERVIDOR),
+        fecha=pd.to_datetime(CONTRATOS["fecha_inicio_ejecuci_n"]),
+    )
+    if "count(*)" in params["$select"]:
+        conteo = df.groupby("departamento_entidad", dropna=False).size()
+        return [{"num_contratos": str(n)} | ({} if pd.isna(d) else {"departamento_entidad": d})
+                for d, n in conteo.items()]
+
+    desde = params["$where"].split("'")[1]
+    df = df[df["fecha"] >= desde].assign(anio_mes=lambda d: d["fecha"].dt.to_period("M").dt.to_timestamp())
+    suma = df.groupby(["anio_mes", "tipo_de_contrato"])["valor_contrato"].sum()
+    return [{"anio_mes": f"{mes:%Y-%m-%dT%H:%M:%S}.000", "tipo_de_contrato": tipo, "valor_contrato": str(valor)}
+            for (mes, tipo), valor in suma.items()]
+
+
+class _SocrataFalso(BaseHTTPRequestHandler):
+    rutas = []
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        self.rutas.append(url.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        cuerpo = json.dumps(_responder_soql(params)).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, *_):
+        pass
+
+
+@pytest.fixture
+def servidor(monkeypatch):
+    # Sesión sin reintentos: el caso sin conexión debe fallar de inmediato
+    monkeypatch.setattr(socrata, "_sesion", requests.Session())
+    _SocrataFalso.rutas = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _SocrataFalso)
+    hilo = threading.Thread(target=httpd.serve_forever, daemon=True)
+    hilo.start()
+    yield httpd, f"http://127.0.0.1:{httpd.server_port}/resource"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _ordenar(df: pd.DataFrame) -> pd.DataFrame:
+    return df.sort_values(list(df.columns[:-1])).reset_index(drop=True)
+
+
+def test_servidor_y_respaldo_local_coinciden(servidor):
+    httpd, base_url = servidor
+    cargas_locales = []
+
+    def cargar_local():
+        cargas_locales.append(1)
+        return CONTRATOS
+
+    por_depto_srv, evolucion_srv, origen = agregados_secop(cargar_local, True, base_url)
+    assert origen == "servidor"
+    assert cargas_locales == []
+    assert _SocrataFalso.rutas == [f"/resource/{DATASET_SECOP}.json"] * 2
+
+    # Sin conexión: el mismo servidor ya apagado
+    httpd.shutdown()
+    httpd.server_close()
+    por_depto_loc, evolucion_loc, origen = agregados_secop(cargar_local, True, base_url)
+    assert origen == "local"
+    assert cargas_locales == [1]
+
+    pd.testing.assert_frame_equal(_ordenar(por_depto_srv), _ordenar(por_depto_loc))
+    pd.testing.assert_frame_equal(_ordenar(evolucion_srv), _ordenar(evolucion_loc))
+    assert len(evolucion_loc) == 4  # el contrato de 2017 queda fuera
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pipeline.cubo import METRICAS_CUBO, CuboAgregado, construir_cubo
+
+
+def _modelo():
+    dim_geo = pd.DataFrame({
+        "id_geo": [0, 1, 2],
+        "c_digo_departamento": ["05", "05", "08"],
+        "departamento": ["ANTIOQUIA", "ANTIOQUIA", "ATLÁNTICO"],
+        "municipio": ["MEDELLÍN", "BELLO", "BARRANQUILLA"],
+    })
+    dim_tiempo = pd.DataFrame({"id_tiempo": [0, 1], "a_o": [2022, 2023]})
+    df_fact = pd.DataFrame({
+        "id_geo": [0, 0, 1, 1, 2, 2, 0],
+        "id_tiempo": [0, 1, 0, 1, 0, 1, 1],
+        "cobertura_neta": [80.0, 90.0, 60.0, np.nan, 70.0, 75.0, 100.0],
+        "cobertura_bruta": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0],
+        "tasa_matriculaci_n_5_16": [10.0, 20.0, 30.0, 40.0, 50.0, 60.0, 70.0],
+    })
+    return df_fact, dim_geo, dim_tiempo
+
+
+@pytest.fixture
+def cubo():
+    return CuboAgregado(construir_cubo(*_modelo()))
+
+
+def _promedios_directos(niveles):
+    df_fact, dim_geo, dim_tiempo = _modelo()
+    df = df_fact.merge(dim_geo, on="id_geo").merge(dim_tiempo, on="id_tiempo")
+    return df.groupby(niveles)[METRICAS_CUBO].mean().sort_index()
+
+
+@pytest.mark.parametrize("niveles", [["departamento"], ["a_o"], ["departamento", "a_o"],
+                                     ["c_digo_departamento", "departamento", "municipio"]])
+def test_rollup_da_el_promedio_exacto_de_los_hechos(cubo, niveles):
+    # Promediar promedios por municipio daría otro valor; las sumas y conteos no
+    pd.testing.assert_frame_equal(cubo.rollup(niveles), _promedios_directos(niveles), check_names=False)
+
+
+def test_rollup_se_calcula_una_vez_por_nivel(cubo):
+    assert cubo.rollup(["departamento"]) is cubo.rollup(("departamento",))
+
+
+def test_corte_filtra_por_otros_niveles(cubo):
+    corte = cubo.corte(["departamento"], ["cobertura_neta"], a_o=2023)
+    assert corte.set_index("departamento")["cobertura_neta"].to_dict() == {"ANTIOQUIA": 95.0, "ATLÁNTICO": 75.0}
+
+    assert cubo.corte(["departamento"], a_o=1999).empty
+
+
+def test_ranking_y_valores(cubo):
+    top = cubo.ranking(["municipio"], "tasa_matriculaci_n_5_16", n=2)
+    assert top["municipio"].tolist() == ["BARRANQUILLA", "BELLO"]
+
+    top_2022 = cubo.ranking(["municipio"], "cobertura_neta", n=1, ascendente=True, a_o=2022)
+    assert top_2022["municipio"].tolist() == ["BELLO"]
+
+    assert cubo.valores("a_o") == [2022, 2023]
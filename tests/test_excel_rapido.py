@@ -0,0 +1,25 @@
+import os
+
+import pandas as pd
+import pytest
+
+from comun import excel_rapido
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DANE = [os.path.join(RAIZ, "Datos", "Info_2005_2019.xlsx"), os.path.join(RAIZ, "Datos", "Info_2020_2035.xlsx")]
+
+
+@pytest.mark.skipif(not excel_rapido.CALAMINE_DISPONIBLE, reason="python-calamine no está instalado")
+def test_mismos_tipos_que_read_excel():
+    # DP y MPIO están guardados como texto ('05', '05001'); read_excel los vuelve enteros
+    esperado = pd.read_excel(DANE[0])
+    pd.testing.assert_frame_equal(excel_rapido.leer_hoja(DANE[0]), esperado)
+
+
+def test_archivos_pequenos_se_leen_en_serie(monkeypatch):
+    monkeypatch.setattr(excel_rapido, "_cpus_disponibles", lambda: 8)
+    assert not excel_rapido._conviene_paralelo(DANE, max_procesos=4)
+    monkeypatch.setattr(excel_rapido, "MIN_MB_PARALELO", 1)
+    assert excel_rapido._conviene_paralelo(DANE, max_procesos=4)
+    monkeypatch.setattr(excel_rapido, "_cpus_disponibles", lambda: 1)
+    assert not excel_rapido._conviene_paralelo(DANE, max_procesos=4)
@@ -0,0 +1,71 @@
+import json
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pytest
+from shapely.geometry import Polygon
+
+import geometria
+
+
+@pytest.mark.parametrize("zoom, tolerancia", [(3, 0.01), (5, 0.01), (6, 0.01), (7, 0.003), (8, 0.003),
+                                              (9, 0.001), (12, 0.001)])
+def test_tolerancia_para_zoom(zoom, tolerancia):
+    assert geometria.tolerancia_para_zoom(zoom) == tolerancia
+
+
+@pytest.fixture
+def shapefile(tmp_path):
+    # Dos departamentos vecinos con un borde compartido muy detallado, en coordenadas
+    # planas (MAGNA-SIRGAS / Origen Nacional) para que la reproyección cuente
+    borde = [(4_900_000, 1_900_000 + i * 100) for i in range(101)]
+    oeste = Polygon([(4_890_000, 1_900_000)] + borde + [(4_890_000, 1_910_000)])
+    este = Polygon([(4_910_000, 1_900_000)] + borde + [(4_910_000, 1_910_000)])
+    gdf = gpd.GeoDataFrame({geometria.CODIGO_COL: ["5", "8"]}, geometry=[oeste, este], crs="EPSG:9377")
+    ruta = tmp_path / "dptos.shp"
+    gdf.to_file(ruta)
+    return str(ruta)
+
+
+def test_prepara_geojson_simplificado_una_vez(shapefile, tmp_path, monkeypatch):
+    directorio = str(tmp_path / "cache")
+    ruta = geometria.preparar_geometria(0.01, shapefile, directorio)
+
+    with open(ruta, encoding="utf-8") as f:
+        geojson = json.load(f)
+    codigos = [feature["properties"][geometria.CODIGO_COL] for feature in geojson["features"]]
+    assert codigos == ["05", "08"]
+    assert set(geojson["features"][0]["properties"]) == {geometria.CODIGO_COL}
+    # Reproyectado a WGS84 y con el borde de 101 vértices simplificado
+    x, y = geojson["features"][0]["geometry"]["coordinates"][0][0]
+    assert -80 < x < -66 and -5 < y < 14
+    assert len(geojson["features"][0]["geometry"]["coordinates"][0]) < 20
+
+    # La segunda vez no se vuelve a leer el shapefile; otra tolerancia es otro archivo
+    monkeypatch.setattr(gpd, "read_file", lambda *a, **k: pytest.fail("se volvió a leer el shapefile"))
+    assert geometria.preparar_geometria(0.01, shapefile, directorio) == ruta
+    monkeypatch.undo()
+    assert geometria.preparar_geometria(0.001, shapefile, directorio) != ruta
+
+
+def test_adjuntar_metricas_no_toca_la_geometria_en_cache():
+    geojson = {"type": "FeatureCollection", "features": [
+        {"type": "Feature", "id": codigo, "properties": {geometria.CODIGO_COL: codigo},
+         "geometry": {"type": "Point", "coordinates": [0, 0]}}
+        for codigo in ("05", "08", "11")
+    ]}
+    valores = pd.DataFrame({geometria.CODIGO_COL: ["05", "08"], "cobertura": [90.5, np.nan]})
+
+    con_metricas = geometria.adjuntar_metricas(geojson, valores)
+
+    propiedades = [feature["properties"] for feature in con_metricas["features"]]
+    assert propiedades == [
+        {geometria.CODIGO_COL: "05", "cobertura": 90.5},
+        {geometria.CODIGO_COL: "08", "cobertura": None},  # NaN -> null en el GeoJSON
+        {geometria.CODIGO_COL: "11", "cobertura": None},  # sin fila en `valores`
+    ]
+    json.dumps(con_metricas, allow_nan=False)
+    # La versión en caché queda igual y la geometría se comparte, no se copia
+    assert geojson["features"][0]["properties"] == {geometria.CODIGO_COL: "05"}
+    assert con_metricas["features"][0]["geometry"] is geojson["features"][0]["geometry"]
@@ -0,0 +1,68 @@
+import threading
+import time
+
+import matplotlib.pyplot as plt
+import pandas as pd
+import pytest
+
+import graficos_secop
+from comun.cache_compartido import CacheCompartido
+
+
+@pytest.fixture(autouse=True)
+def cache(monkeypatch):
+    # Una caché propia por prueba, en lugar de la compartida del proceso
+    cache = CacheCompartido(max_bytes=10 * 1024 * 1024)
+    monkeypatch.setattr(graficos_secop, "CACHE_DATOS", cache)
+    return cache
+
+
+def _top():
+    return pd.DataFrame({"departamento": ["ANTIOQUIA", "VALLE"], "contratos": [120.5, float("nan")]})
+
+
+def test_la_figura_se_reutiliza_mientras_los_datos_no_cambien():
+    opciones = dict(x="contratos", y="departamento", titulo="Top", eje_x="Contratos", eje_y="Departamento")
+    figura = graficos_secop.barras_top(_top(), **opciones)
+
+    # Otro DataFrame con el mismo contenido da la misma figura, sin reconstruirla
+    assert graficos_secop.barras_top(_top(), **opciones) is figura
+    assert graficos_secop.barras_top(_top(), **{**opciones, "titulo": "Otro"}) is not figura
+    otros = _top().assign(contratos=[1.0, 2.0])
+    assert graficos_secop.barras_top(otros, **opciones) is not figura
+
+    # Los valores viajan como JSON: NaN pasa a null
+    assert figura["data"]["values"] == [{"contratos": 120.5, "departamento": "ANTIOQUIA"},
+                                        {"contratos": None, "departamento": "VALLE"}]
+
+
+def test_sesiones_simultaneas_construyen_la_figura_una_vez(cache):
+    construcciones = []
+
+    @graficos_secop.cache_figura
+    def lenta(df, titulo):
+        construcciones.append(titulo)
+        time.sleep(0.05)
+        return {"title": titulo}
+
+    hilos = [threading.Thread(target=lenta, args=(_top(),), kwargs={"titulo": "Top"}) for _ in range(8)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert construcciones == ["Top"]
+    assert cache.estadisticas()["entradas"] == 1
+
+
+def test_png_cierra_la_figura():
+    abiertas = len(plt.get_fignums())
+    png = graficos_secop.png_matplotlib(_top().fillna(0), tipo="barras", x="contratos", y="departamento",
+                                        titulo="Top", eje_x="Contratos", eje_y="Departamento")
+    assert png.startswith(b"\x89PNG")
+    assert len(plt.get_fignums()) == abiertas
+
+    with pytest.raises(ValueError):
+        graficos_secop.png_matplotlib(_top(), tipo="torta", x="contratos", y="departamento",
+                                      titulo="", eje_x="", eje_y="")
+    assert len(plt.get_fignums()) == abiertas
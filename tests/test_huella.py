@@ -0,0 +1,59 @@
+import threading
+import time
+
+import pandas as pd
+
+from comun.cache_compartido import CacheCompartido
+from pipeline.huella import huella_datos, huella_dataframe, memoizar_por_huella
+
+
+def _grande(valor_central):
+    # Más filas de las que muestra `repr`: dos tablas distintas se imprimen igual
+    df = pd.DataFrame({"a": range(200)})
+    df.loc[100, "a"] = valor_central
+    return df
+
+
+def test_huella_por_contenido():
+    assert repr(_grande(-1)) == repr(_grande(-2))
+    assert huella_dataframe(_grande(-1)) != huella_dataframe(_grande(-2))
+    assert huella_dataframe(_grande(-1)) == huella_dataframe(_grande(-1))
+    assert huella_datos(_grande(-1), None) != huella_datos(_grande(-1))
+
+
+def test_memoiza_por_contenido_de_los_argumentos_con_nombre():
+    llamadas = []
+
+    @memoizar_por_huella(CacheCompartido(max_bytes=10 * 1024 * 1024))
+    def suma(df, extra=None):
+        llamadas.append(1)
+        return int(df["a"].sum()) + (0 if extra is None else int(extra["a"].sum()))
+
+    base = pd.DataFrame({"a": [1]})
+    assert suma(base, extra=_grande(-1)) != suma(base, extra=_grande(-2))
+    assert suma(base, extra=_grande(-1)) == suma(pd.DataFrame({"a": [1]}), extra=_grande(-1))
+    assert len(llamadas) == 2
+
+    suma.limpiar_cache()
+    suma(base, extra=_grande(-1))
+    assert len(llamadas) == 3
+
+
+def test_llamadas_simultaneas_calculan_una_vez():
+    llamadas = []
+
+    @memoizar_por_huella(CacheCompartido(max_bytes=10 * 1024 * 1024))
+    def lenta(df):
+        llamadas.append(1)
+        time.sleep(0.05)
+        return len(df)
+
+    resultados = []
+    hilos = [threading.Thread(target=lambda: resultados.append(lenta(_grande(0)))) for _ in range(8)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert resultados == [200] * 8
+    assert len(llamadas) == 1
@@ -0,0 +1,68 @@
+import pandas as pd
+
+from limpieza_por_lotes import procesar_secop_por_lotes
+from pipeline.secop import clean_secop_data, hash_contratos
+
+COLUMNAS = ['numero_del_contrato', 'documento_proveedor', 'valor_contrato',
+            'departamento_entidad', 'fecha_de_firma_del_contrato']
+
+
+def _lote(filas):
+    return pd.DataFrame(filas, columns=COLUMNAS)
+
+
+# El primer lote no tiene nulos (los numéricos se reducen a enteros); el segundo
+# trae un nulo y un decimal (se quedan en float64) y repite el contrato c1
+LOTE_1 = _lote([['c1', '6811186612', '1000', 'Antioquia', '2023-01-05'],
+                ['c2', '123', '2000', 'Caldas', '2023-02-05']])
+LOTE_2 = _lote([['c1', '6811186612', '1000', 'Antioquia', '2023-01-05'],
+                ['c3', None, '2500.5', 'Antioquia', '2024-03-01']])
+
+
+def test_hash_no_depende_del_dtype_del_lote():
+    limpio_1 = clean_secop_data(LOTE_1, optimizar_memoria=True)
+    limpio_2 = clean_secop_data(LOTE_2, optimizar_memoria=True)
+    assert limpio_1['documento_proveedor'].dtype != limpio_2['documento_proveedor'].dtype
+    assert hash_contratos(limpio_1).iloc[0] == hash_contratos(limpio_2).iloc[0]
+
+
+def test_duplicado_entre_lotes_y_dataset_legible(tmp_path):
+    estadisticas = procesar_secop_por_lotes([LOTE_1, LOTE_2], str(tmp_path))
+    assert estadisticas['duplicados'] == 1
+    assert estadisticas['filas_limpias'] == 3
+
+    df = pd.read_parquet(tmp_path)
+    assert sorted(df['numero_del_contrato']) == ['c1', 'c2', 'c3']
+    assert df.loc[df['numero_del_contrato'] == 'c3', 'valor_contrato'].item() == 2500.5
+
+
+class _SesionPaginada:
+    # Sesión simulada de Socrata con `total` contratos; registra las páginas pedidas
+    def __init__(self, total):
+        self.total, self.paginas = total, []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        if "count(*)" in params.get("$select", ""):
+            datos = [{"total": str(self.total)}]
+        else:
+            self.paginas.append(params["$offset"])
+            fin = min(params["$offset"] + params["$limit"], self.total)
+            datos = [{"numero_del_contrato": f"c{i}", "valor_contrato": str(i)}
+                     for i in range(params["$offset"], fin)]
+        return type("Respuesta", (), {"status_code": 200, "headers": {}, "json": lambda self: datos,
+                                      "raise_for_status": lambda self: None})()
+
+
+def test_lotes_de_la_api_no_se_adelantan(monkeypatch):
+    from comun import socrata
+    from limpieza_por_lotes import leer_lotes_api, limpiar_lotes
+
+    sesion = _SesionPaginada(10_000)
+    monkeypatch.setattr(socrata, "_sesion", sesion)
+    monkeypatch.setattr(socrata, "DIRECTORIO_HTTP", "")
+
+    lotes = limpiar_lotes(leer_lotes_api(tamano=100))
+    assert len(next(lotes)) == 100
+    # Solo las páginas en vuelo, no las 100 del dataset
+    assert len(sesion.paginas) <= socrata.MAX_HILOS + 1
+    lotes.close()
@@ -0,0 +1,49 @@
+import json
+
+import pandas as pd
+
+import mapa_cliente
+from geometria import CODIGO_COL
+from pipeline.cubo import CuboAgregado
+
+
+def _cubo():
+    base = pd.DataFrame({
+        "c_digo_departamento": [5, 5, 5, 8],
+        "departamento": ["ANTIOQUIA", "ANTIOQUIA", "ANTIOQUIA", "ATLÁNTICO"],
+        "municipio": ["MEDELLÍN", "BELLO", "MEDELLÍN", "BARRANQUILLA"],
+        "a_o": [2022, 2022, 2023, 2023],
+    })
+    for metrica, sumas, conteos in (
+        ("cobertura_neta", [80.0, 60.0, 90.0, 0.0], [1, 1, 1, 0]),
+        ("cobertura_bruta", [100.0, 110.0, 95.0, 120.0], [1, 1, 1, 1]),
+        ("tasa_matriculaci_n_5_16", [70.0, 50.0, 75.0, 65.0], [1, 1, 1, 1]),
+    ):
+        base[f"suma_{metrica}"] = sumas
+        base[f"n_{metrica}"] = conteos
+    return CuboAgregado(base)
+
+
+def test_valores_por_departamento():
+    valores = mapa_cliente.valores_por_departamento(_cubo(), ["cobertura_neta", "cobertura_bruta"])
+
+    assert valores[CODIGO_COL].tolist() == ["05", "08"]
+    antioquia, atlantico = valores["valores"]
+    assert antioquia == {"cobertura_neta": {2022: 70.0, 2023: 90.0},
+                         "cobertura_bruta": {2022: 105.0, 2023: 95.0}}
+    # Un año sin datos de la métrica no aparece en su serie
+    assert atlantico == {"cobertura_neta": {}, "cobertura_bruta": {2023: 120.0}}
+
+
+def test_mapa_cliente_lleva_todos_los_anios_y_metricas(monkeypatch):
+    geojson = {"type": "FeatureCollection", "features": [
+        {"type": "Feature", "id": "05", "properties": {CODIGO_COL: "05"},
+         "geometry": {"type": "Point", "coordinates": [-75.5, 6.2]}}
+    ]}
+    monkeypatch.setattr(mapa_cliente, "geometria_departamentos", lambda zoom: geojson)
+
+    html = mapa_cliente.construir_mapa_cliente(_cubo(), {"cobertura_neta": "Cobertura Neta (%)"})
+
+    assert "var anios = [2022, 2023];" in html
+    assert "var rangos = " + json.dumps({"cobertura_neta": [70.0, 90.0]}) + ";" in html
+    assert '"2022": 70.0' in html and "ANTIOQUIA" in html
@@ -0,0 +1,76 @@
+import multiprocessing
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from comun import memoria_compartida
+
+
+@pytest.fixture
+def directorio(tmp_path, monkeypatch):
+    monkeypatch.setattr(memoria_compartida, "COMPARTIR_ACTIVO", True)
+    monkeypatch.setattr(memoria_compartida, "_adjuntos", {})
+    return str(tmp_path)
+
+
+def _df(n=3):
+    return pd.DataFrame({"x": np.arange(n, dtype=np.float64), "texto": [f"t{i}" for i in range(n)],
+                         "fecha": pd.date_range("2024-01-01", periods=n)})
+
+
+def test_vista_de_solo_lectura_con_el_mismo_contenido(directorio):
+    df = memoria_compartida.dataframe_compartido("tabla", "v1", _df, directorio)
+
+    pd.testing.assert_frame_equal(df, _df(), check_dtype=False)
+    assert df["texto"].dtype == pd.StringDtype("pyarrow")
+    with pytest.raises(ValueError):
+        df["x"].to_numpy()[0] = 10
+    # Las sesiones del proceso reciben el mismo objeto mientras no cambie la versión
+    assert memoria_compartida.dataframe_compartido("tabla", "v1", _df, directorio) is df
+
+
+def test_nueva_version_borra_los_arrow_pero_no_el_bloqueo(directorio):
+    memoria_compartida.dataframe_compartido("tabla", "v1", _df, directorio)
+    bloqueo = os.path.join(directorio, "tabla--.lock")
+    inodo = os.stat(bloqueo).st_ino
+
+    memoria_compartida.dataframe_compartido("tabla", "v2", lambda: _df(5), directorio)
+    memoria_compartida.invalidar("tabla", directorio)
+
+    # Otro proceso podría estar esperando sobre el .lock: debe seguir siendo el mismo archivo
+    assert os.listdir(directorio) == ["tabla--.lock"]
+    assert os.stat(bloqueo).st_ino == inodo
+
+
+def _cargar_en_otro_proceso(directorio, marcas, inicio):
+    memoria_compartida._adjuntos.clear()
+    inicio.wait()
+
+    def cargar():
+        with open(marcas, "a") as f:
+            f.write("carga\n")
+        time.sleep(0.2)
+        return _df()
+
+    memoria_compartida.dataframe_compartido("tabla", "v1", cargar, directorio)
+
+
+@pytest.mark.skipif(memoria_compartida.fcntl is None, reason="sin flock")
+def test_un_solo_worker_carga_cada_version(directorio, tmp_path):
+    marcas = str(tmp_path / "marcas.txt")
+    contexto = multiprocessing.get_context("fork")
+    inicio = contexto.Event()
+    procesos = [contexto.Process(target=_cargar_en_otro_proceso, args=(directorio, marcas, inicio))
+                for _ in range(3)]
+    for proceso in procesos:
+        proceso.start()
+    inicio.set()
+    for proceso in procesos:
+        proceso.join(30)
+
+    assert [p.exitcode for p in procesos] == [0, 0, 0]
+    with open(marcas) as f:
+        assert f.read() == "carga\n"
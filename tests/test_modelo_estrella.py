@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pipeline.modelo_estrella import construir_modelo_estrella, enriquecer_con_dane, limpiar_men
+from pipeline.poblacion import IndicePoblacion, indice_poblacion, normalizar_poblacion
+
+
+def _men():
+    return pd.DataFrame({
+        "a_o": ["2018", "2019", "2019", "2023"],
+        "departamento": ["ANTIOQUIA", "ANTIOQUIA", "ATLÁNTICO", "ANTIOQUIA"],
+        "municipio": ["MEDELLÍN", "MEDELLÍN", "BARRANQUILLA", "MEDELLÍN"],
+        "c_digo_departamento": ["05", "05", "08", "05"],
+        "c_digo_municipio": ["05001", "05001", "08001", "05001"],
+        "poblaci_n_5_16": ["400000", "410000", "200000", "420000"],
+        "tasa_matriculaci_n_5_16": ["90.1", "91.2", "88.0", "92.0"],
+        "cobertura_neta": ["85.0", "86.0", "80.0", "87.0"],
+        "cobertura_bruta": ["100.0", "101.0", "95.0", "102.0"],
+    })
+
+
+def _dane():
+    # Como llega del Excel: códigos con ceros a la izquierda y población con separador de miles
+    filas = []
+    for dp, dpnom, mpio, dpmp, total in (("05", "Antioquia", "05001", "Medellín", 2_500_000),
+                                         ("08", "Atlántico", "08001", "Barranquilla", 1_200_000)):
+        for anio in (2018, 2019):
+            filas += [
+                (dp, dpnom, dpmp, mpio, anio, "Total", f"{total + anio:,}".replace(",", ".")),
+                (dp, dpnom, dpmp, mpio, anio, "Cabecera Municipal", f"{total // 2:,}".replace(",", ".")),
+            ]
+    filas.append(("Fuente: DANE", None, None, None, None, None, None))  # nota al pie
+    return pd.DataFrame(filas, columns=["DP", "DPNOM", "DPMP", "MPIO", "AÑO", "ÁREA GEOGRÁFICA", "Población"])
+
+
+def test_indice_poblacion_busca_por_codigos():
+    indice = IndicePoblacion(normalizar_poblacion(_dane()))
+
+    poblacion = indice.buscar(["05", 8, 5, 5, None], [5001, "08001", 5001, 9999, 5001], [2019, 2018, 2023, 2019, 2019])
+    np.testing.assert_array_equal(poblacion, [2_502_019, 1_202_018, np.nan, np.nan, np.nan])
+    assert indice.buscar(5, 5001, 2018, area="cabecera municipal")[0] == 1_250_000
+    # El agregado departamental se precalcula con municipio 0
+    assert indice.buscar(8, 0, 2019)[0] == 1_202_019
+
+
+def test_enriquecer_cruza_por_codigos_dane():
+    enriquecido = enriquecer_con_dane(limpiar_men(_men()), _dane())
+
+    # 2023 no está en las proyecciones: la fila se descarta
+    assert enriquecido["a_o"].tolist() == [2018, 2019, 2019]
+    assert enriquecido["Población"].tolist() == [2_502_018, 2_502_019, 1_202_019]
+    assert enriquecido["%_matriculados_vs_pob_total"].iloc[2] == pytest.approx(200_000 / 1_202_019 * 100)
+
+
+def test_modelo_con_dane():
+    sin_dane = construir_modelo_estrella(_men())
+    con_dane = construir_modelo_estrella(_men(), _dane())
+
+    assert not sin_dane.enriquecido and con_dane.enriquecido
+    assert len(sin_dane.df_fact) == 4 and len(con_dane.df_fact) == 3
+    assert "%_matriculados_vs_pob_total" in con_dane.df_fact.columns
+
+    with pytest.raises(ValueError):
+        indice_poblacion(_dane().drop(columns="DPMP"))
@@ -0,0 +1,37 @@
+import pandas as pd
+
+from pipeline.normalizacion import (aplicar_por_valores_unicos, catalogo_departamentos,
+                                    codificar_departamentos, normalizar_departamentos)
+
+
+def test_normaliza_alias_y_grafias():
+    serie = pd.Series(["BOGOTÁ D.C.", "Bogotá, D.C.", "  Antioquia ", "Distrito Capital de Bogotá", None])
+    resultado = normalizar_departamentos(serie)
+    assert isinstance(resultado.dtype, pd.CategoricalDtype)
+    assert resultado.tolist() == ["bogota", "bogota", "antioquia", "bogota", ""]
+    # Varias grafías comparten categoría
+    assert sorted(resultado.cat.categories) == ["", "antioquia", "bogota"]
+
+
+def test_funcion_se_aplica_una_vez_por_valor():
+    llamadas = []
+
+    def contar(valor):
+        llamadas.append(valor)
+        return str(valor).upper()
+
+    serie = pd.Series(["a", "b", "a", "a", "b"] * 100, index=range(10, 510))
+    resultado = aplicar_por_valores_unicos(serie, contar, categorica=False)
+    assert sorted(llamadas) == ["a", "b"]
+    assert resultado.index.equals(serie.index)
+    assert resultado.iloc[:3].tolist() == ["A", "B", "A"]
+
+
+def test_codifica_con_catalogo_dane():
+    df_pob = pd.DataFrame({"departamento_entidad": ["antioquia", "bogota", "antioquia"],
+                           "DP": ["05", "11", "05"]})
+    catalogo = catalogo_departamentos(df_pob)
+    assert catalogo == {"antioquia": 5, "bogota": 11}
+    codigos = codificar_departamentos(pd.Series(["bogota", "narnia", "antioquia"]), catalogo)
+    assert codigos.dtype == "Int64"
+    assert codigos.tolist() == [11, pd.NA, 5]
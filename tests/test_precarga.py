@@ -0,0 +1,64 @@
+import threading
+
+import pytest
+
+from comun import artefactos, precarga
+
+
+def test_precarga_en_paralelo_sin_bloquear():
+    liberar = threading.Event()
+    iniciadas = threading.Barrier(3, timeout=5)
+
+    def tarea(valor):
+        def ejecutar():
+            iniciadas.wait()  # solo pasa si las dos tareas corren a la vez
+            liberar.wait(5)
+            return valor
+        return ejecutar
+
+    def falla():
+        raise RuntimeError("sin red")
+
+    p = precarga.Precarga({"a": tarea(1), "b": tarea(2), "c": falla}, max_hilos=3)
+    iniciadas.wait()
+    # Mientras tanto, la interfaz solo consulta el estado
+    assert not p.listo("a", "b") and p.progreso("a", "b") == (0, 2)
+    assert p.listo("no_existe")
+
+    liberar.set()
+    assert p.resultado("a", timeout=5) == 1 and p.resultado("b", timeout=5) == 2
+    with pytest.raises(RuntimeError):
+        p.resultado("c", timeout=5)
+    assert p.listo() and p.progreso() == (3, 3)
+    assert set(p.errores()) == {"c"}
+    assert set(p.duraciones) == {"a", "b", "c"}
+
+
+def test_una_precarga_por_app(monkeypatch):
+    monkeypatch.setattr(precarga, "_precargas", {})
+    llamadas = []
+
+    monkeypatch.setattr(precarga, "PRECARGA_ACTIVA", False)
+    assert precarga.iniciar_precarga("app", {"x": lambda: llamadas.append(1)}) is None
+
+    monkeypatch.setattr(precarga, "PRECARGA_ACTIVA", True)
+    primera = precarga.iniciar_precarga("app", {"x": lambda: llamadas.append(1)})
+    # Los reruns siguientes reciben la misma instancia y no relanzan las tareas
+    assert precarga.iniciar_precarga("app", {"x": lambda: llamadas.append(2)}) is primera
+    assert precarga.precarga_de("app") is primera and precarga.precarga_de("otra") is None
+    primera.resultado("x", timeout=5)
+    assert llamadas == [1]
+
+
+@pytest.mark.parametrize("publicados, usar_servidor, esperadas", [
+    (set(), False, ["contratacion", "poblacion"]),
+    (set(), True, ["poblacion"]),  # el servidor agrega; los contratos no hacen falta
+    ({"por_departamento_local", "poblacion_dane"}, False, []),
+    ({"por_departamento_local"}, True, ["poblacion"]),
+    ({"poblacion_dane"}, False, ["contratacion"]),
+])
+def test_la_pestana_secop_espera_solo_lo_que_usa(monkeypatch, publicados, usar_servidor, esperadas):
+    import visualizaciones_secop
+
+    monkeypatch.setattr(artefactos, "tiene", lambda conjunto, nombre, version=None, **_: nombre in publicados)
+    assert visualizaciones_secop.precargas_necesarias(usar_servidor) == esperadas
@@ -0,0 +1,89 @@
+import json
+
+import pandas as pd
+import pytest
+
+from comun import rendimiento
+from comun.rendimiento import exportar_otlp, iniciar_traza, medir, mediciones, segundos_en_render
+
+
+@pytest.fixture(autouse=True)
+def registro_vacio(monkeypatch):
+    monkeypatch.setattr(rendimiento, "RENDIMIENTO_ACTIVO", True)
+    rendimiento.REGISTRO.clear()
+    yield
+    rendimiento.REGISTRO.clear()
+
+
+def test_etapas_anidadas_comparten_traza():
+    traza = iniciar_traza()
+    with medir("render", "Pestaña"):
+        with medir("carga", "Datos"):
+            pass
+        with medir("render", "Figura"):
+            pass
+
+    datos, figura, pestana = mediciones(traza)
+    assert [m.nombre for m in (datos, figura, pestana)] == ["Datos", "Figura", "Pestaña"]
+    assert pestana.padre_id is None
+    assert datos.padre_id == figura.padre_id == pestana.span_id
+    assert len({m.span_id for m in (datos, figura, pestana)}) == 3
+
+    # La figura ya está dentro del tiempo de la pestaña
+    assert segundos_en_render([datos, figura, pestana]) == pestana.duracion_s
+
+
+def test_decorador_cuenta_filas_y_registra_errores():
+    @medir("limpieza")
+    def limpiar(df):
+        return df.head(2)
+
+    @medir("carga", "Falla")
+    def fallar():
+        raise ValueError("sin datos")
+
+    traza = iniciar_traza()
+    limpiar(pd.DataFrame({"a": range(5)}))
+    with pytest.raises(ValueError):
+        fallar()
+
+    limpieza, falla = mediciones(traza)
+    assert (limpieza.filas_entrada, limpieza.filas_salida) == (5, 2)
+    assert limpieza.nombre.endswith("limpiar")
+    assert falla.error == "ValueError: sin datos"
+
+
+def test_reiniciar_la_traza_dentro_de_una_etapa():
+    iniciar_traza()
+    # Antes, la etapa buscaba su medición en la pila nueva y fallaba con ValueError
+    with pytest.raises(KeyError):
+        with medir("render", "Pestaña"):
+            iniciar_traza()
+            raise KeyError("original")
+    assert mediciones()[-1].error == "KeyError: 'original'"
+
+
+def test_exportar_otlp():
+    traza = iniciar_traza()
+    with medir("render", "Pestaña"):
+        with medir("carga", "Datos", filas_entrada=10) as m:
+            m.filas_salida = 3
+    try:
+        with medir("exportación", "Excel"):
+            raise RuntimeError("disco lleno")
+    except RuntimeError:
+        pass
+
+    documento = json.loads(exportar_otlp(mediciones(traza), "dashboard_men"))
+    recurso = documento["resourceSpans"][0]
+    assert recurso["resource"]["attributes"] == [{"key": "service.name", "value": {"stringValue": "dashboard_men"}}]
+    datos, pestana, excel = recurso["scopeSpans"][0]["spans"]
+
+    assert {s["traceId"] for s in (datos, pestana, excel)} == {traza}
+    assert datos["parentSpanId"] == pestana["spanId"] and "parentSpanId" not in pestana
+    assert int(datos["endTimeUnixNano"]) >= int(datos["startTimeUnixNano"])
+    atributos = {a["key"]: a["value"] for a in datos["attributes"]}
+    assert atributos["etapa"] == {"stringValue": "carga"}
+    assert atributos["filas.entrada"] == {"intValue": "10"} and atributos["filas.salida"] == {"intValue": "3"}
+    assert pestana["status"] == {"code": 1}
+    assert excel["status"] == {"code": 2, "message": "RuntimeError: disco lleno"}
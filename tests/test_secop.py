@@ -0,0 +1,37 @@
+import pandas as pd
+
+from pipeline.secop import COLUMNAS_CATEGORICAS, clean_secop_data
+
+
+def _crudo(n=300):
+    df = pd.DataFrame({
+        "Numero del Contrato": [f"c{i}" for i in range(n)],
+        "departamento_entidad": ["Bogotá D.C.", "ANTIOQUIA", "Valle del Cauca"] * (n // 3),
+        "tipo_de_contrato": ["Prestación de servicios ", "Obra"] * (n // 2),
+        "valor_contrato": [str(1000 * (i % 7)) for i in range(n)],
+        "documento_proveedor": ["1.234.567"] * n,
+        "objeto_a_contratar": [f"Objeto largo del contrato número {i}" for i in range(n)],
+    })
+    # Un contrato repetido al final
+    return pd.concat([df, df.iloc[[0]]], ignore_index=True)
+
+
+def test_modo_optimizado_da_el_mismo_contenido():
+    normal = clean_secop_data(_crudo())
+    optimizado = clean_secop_data(_crudo(), optimizar_memoria=True)
+
+    assert len(normal) == len(optimizado) == 300
+    for col in normal.columns:
+        assert normal[col].astype(str).tolist() == optimizado[col].astype(str).tolist(), col
+    assert sorted(optimizado["departamento_entidad"].cat.categories) == ["antioquia", "bogota dc", "valle del cauca"]
+
+
+def test_modo_optimizado_usa_tipos_compactos():
+    normal = clean_secop_data(_crudo())
+    optimizado = clean_secop_data(_crudo(), optimizar_memoria=True)
+
+    for col in set(COLUMNAS_CATEGORICAS) & set(optimizado.columns):
+        assert isinstance(optimizado[col].dtype, pd.CategoricalDtype), col
+    assert optimizado["valor_contrato"].dtype.itemsize < normal["valor_contrato"].dtype.itemsize
+    assert optimizado["documento_proveedor"].tolist() == [1234567] * 300
+    assert optimizado.memory_usage(deep=True).sum() < normal.memory_usage(deep=True).sum()
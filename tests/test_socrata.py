@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from comun import socrata
+
+REGISTROS = [{"id": str(i), "departamento": f"d{i % 3}"} for i in range(25)]
+
+
+class _SocrataFalso(BaseHTTPRequestHandler):
+    """
+    Responde `$select=count(*)` y páginas `$limit/$offset` con ETag. La primera
+    vez que llega cada consulta responde `estado_falla` (503 por defecto),
+    como un servidor saturado.
+    """
+    estados = []
+    fallidas = set()
+    estado_falla = 503
+
+    def do_GET(self):
+        params = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+        if self.path not in self.fallidas:
+            self.fallidas.add(self.path)
+            self._responder(self.estado_falla, b"")
+            return
+
+        if "count(*)" in params.get("$select", ""):
+            datos = [{"total": str(len(REGISTROS))}]
+        else:
+            inicio = int(params["$offset"])
+            datos = REGISTROS[inicio:inicio + int(params["$limit"])]
+        cuerpo = json.dumps(datos).encode()
+        etag = f'"{hashlib.sha1(cuerpo).hexdigest()}"'
+        if self.headers.get("If-None-Match") == etag:
+            self._responder(304, b"", etag)
+        else:
+            self._responder(200, cuerpo, etag)
+
+    def _responder(self, estado, cuerpo, etag=None):
+        self.estados.append(estado)
+        self.send_response(estado)
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, *_):
+        pass
+
+
+@pytest.fixture
+def base_url(monkeypatch, tmp_path):
+    monkeypatch.setattr(socrata, "DIRECTORIO_HTTP", str(tmp_path / "http"))
+    monkeypatch.setattr(socrata, "FACTOR_ESPERA", 0)
+    _SocrataFalso.estados, _SocrataFalso.fallidas, _SocrataFalso.estado_falla = [], set(), 503
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _SocrataFalso)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}/resource"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_reintenta_503_y_revalida_con_304(base_url):
+    session = socrata.crear_sesion()
+    primera = socrata.cargar_dataset("abcd-1234", page_size=10, session=session, base_url=base_url)
+    # Conteo + 3 páginas: cada una falla una vez con 503 y se reintenta
+    assert _SocrataFalso.estados.count(503) == 4
+    assert _SocrataFalso.estados.count(200) == 4
+    assert primera["id"].tolist() == [r["id"] for r in REGISTROS]
+
+    _SocrataFalso.estados = []
+    segunda = socrata.cargar_dataset("abcd-1234", page_size=10, session=session, base_url=base_url)
+    assert _SocrataFalso.estados == [304] * 4
+    assert segunda.equals(primera)
+
+
+def test_depurar_borra_las_respuestas_menos_usadas(tmp_path):
+    for i, nombre in enumerate(["vieja", "media", "nueva"]):
+        for extension in ("json", "meta"):
+            ruta = tmp_path / f"{nombre}.{extension}"
+            ruta.write_bytes(b"x" * 400_000)
+            os.utime(ruta, (1000 + i, 1000 + i))
+
+    assert socrata.depurar_cache_http(str(tmp_path), max_mb=0.5) == 2
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["nueva.json", "nueva.meta"]
+
+
+# ---------- Paginación (sesión simulada) ----------
+class _Respuesta:
+    def __init__(self, datos):
+        self.status_code, self.headers, self._datos = 200, {}, datos
+
+    def json(self):
+        return self._datos
+
+    def raise_for_status(self):
+        pass
+
+
+class _SesionFalsa:
+    """
+    Sustituye a `requests.Session`: sirve `registros` por `$limit/$offset` y
+    anuncia `contados` registros en `count(*)` (pueden ser más de los que hay).
+    """
+
+    def __init__(self, registros, contados=None):
+        self.registros = registros
+        self.contados = len(registros) if contados is None else contados
+        self.paginas = []
+        self._lock = threading.Lock()
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        if "count(*)" in params.get("$select", ""):
+            return _Respuesta([{"total": str(self.contados)}])
+        with self._lock:
+            self.paginas.append((params["$offset"], params["$limit"]))
+        return _Respuesta(self.registros[params["$offset"]:params["$offset"] + params["$limit"]])
+
+
+@pytest.fixture
+def sin_cache_http(monkeypatch):
+    monkeypatch.setattr(socrata, "DIRECTORIO_HTTP", "")
+
+
+def test_limites_de_pagina_y_limite_total(sin_cache_http):
+    sesion = _SesionFalsa(REGISTROS)
+    df = socrata.cargar_dataset("abcd-1234", page_size=10, session=sesion)
+    assert sorted(sesion.paginas) == [(0, 10), (10, 10), (20, 5)]
+    assert df["id"].tolist() == [r["id"] for r in REGISTROS]
+
+    sesion = _SesionFalsa(REGISTROS)
+    df = socrata.cargar_dataset("abcd-1234", limit=15, page_size=10, session=sesion)
+    assert sorted(sesion.paginas) == [(0, 10), (10, 5)]
+    assert len(df) == 15
+
+
+def test_fin_de_datos_antes_del_conteo(sin_cache_http):
+    # El conteo dice 60 pero solo hay 25: la primera página vacía termina la descarga
+    sesion = _SesionFalsa(REGISTROS, contados=60)
+    paginas = list(socrata.iterar_paginas("abcd-1234", page_size=10, session=sesion))
+    assert [len(p) for p in paginas] == [10, 10, 5]
+
+
+def test_paginas_en_vuelo_acotadas(sin_cache_http):
+    sesion = _SesionFalsa([{"id": str(i)} for i in range(1000)])
+    paginas = socrata.iterar_paginas("abcd-1234", page_size=10, max_hilos=2, session=sesion)
+    next(paginas)
+    # Dos pedidas al inicio y una más al entregar la primera, no las 100 del dataset
+    assert len(sesion.paginas) <= 3
+    paginas.close()
+
+
+@pytest.mark.parametrize("estado", [429, 500, 502])
+def test_reintenta_429_y_5xx(base_url, estado):
+    _SocrataFalso.estado_falla = estado
+    df = socrata.cargar_dataset("abcd-1234", page_size=10, session=socrata.crear_sesion(), base_url=base_url)
+    assert _SocrataFalso.estados.count(estado) == 4
+    assert df["id"].tolist() == [r["id"] for r in REGISTROS]